@@ -14,11 +14,23 @@ class Settings(BaseSettings):
     
     # Google Gemini
     gemini_api_key: str = ""
+    gemini_model: str = "gemini-2.5-flash"
+    
+    # OpenAI-compatible endpoint (LiteLLM proxy from docker-compose.yml)
+    openai_compat_base_url: str = "http://localhost:4000/v1"
+    openai_compat_api_key: str = ""
+    openai_compat_model: str = "gpt-4o"
 
     # Anthropic
     anthropic_api_key: str = ""
     anthropic_model: str = "claude-sonnet-4-5-20250929"
     
+    # Model per task class (empty = anthropic_model)
+    generation_model: str = ""
+    router_model: str = "claude-haiku-4-5-20251001"
+    repair_model: str = "claude-haiku-4-5-20251001"
+    short_task_model: str = "claude-haiku-4-5-20251001"
+    
     # Redis
     redis_url: str = "redis://localhost:6379/0"
     
@@ -32,6 +44,115 @@ class Settings(BaseSettings):
     default_min_views: int = 100000
     default_headline_count: int = 30
     
+    # Trend reads: "auto" = the database_url backend (local prisma/dev.db wins
+    # in development), or force "sqlite" / "postgres"
+    trend_store_backend: str = "auto"
+    # Read connections for trend queries (SQLite threads / asyncpg pool size)
+    trend_db_pool_size: int = 4
+    trend_pg_statement_cache_size: int = 100  # Prepared statements per connection (0 behind PgBouncer)
+    trend_pg_fetch_batch: int = 500  # Rows per server-side cursor round trip
+    trend_db_create_indexes: bool = True  # Create/verify the trend query indexes on startup
+    
+    # In-memory top-K trend rows per (dataset, category, window), kept current
+    # by polling content_items.updated_at
+    trend_snapshot_enabled: bool = True
+    trend_snapshot_size: int = 500  # K; queries with a larger limit go to SQLite
+    trend_snapshot_refresh_seconds: float = 5
+    trend_snapshot_max_staleness_seconds: float = 15
+    trend_snapshot_reload_seconds: int = 600  # Full reload (also drops deleted rows)
+    trend_snapshot_max_scopes: int = 64
+    
+    # content_items.viralityScore: per-dataset/per-author z-scores of views,
+    # velocity and engagement; trends are ranked by it
+    virality_scoring_enabled: bool = True
+    virality_refresh_seconds: int = 60  # Score new/changed rows
+    virality_full_rescore_seconds: int = 6 * 3600  # Refit group statistics, rescore everything
+    
+    # Trend rows in the headline prompt: token budget and transcript excerpt length
+    trend_digest_tokens: int = 6000
+    trend_transcript_chars: int = 300
+    
+    # Topic requests: full-text matched viral items as prompt context
+    transcript_index_enabled: bool = True
+    transcript_index_sync_seconds: int = 30
+    topic_trend_items: int = 8
+    topic_trend_days: int = 90
+    
+    # Larger headline counts are split into parallel LLM calls of this size
+    headline_shard_size: int = 15
+    headline_max_shards: int = 8
+    
+    # Pre-generated headline reserve for hot topics (configured, comma-separated,
+    # or requested popular_requests times within the window)
+    headline_pool_enabled: bool = True
+    headline_pool_topics: str = ""
+    headline_pool_size: int = 30  # Per-topic cap
+    headline_pool_max_age_seconds: int = 6 * 3600
+    headline_pool_popular_requests: int = 3
+    headline_pool_popular_window_seconds: int = 24 * 3600
+    headline_pool_max_topics: int = 20
+    headline_pool_refresh_seconds: int = 600  # Background warm-up of hot topics
+    
+    # Per-item pattern analyses (persisted in data_dir, reused by headline prompts)
+    pattern_analysis_enabled: bool = True
+    pattern_analyze_inline: bool = True  # Analyze missing items while generating headlines
+    pattern_worker_enabled: bool = True  # Background prefetch of new/changed items
+    pattern_refresh_seconds: int = 1800
+    
+    # Near-duplicate headline index (MinHash/LSH, persisted in data_dir)
+    headline_dedupe_enabled: bool = True
+    headline_similarity_threshold: float = 0.6
+    headline_dedupe_topup: bool = True  # Ask once for replacements of dropped duplicates
+    
+    # Local data (caches, indexes) owned by this service
+    data_dir: str = "data"
+    
+    # LLM response cache
+    llm_cache_enabled: bool = True
+    llm_cache_disk_enabled: bool = True
+    llm_cache_max_entries: int = 512
+    llm_cache_max_bytes: int = 32 * 1024 * 1024
+    llm_cache_ttl_seconds: int = 24 * 3600
+    
+    # LLM concurrency / rate limits (0 = unlimited)
+    llm_max_concurrency: int = 8
+    llm_requests_per_minute: int = 50
+    llm_input_tokens_per_minute: int = 0
+    llm_output_tokens_per_minute: int = 0
+    
+    # Transient API errors (5xx, timeouts, 429) are retried this many times
+    llm_api_max_attempts: int = 3
+    # Model round-trips for JSON that local repair could not recover
+    llm_json_max_regenerations: int = 1
+    
+    # Provider routing: comma-separated preference order of
+    # anthropic / gemini / openai, ranked by rolling p95 and error rate
+    llm_providers: str = "anthropic"
+    llm_router_window: int = 50
+    llm_router_max_error_rate: float = 0.5
+    llm_hedge_after_seconds: float = 0.0  # 0 = no hedged requests
+    
+    # Cap for adaptive max_tokens (non-streaming requests above ~21k are refused by the SDK)
+    llm_max_output_tokens: int = 21000
+    
+    # Offline bulk mode (Message Batches API)
+    anthropic_batches_base_url: str = ""  # Empty = official API
+    llm_batch_poll_seconds: int = 30
+    llm_batch_timeout_seconds: int = 24 * 3600
+    
+    # Per-call LLM traces kept for /metrics/llm
+    llm_telemetry_capacity: int = 2000
+    
+    # Chat routing: resolve obvious commands locally (rules + n-gram model)
+    chat_fast_path_enabled: bool = True
+    chat_fast_path_threshold: float = 0.85
+    
+    # Chat memory per session_id: verbatim turns + rolling summary (tokens)
+    chat_history_tokens: int = 1200
+    chat_summary_tokens: int = 250
+    chat_max_sessions: int = 1000
+    chat_session_ttl_seconds: int = 24 * 3600
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -3,11 +3,20 @@ Master Agent - AI Executive Producer
 FastAPI Application Entry Point
 """
 
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
-from app.routers import producer, health
+from app.routers import producer, health, metrics
+from app.services.trend_analyzer import TrendAnalyzer
+from app.services.trend_store import SQLiteTrendStore, get_trend_store
+from app.workers.headline_pool_worker import HeadlinePoolWorker
+from app.workers.pattern_worker import PatternWorker
+from app.workers.transcript_index_worker import TranscriptIndexWorker
+from app.workers.trend_snapshot_worker import TrendSnapshotWorker
+from app.workers.virality_worker import ViralityWorker
 
 settings = get_settings()
 
@@ -31,6 +40,7 @@ app.add_middleware(
 # Include routers
 app.include_router(health.router, tags=["Health"])
 app.include_router(producer.router, prefix="/producer", tags=["Producer"])
+app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
 
 
 @app.on_event("startup")
@@ -38,10 +48,53 @@ async def startup_event():
     """Initialize connections on startup"""
     print("🚀 Master Agent starting...")
     print(f"📊 Database: {settings.database_url[:50]}...")
+    trend_store = get_trend_store()
+    print(f"📈 Trend store: {trend_store.name}")
     print(f"🤖 Anthropic API configured: {bool(settings.anthropic_api_key)} ({settings.anthropic_model})")
+    
+    if settings.trend_db_create_indexes:
+        # Index builds on a large table take a while; don't hold up startup
+        app.state.trend_indexes = asyncio.ensure_future(TrendAnalyzer().ensure_indexes())
+    
+    if settings.trend_snapshot_enabled and trend_store.available():
+        app.state.trend_snapshot_worker = TrendSnapshotWorker()
+        app.state.trend_snapshot_worker.start()
+        print(f"📈 Trend snapshot: polling every {settings.trend_snapshot_refresh_seconds}s")
+    
+    # Scores are written to the SQLite file; on Postgres the harvester's scores are used
+    if settings.virality_scoring_enabled and isinstance(trend_store, SQLiteTrendStore) and trend_store.available():
+        app.state.virality_worker = ViralityWorker()
+        app.state.virality_worker.start()
+        print(f"🔥 Virality scorer: every {settings.virality_refresh_seconds}s")
+    
+    if settings.transcript_index_enabled and trend_store.available():
+        app.state.transcript_index_worker = TranscriptIndexWorker()
+        app.state.transcript_index_worker.start()
+        print(f"🔎 Transcript index: syncing every {settings.transcript_index_sync_seconds}s")
+    
+    if settings.pattern_analysis_enabled and settings.pattern_worker_enabled:
+        app.state.pattern_worker = PatternWorker()
+        app.state.pattern_worker.start()
+        print(f"🧠 Pattern worker: every {settings.pattern_refresh_seconds}s")
+    
+    if settings.headline_pool_enabled:
+        app.state.headline_pool_worker = HeadlinePoolWorker()
+        app.state.headline_pool_worker.start()
+        print(f"🏊 Headline pool worker: every {settings.headline_pool_refresh_seconds}s")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     print("👋 Master Agent shutting down...")
+    
+    for name in (
+        "pattern_worker", "headline_pool_worker", "trend_snapshot_worker",
+        "transcript_index_worker", "virality_worker",
+    ):
+        worker = getattr(app.state, name, None)
+        if worker is not None:
+            await worker.stop()
+    
+    await producer.agent.bulk_jobs.close()
+    await get_trend_store().close()
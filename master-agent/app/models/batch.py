@@ -36,11 +36,13 @@ class ItemStatus(str, Enum):
 class ChatRequest(BaseModel):
     message: str
     batch_id: Optional[str] = None
+    session_id: Optional[str] = Field(default=None, description="Keeps conversation memory across messages")
     
 class ChatResponse(BaseModel):
     reply: str
     action: Optional[str] = None
     data: Optional[dict] = None
+    session_id: Optional[str] = None
 
 
 # ==========================================
@@ -55,12 +57,19 @@ class StartBatchRequest(BaseModel):
     topic: Optional[str] = Field(default=None, description="Specific topic to generate content for")
 
 
+class StartBulkRequest(BaseModel):
+    """Request to start one batch per topic in offline bulk mode"""
+    topics: List[str] = Field(min_length=1, max_length=100, description="One batch is created per topic")
+    count: int = Field(default=30, ge=1, le=100, description="Headlines per topic")
+
+
 class ApproveHeadlinesRequest(BaseModel):
     """Request to approve/edit headlines"""
     batch_id: str
     approved_ids: List[str] = Field(description="IDs of approved headlines")
     rejected_ids: List[str] = Field(default=[], description="IDs of rejected headlines")
     edits: dict[str, str] = Field(default={}, description="Map of ID -> edited headline text")
+    bulk: bool = Field(default=False, description="Offline mode via the Message Batches API (slow, cheaper)")
 
 
 class ApproveScriptsRequest(BaseModel):
@@ -69,6 +78,7 @@ class ApproveScriptsRequest(BaseModel):
     approved_ids: List[str]
     rejected_ids: List[str] = []
     feedback: dict[str, str] = Field(default={}, description="Map of ID -> feedback for regeneration")
+    bulk: bool = Field(default=False, description="Offline mode via the Message Batches API (slow, cheaper)")
 
 
 # ==========================================
@@ -120,6 +130,7 @@ class BatchResponse(BaseModel):
     scripts: List[ScriptItem] = []
     visuals: List[VisualBlueprint] = []
     errors: List[str] = []
+    bulk_job: Optional[str] = None  # Offline bulk step still running (headlines/scripts/visuals)
 
 
 class BatchSummary(BaseModel):
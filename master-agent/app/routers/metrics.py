@@ -0,0 +1,70 @@
+"""LLM and trend data metrics endpoints"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from app.config import get_settings
+from app.services.conversation_store import get_conversation_store
+from app.services.headline_index import get_headline_index
+from app.services.headline_pool import get_headline_pool
+from app.services.intent_classifier import get_intent_classifier
+from app.services.json_repair import get_repair_stats
+from app.services.llm_governor import get_governor
+from app.services.llm_providers import get_provider_router
+from app.services.llm_telemetry import get_telemetry
+from app.services.pattern_store import get_pattern_store
+from app.services.response_cache import get_response_cache
+from app.services.single_flight import get_single_flight
+from app.services.token_budget import get_token_budgeter
+from app.services.transcript_index import get_transcript_index
+from app.services.trend_snapshot import get_trend_snapshot
+from app.services.trend_store import get_trend_store
+from app.services.virality_scorer import get_virality_scorer
+
+router = APIRouter()
+settings = get_settings()
+
+
+@router.get("/llm")
+async def llm_metrics(
+    service: Optional[str] = Query(None, description="Only this service, e.g. ScriptWriter"),
+    recent: int = Query(20, ge=0, le=500, description="Number of raw call traces to include")
+):
+    """
+    Per-call LLM telemetry: per-service latency / queue wait / TTFT
+    percentiles, tokens, retries and outcomes, plus the state of the
+    shared cache, governor, provider router, coalescer, budgets and
+    JSON repair counters.
+    """
+    return {
+        "calls": get_telemetry().snapshot(service=service, recent=recent),
+        "cache": get_response_cache().snapshot() if settings.llm_cache_enabled else {},
+        "governor": get_governor().snapshot(),
+        "providers": get_provider_router().snapshot(),
+        "inflight": get_single_flight().snapshot(),
+        "budgets": get_token_budgeter().snapshot(),
+        "json_repair": get_repair_stats().snapshot(),
+        "headline_index": get_headline_index().snapshot() if settings.headline_dedupe_enabled else {},
+        "headline_pool": get_headline_pool().snapshot() if settings.headline_pool_enabled else {},
+        "pattern_analyses": get_pattern_store().snapshot() if settings.pattern_analysis_enabled else {},
+        "conversations": get_conversation_store().snapshot(),
+        "chat_fast_path": get_intent_classifier().snapshot() if settings.chat_fast_path_enabled else {},
+    }
+
+
+@router.get("/trends")
+async def trend_metrics():
+    """
+    State of the trend data subsystems: the trend store (backend, pool,
+    queries), the top-K trend snapshot, the transcript index and the
+    virality scorer. Kept apart from /llm so LLM telemetry never touches
+    the trend database.
+    """
+    virality = get_virality_scorer() if settings.virality_scoring_enabled else None
+    return {
+        "trend_store": get_trend_store().snapshot(),
+        "trend_snapshot": get_trend_snapshot().snapshot() if settings.trend_snapshot_enabled else {},
+        "transcript_index": get_transcript_index().snapshot() if settings.transcript_index_enabled else {},
+        "virality": virality.snapshot() if virality is not None else {},
+    }
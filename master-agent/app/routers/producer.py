@@ -5,11 +5,15 @@ State transitions:
 PLANNING → REVIEW_HEADLINES → DRAFTING → REVIEW_SCRIPTS → PRODUCTION → COMPLETED
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from typing import List
+import json
+
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List
 
 from app.models.batch import (
     StartBatchRequest,
+    StartBulkRequest,
     ApproveHeadlinesRequest,
     ApproveScriptsRequest,
     BatchResponse,
@@ -24,22 +28,70 @@ router = APIRouter()
 agent = MasterAgentService()
 
 
+def _ndjson(events: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """Wrap an event iterator as newline-delimited JSON (one event per line)."""
+    async def body():
+        try:
+            async for event in events:
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except Exception as e:
+            # Headers are already sent, so report failures in-band
+            yield json.dumps({"event": "error", "detail": str(e)}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+def _sse(events: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """Wrap an event iterator as Server-Sent Events ("event: <name>" + JSON data)."""
+    def message(event: Dict[str, Any]) -> str:
+        return f"event: {event.get('event', 'message')}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+    
+    async def body():
+        try:
+            async for event in events:
+                yield message(event)
+        except Exception as e:
+            # Headers are already sent, so report failures in-band
+            yield message({"event": "error", "detail": str(e)})
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        # Disable proxy buffering (nginx) so events are flushed immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
     Agentic Chat Endpoint.
     """
     try:
-        response = await agent.chat(request.message, request.batch_id)
+        response = await agent.chat(request.message, request.batch_id, request.session_id)
         return ChatResponse(
             reply=response.get("reply", ""),
             action=response.get("action"),
-            data=response.get("data")
+            data=response.get("data"),
+            session_id=response.get("session_id")
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming variant of /chat (Server-Sent Events).
+    
+    Emits "start" immediately, "reply" text deltas as the router writes
+    them, then "action"; a start_batch continues with "batch", one "item"
+    per headline and "done" with the full batch, anything else ends
+    with "done".
+    """
+    return _sse(agent.chat_stream(request.message, request.batch_id, request.session_id))
+
+
 @router.post("/start", response_model=BatchResponse)
 async def start_batch(request: StartBatchRequest):
     """
@@ -62,6 +114,42 @@ async def start_batch(request: StartBatchRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/start/stream")
+async def start_batch_stream(request: StartBatchRequest):
+    """
+    Streaming variant of /start (NDJSON).
+    
+    Emits {"event": "batch"} with the new batch ID, then one
+    {"event": "item"} per headline as soon as it is generated,
+    then {"event": "done"} with the full batch.
+    """
+    return _ndjson(agent.start_batch_stream(
+        count=request.count,
+        days=request.days,
+        min_views=request.min_views,
+        topic=request.topic
+    ))
+
+
+@router.post("/start/bulk", response_model=List[BatchResponse], status_code=202)
+async def start_batches_bulk(request: StartBulkRequest):
+    """
+    Offline bulk start: one batch per topic.
+    
+    Goes through the Message Batches API (half price, outside the
+    interactive rate limits), which can take minutes to hours. Returns
+    at once with the batches in PLANNING state (bulk_job set); poll
+    /batch/{id} until they reach REVIEW_HEADLINES or FAILED.
+    """
+    try:
+        return await agent.start_batches_bulk(
+            topics=request.topics,
+            count=request.count
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/batch/{batch_id}", response_model=BatchResponse)
 async def get_batch(batch_id: str):
     """
@@ -81,58 +169,105 @@ async def list_batches(limit: int = 10):
     return await agent.list_batches(limit=limit)
 
 
+def _reject_running_bulk(batch: BatchResponse) -> None:
+    """409 while an offline bulk job is still writing to the batch."""
+    if batch.bulk_job:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Bulk {batch.bulk_job} job still running for batch {batch.id}"
+        )
+
+
 @router.post("/approve-headlines", response_model=BatchResponse)
-async def approve_headlines(request: ApproveHeadlinesRequest):
+async def approve_headlines(request: ApproveHeadlinesRequest, response: Response):
     """
     Approve (or edit) headlines and move to DRAFTING state.
     
     Triggers script writing with reasoning for approved headlines.
+    With bulk=true it returns at once (202, batch in DRAFTING); poll
+    /batch/{id} until REVIEW_SCRIPTS.
     """
     batch = await agent.get_batch(request.batch_id)
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
     
+    _reject_running_bulk(batch)
     if batch.state != BatchState.REVIEW_HEADLINES:
         raise HTTPException(
             status_code=400, 
             detail=f"Cannot approve headlines in state {batch.state}"
         )
     
+    if request.bulk:
+        response.status_code = 202
     try:
         updated_batch = await agent.approve_headlines(
             batch_id=request.batch_id,
             approved_ids=request.approved_ids,
             rejected_ids=request.rejected_ids,
-            edits=request.edits
+            edits=request.edits,
+            bulk=request.bulk
         )
         return updated_batch
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/approve-headlines/stream")
+async def approve_headlines_stream(request: ApproveHeadlinesRequest):
+    """
+    Streaming variant of /approve-headlines (NDJSON).
+    
+    Emits one {"event": "item"} per script as it is written,
+    then {"event": "done"} with the full batch.
+    """
+    batch = await agent.get_batch(request.batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    if batch.state != BatchState.REVIEW_HEADLINES:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Cannot approve headlines in state {batch.state}"
+        )
+    
+    return _ndjson(agent.approve_headlines_stream(
+        batch_id=request.batch_id,
+        approved_ids=request.approved_ids,
+        rejected_ids=request.rejected_ids,
+        edits=request.edits
+    ))
+
+
 @router.post("/approve-scripts", response_model=BatchResponse)
-async def approve_scripts(request: ApproveScriptsRequest):
+async def approve_scripts(request: ApproveScriptsRequest, response: Response):
     """
     Approve scripts and move to PRODUCTION state.
     
     Can include feedback for regeneration of specific scripts.
+    With bulk=true it returns at once (202, bulk_job set); poll
+    /batch/{id} until PRODUCTION.
     """
     batch = await agent.get_batch(request.batch_id)
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
     
+    _reject_running_bulk(batch)
     if batch.state != BatchState.REVIEW_SCRIPTS:
         raise HTTPException(
             status_code=400,
             detail=f"Cannot approve scripts in state {batch.state}"
         )
     
+    if request.bulk:
+        response.status_code = 202
     try:
         updated_batch = await agent.approve_scripts(
             batch_id=request.batch_id,
             approved_ids=request.approved_ids,
             rejected_ids=request.rejected_ids,
-            feedback=request.feedback
+            feedback=request.feedback,
+            bulk=request.bulk
         )
         return updated_batch
     except Exception as e:
@@ -4,11 +4,37 @@ Anthropic Client - Integration with Claude 3.5 Sonnet
 Handles all AI interactions with structured output.
 """
 
+import asyncio
+import copy
 import json
-from typing import Any, Dict, Optional, Union, List
-from anthropic import AsyncAnthropic
+from contextlib import contextmanager
+from dataclasses import replace
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple, Union, List
+from anthropic import (
+    APIConnectionError,
+    AsyncAnthropic,
+    InternalServerError,
+    RateLimitError,
+)
 
 from app.config import get_settings
+from app.services.json_repair import RepairOutcome, RepairStats, get_repair_stats, repair_json
+from app.services.llm_governor import Lease, LLMGovernor, Priority, get_governor
+from app.services.llm_telemetry import CallTrace, LLMTelemetry, current_trace, get_telemetry
+from app.services.llm_providers import (
+    AnthropicProvider,
+    LLMResponse,
+    ProviderRouter,
+    TransientProviderError,
+    get_provider_router,
+    retry_after,
+)
+from app.services.message_batches import AnthropicBatchTransport, MessageBatchRunner
+from app.services.response_cache import MISS, ResponseCache, get_response_cache, make_cache_key
+from app.services.single_flight import SingleFlight, get_single_flight
+from app.services.token_budget import BudgetPlan, TokenBudgeter, get_token_budgeter
+from app.services.token_counter import estimate_tokens
 
 settings = get_settings()
 
@@ -19,112 +45,728 @@ from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_excep
 # Configure logger
 logger = logging.getLogger("anthropic_client")
 
+# Budget for calls without a task profile (the historical fixed values)
+DEFAULT_MAX_TOKENS = 8192
+DEFAULT_THINKING_TOKENS = 2048
+
+# Task class -> (Settings field naming its model, extended thinking allowed).
+# Routing, JSON repair and small edits run on the fast model without thinking.
+TASK_CLASSES = {
+    "generation": ("generation_model", True),
+    "router": ("router_model", False),
+    "repair": ("repair_model", False),
+    "short": ("short_task_model", False),
+}
+
+# Worth retrying as-is: network errors/timeouts, 429, 5xx and 529 overloaded
+TRANSIENT_ERRORS = (APIConnectionError, RateLimitError, InternalServerError, TransientProviderError)
+
 class AnthropicClient:
     """
     Client for Anthropic Claude 3.5 Sonnet.
     replaces GeminiClient.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        governor: Optional[LLMGovernor] = None,
+        inflight: Optional[SingleFlight] = None,
+        batches: Optional[MessageBatchRunner] = None,
+        router: Optional[ProviderRouter] = None,
+        budgets: Optional[TokenBudgeter] = None,
+        telemetry: Optional[LLMTelemetry] = None,
+        repairs: Optional[RepairStats] = None
+    ):
+        """
+        Args:
+            cache: Injected response cache. If None, uses the shared
+                   process-wide cache (unless disabled in settings).
+            governor: Injected concurrency/rate-limit governor. If None,
+                      uses the shared process-wide governor.
+            inflight: Injected request coalescer. If None, uses the shared
+                      process-wide one.
+            batches: Injected Message Batches runner for generate_bulk().
+                     If None, one is created on first use.
+            router: Injected provider router for generate(). If None, uses
+                    the shared router built from settings.llm_providers.
+                    stream() and generate_bulk() always use Claude.
+            budgets: Injected per-task token budgeter. If None, uses the
+                     shared one (learned sizes are process-wide).
+            telemetry: Injected per-call trace buffer. If None, uses the
+                       shared one behind /metrics/llm.
+            repairs: Injected JSON repair counters. If None, uses the
+                     shared ones behind /metrics/llm.
+        """
         self.client = AsyncAnthropic(api_key=settings.anthropic_api_key)
         self.model = settings.anthropic_model
+        if cache is None and settings.llm_cache_enabled:
+            cache = get_response_cache()
+        self.cache = cache
+        self.governor = governor or get_governor()
+        self.inflight = inflight or get_single_flight()
+        self.batches = batches
+        self.router = router or get_provider_router()
+        self.budgets = budgets or get_token_budgeter()
+        self.telemetry = telemetry or get_telemetry()
+        # How JSON replies were obtained (see json_repair.RepairOutcome)
+        self.repairs = repairs or get_repair_stats()
+        
+        # Cumulative token usage as reported by the API (message.usage)
+        self.usage: Dict[str, int] = {
+            "requests": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        }
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type(Exception),
-        reraise=True
-    )
     async def generate(
         self,
         prompt: str,
         response_format: str = "json",
         temperature: float = 0.7,
-        max_tokens: int = 8192,
-        attempt: int = 1
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        prefix: Optional[str] = None,
+        priority: Priority = Priority.NORMAL,
+        task: Optional[str] = None,
+        items: int = 1,
+        task_class: str = "generation",
+        service: Optional[str] = None
     ) -> Union[Dict[str, Any], List[Any], str]:
         """
-        Generate content using Claude.
-        INCLUDES:
-        - Retries (Tenacity)
-        - Self-Correction (Recursive repair of bad JSON)
+        Generate content using Claude, serving repeats from the response cache.
+        
+        Args:
+            prompt: The dynamic part of the prompt (sent fresh every call)
+            response_format: "json" or "text"
+            temperature: Creativity level (0.0-1.0)
+            max_tokens: Explicit output cap (disables adaptive budgeting)
+            use_cache: Set False to skip the cache lookup (result is still stored).
+                       Identical calls already in flight are still joined.
+            prefix: Static instructions shared across calls. Sent as a
+                    cache-controlled system block so Anthropic prompt caching
+                    can reuse it (lower latency and input cost).
+            priority: Scheduling class in the shared governor queue
+            task: Budget profile ("router", "headlines", "scripts", ...) that
+                  sizes max_tokens and the thinking budget
+            items: Expected number of output items, for the budget profile
+            task_class: Picks the model and whether thinking is allowed
+                        ("generation", "router", "repair", "short")
+            service: Caller name for telemetry (AIService passes its class name)
         """
+        system_prompt = self._build_system_prompt(response_format)
+        plan = self._plan(task, items, max_tokens, task_class)
+        key = self._cache_key(prompt, system_prompt, prefix, response_format, temperature, plan, task_class)
+        
+        async def run() -> Union[Dict[str, Any], List[Any], str]:
+            result, cacheable = await self._generate(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                prefix=prefix,
+                response_format=response_format,
+                temperature=temperature,
+                plan=plan,
+                task_class=task_class,
+                priority=priority
+            )
+            # Never cache failures or truncated replies, they should be retried next time
+            if self.cache is not None and cacheable:
+                await self.cache.set(key, result)
+            return result
         
+        with self._trace("generate", service, plan, task_class) as trace:
+            if self.cache is not None and use_cache:
+                cached = await self.cache.get(key)
+                if cached is not MISS:
+                    logger.info(f"⚡ Cache hit: {prompt[:50]}...")
+                    trace.outcome = "cache_hit"
+                    return cached
+            
+            if self.inflight.is_in_flight(key):
+                # The leader's trace records the API work
+                trace.outcome = "coalesced"
+            
+            # Identical concurrent calls share one API request
+            result = await self.inflight.do(key, run)
+            return copy.deepcopy(result)
+    
+    async def stream(
+        self,
+        prompt: str,
+        response_format: str = "json",
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        prefix: Optional[str] = None,
+        priority: Priority = Priority.NORMAL,
+        task: Optional[str] = None,
+        items: int = 1,
+        task_class: str = "generation",
+        service: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the reply text as it is generated.
+        
+        Same parameters as generate(). Yields text deltas (thinking is not
+        streamed). A cached result is replayed as a single chunk, and a
+        complete, valid reply is written back to the response cache.
+        No self-correction here: callers parse the streamed text and fall
+        back to generate() if it turns out unusable.
+        """
+        system_prompt = self._build_system_prompt(response_format)
+        plan = self._plan(task, items, max_tokens, task_class)
+        
+        with self._trace("stream", service, plan, task_class) as trace:
+            key = None
+            if self.cache is not None:
+                key = self._cache_key(prompt, system_prompt, prefix, response_format, temperature, plan, task_class)
+                if use_cache:
+                    cached = await self.cache.get(key)
+                    if cached is not MISS:
+                        logger.info(f"⚡ Cache hit (stream): {prompt[:50]}...")
+                        trace.outcome = "cache_hit"
+                        yield cached if isinstance(cached, str) else json.dumps(cached, ensure_ascii=False)
+                        return
+            
+            kwargs = self._build_request(prompt, system_prompt, prefix, temperature, plan, task_class)
+            logger.info(f"🌊 Streaming Prompt: {prompt[:50]}...")
+            
+            chunks: List[str] = []
+            async with self.governor.slot(
+                priority,
+                input_tokens=self._estimate_input(prompt, system_prompt, prefix),
+                output_tokens=plan.max_tokens
+            ) as lease:
+                trace.api_attempts = 1
+                trace.queue_wait_seconds = lease.wait_seconds
+                try:
+                    async with self.client.messages.stream(**kwargs) as stream:
+                        async for text in stream.text_stream:
+                            trace.mark_first_token()
+                            chunks.append(text)
+                            yield text
+                        message = await stream.get_final_message()
+                except RateLimitError as e:
+                    self.governor.backoff(retry_after(e))
+                    raise
+                
+                self._record_usage(message, lease)
+            
+            text = "".join(chunks).strip()
+            stop_reason = getattr(message, "stop_reason", None)
+            self._trace_usage(trace, kwargs, message.usage, text)
+            trace.provider = AnthropicProvider.name
+            trace.model = getattr(message, "model", None) or kwargs["model"]
+            self.budgets.observe(plan, message.usage.output_tokens, text, stop_reason)
+            
+            if stop_reason == "max_tokens":
+                trace.outcome = "truncated"
+                return
+            
+            if response_format != "json":
+                trace.outcome = "text"
+                if key is not None:
+                    await self.cache.set(key, text)
+                return
+            
+            try:
+                repaired = repair_json(text)
+            except json.JSONDecodeError:
+                trace.outcome = "failed"
+                return
+            trace.outcome = repaired.outcome.value
+            if key is not None and repaired.outcome != RepairOutcome.SALVAGED:
+                await self.cache.set(key, repaired.value)
+    
+    async def generate_bulk(
+        self,
+        prompts: Dict[str, str],
+        response_format: str = "json",
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        prefix: Optional[str] = None,
+        task: Optional[str] = None,
+        items: int = 1,
+        task_class: str = "generation",
+        service: Optional[str] = None
+    ) -> Dict[str, Union[Dict[str, Any], List[Any], str]]:
+        """
+        Generate many prompts offline through the Message Batches API.
+        
+        Half price and outside the interactive rate limits, but results
+        can take minutes to hours: only for non-interactive runs. Cached
+        prompts are answered locally and not submitted.
+        
+        Args:
+            prompts: custom_id -> dynamic prompt (IDs match [a-zA-Z0-9_-]{1,64})
+            response_format, temperature, max_tokens, use_cache, prefix, task, items, task_class:
+                Same as generate(), applied to every prompt
+            
+        Returns:
+            custom_id -> result. JSON replies are repaired locally; anything
+            unrecoverable (or failed in the batch) is an {"error": ...} dict,
+            there is no regeneration round-trip here.
+        """
+        system_prompt = self._build_system_prompt(response_format)
+        plan = self._plan(task, items, max_tokens, task_class)
+        bulk_plan = replace(plan, items=len(prompts))
+        with self._trace("bulk", service, bulk_plan, task_class) as trace:
+            results: Dict[str, Union[Dict[str, Any], List[Any], str]] = {}
+            keys: Dict[str, str] = {}
+            requests: List[Dict[str, Any]] = []
+            
+            for custom_id, prompt in prompts.items():
+                key = self._cache_key(prompt, system_prompt, prefix, response_format, temperature, plan, task_class)
+                if self.cache is not None and use_cache:
+                    cached = await self.cache.get(key)
+                    if cached is not MISS:
+                        results[custom_id] = cached
+                        continue
+                keys[custom_id] = key
+                requests.append({
+                    "custom_id": custom_id,
+                    "params": self._build_request(prompt, system_prompt, prefix, temperature, plan, task_class)
+                })
+            
+            if not requests:
+                trace.outcome = "cache_hit"
+                return results
+            
+            logger.info(f"📦 Bulk generation: {len(requests)} requests ({len(results)} from cache)")
+            trace.api_attempts = 1
+            batch_results = await self._batch_runner().run(requests)
+            trace.provider = AnthropicProvider.name
+            
+            for custom_id, item in batch_results.items():
+                if item.usage:
+                    usage = SimpleNamespace(**item.usage)
+                    self._record_usage(SimpleNamespace(usage=usage))
+                    self._trace_usage(trace, requests[0]["params"], usage, item.text)
+                    self.budgets.observe(plan, item.usage.get("output_tokens", 0), item.text, item.stop_reason)
+                
+                if not item.ok:
+                    results[custom_id] = {"error": f"Batch request {item.status}", "detail": item.error, "raw": ""}
+                    continue
+                
+                truncated = item.stop_reason == "max_tokens"
+                if response_format != "json":
+                    results[custom_id] = item.text
+                    if truncated:
+                        continue
+                else:
+                    try:
+                        repaired = repair_json(item.text, truncated=truncated)
+                    except json.JSONDecodeError:
+                        self.repairs.record("failed")
+                        results[custom_id] = {"error": "JSON parse failed", "raw": item.text}
+                        continue
+                    self.repairs.record(repaired.outcome.value)
+                    results[custom_id] = repaired.value
+                    if repaired.outcome == RepairOutcome.SALVAGED:
+                        continue
+                
+                if self.cache is not None:
+                    await self.cache.set(keys[custom_id], results[custom_id])
+            
+            failed = sum(1 for result in results.values() if isinstance(result, dict) and "error" in result)
+            trace.outcome = "partial" if failed else "ok"
+            if failed:
+                trace.error = f"{failed}/{len(results)} items failed"
+            return results
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Response cache counters (empty if caching is disabled)."""
+        return self.cache.snapshot() if self.cache is not None else {}
+    
+    def inflight_stats(self) -> Dict[str, int]:
+        """Executed vs coalesced generate() calls."""
+        return self.inflight.snapshot()
+    
+    def provider_stats(self) -> Dict[str, Any]:
+        """Rolling latency / error rate / hedging per LLM provider."""
+        return self.router.snapshot()
+    
+    def governor_stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight requests and wait times of the shared governor."""
+        return self.governor.snapshot()
+    
+    def usage_stats(self) -> Dict[str, Any]:
+        """Cumulative token usage, including prompt-cache reads/writes."""
+        total_input = (
+            self.usage["input_tokens"]
+            + self.usage["cache_creation_input_tokens"]
+            + self.usage["cache_read_input_tokens"]
+        )
+        read_ratio = self.usage["cache_read_input_tokens"] / total_input if total_input else 0.0
+        return {**self.usage, "prompt_cache_read_ratio": round(read_ratio, 4)}
+    
+    def budget_stats(self) -> Dict[str, Dict[str, float]]:
+        """Learned output size per task profile."""
+        return self.budgets.snapshot()
+    
+    def repair_stats(self) -> Dict[str, int]:
+        """Counts of valid / locally repaired / salvaged / regenerated / failed JSON replies (process-wide)."""
+        return self.repairs.snapshot()
+    
+    def _batch_runner(self) -> MessageBatchRunner:
+        """Injected runner, or one on this client (unless a batches base URL is set)."""
+        if self.batches is None:
+            client = None if settings.anthropic_batches_base_url else self.client
+            self.batches = MessageBatchRunner(AnthropicBatchTransport(client))
+        return self.batches
+    
+    def _cache_key(
+        self,
+        prompt: str,
+        system_prompt: str,
+        prefix: Optional[str],
+        response_format: str,
+        temperature: float,
+        plan: BudgetPlan,
+        task_class: str = "generation"
+    ) -> str:
+        return make_cache_key(
+            model=self._model_for(task_class),
+            system=system_prompt,
+            prefix=prefix,
+            prompt=prompt,
+            temperature=temperature,
+            response_format=response_format,
+            budget=plan.cache_tag
+        )
+    
+    def _model_for(self, task_class: str) -> str:
+        """Model configured for a task class (see TASK_CLASSES)."""
+        return getattr(settings, TASK_CLASSES[task_class][0]) or self.model
+    
+    def _plan(
+        self,
+        task: Optional[str],
+        items: int,
+        max_tokens: Optional[int],
+        task_class: str = "generation"
+    ) -> BudgetPlan:
+        """
+        Adaptive budget for a known task; otherwise the fixed legacy
+        defaults (or the caller's explicit max_tokens). Task classes
+        without thinking get no thinking allowance.
+        """
+        if task_class not in TASK_CLASSES:
+            raise ValueError(f"Unknown task class: {task_class}")
+        if max_tokens is None and task in self.budgets.profiles:
+            plan = self.budgets.plan(task, items)
+        else:
+            plan = BudgetPlan(
+                task=task or "default",
+                items=items,
+                max_tokens=max_tokens or DEFAULT_MAX_TOKENS,
+                thinking_tokens=DEFAULT_THINKING_TOKENS,
+                adaptive=False
+            )
+        
+        if not TASK_CLASSES[task_class][1] and plan.thinking_tokens:
+            plan = replace(
+                plan,
+                max_tokens=plan.max_tokens - plan.thinking_tokens if plan.adaptive else plan.max_tokens,
+                thinking_tokens=0
+            )
+        return plan
+    
+    def _build_system_prompt(self, response_format: str) -> str:
         system_prompt = "You are an expert AI Executive Producer. You follow instructions precisely."
         if response_format == "json":
             system_prompt += "\nRespond ONLY with valid JSON. Do not include markdown formatting like ```json ... ```."
-
+        return system_prompt
+    
+    def _build_system_blocks(self, system_prompt: str, prefix: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        System content blocks. The static prefix goes last and carries the
+        cache breakpoint, so everything up to and including it is cached.
+        """
+        blocks: List[Dict[str, Any]] = [{"type": "text", "text": system_prompt}]
+        if prefix:
+            blocks.append({
+                "type": "text",
+                "text": prefix,
+                "cache_control": {"type": "ephemeral"}
+            })
+        return blocks
+    
+    def _build_request(
+        self,
+        prompt: str,
+        system_prompt: str,
+        prefix: Optional[str],
+        temperature: float,
+        plan: BudgetPlan,
+        task_class: str = "generation"
+    ) -> Dict[str, Any]:
+        """Messages API parameters shared by create() and stream()."""
+        model = self._model_for(task_class)
+        kwargs = {
+            "model": model,
+            "max_tokens": plan.max_tokens,
+            "temperature": temperature,
+            "system": self._build_system_blocks(system_prompt, prefix),
+            "messages": [{"role": "user", "content": prompt}]
+        }
+        
+        # Enable native thinking if using 4.5 models and the task wants it
+        if "4-5" in model and plan.thinking_tokens:
+            kwargs["thinking"] = {"type": "enabled", "budget_tokens": plan.thinking_tokens}
+            # Temperature must be 1.0 for thinking models usually, or omitted (default)
+            kwargs.pop("temperature", None)
+        
+        return kwargs
+    
+    @staticmethod
+    def _estimate_input(prompt: str, system_prompt: str, prefix: Optional[str]) -> int:
+        """Input token estimate used to reserve governor budget."""
+        return estimate_tokens(system_prompt) + estimate_tokens(prefix or "") + estimate_tokens(prompt)
+    
+    def _record_usage(self, message: Any, lease: Optional[Lease] = None) -> None:
+        """
+        Accumulate message.usage, log prompt-cache effectiveness and
+        settle the governor lease with the real token counts.
+        """
+        usage = getattr(message, "usage", None)
+        if usage is None:
+            return
+        
+        if lease is not None:
+            lease.settle(
+                usage.input_tokens + (getattr(usage, "cache_creation_input_tokens", 0) or 0),
+                usage.output_tokens
+            )
+        
+        self.usage["requests"] += 1
+        for field in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"):
+            self.usage[field] += getattr(usage, field, None) or 0
+        
+        logger.info(
+            f"📊 Usage: in={usage.input_tokens} out={usage.output_tokens} "
+            f"cache_write={getattr(usage, 'cache_creation_input_tokens', 0) or 0} "
+            f"cache_read={getattr(usage, 'cache_read_input_tokens', 0) or 0}"
+        )
+    
+    @contextmanager
+    def _trace(
+        self,
+        mode: str,
+        service: Optional[str],
+        plan: BudgetPlan,
+        task_class: str
+    ) -> Iterator[CallTrace]:
+        """
+        Trace one client call and record it when the call ends. The trace
+        is the current_trace for everything awaited inside, so _create()
+        can add attempts, queue wait and usage.
+        """
+        trace = CallTrace(
+            service=service or "unknown",
+            mode=mode,
+            task=plan.task,
+            task_class=task_class,
+            model=self._model_for(task_class),
+            items=plan.items
+        )
+        token = current_trace.set(trace)
         try:
-            # Prepare request parameters
-            kwargs = {
-                "model": self.model,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-                "system": system_prompt,
-                "messages": [{"role": "user", "content": prompt}]
-            }
-            
-            # Enable native thinking if using 4.5 models
-            if "4-5" in self.model:
-                kwargs["thinking"] = {"type": "enabled", "budget_tokens": 2048}
-                # Temperature must be 1.0 for thinking models usually, or omitted (default)
-                kwargs.pop("temperature", None) 
-            
-            logger.info(f"🤖 User Prompt (Attempt {attempt}): {prompt[:50]}...")
-            
-            message = await self.client.messages.create(**kwargs)
-            
-            # Extract text from content blocks (skipping ThinkingBlock)
-            text = ""
-            for block in message.content:
-                if hasattr(block, 'text'):
-                    text += block.text
-            
-            text = text.strip()
-            
-            if response_format == "json":
-                # Clean up markdown if present (Claude sometimes still adds it)
-                clean_text = text
-                if clean_text.startswith("```"):
-                    lines = clean_text.split("\n")
-                    if lines[0].strip().startswith("```"):
-                        lines = lines[1:]
-                    if lines[-1].strip() == "```":
-                        lines = lines[:-1]
-                    clean_text = "\n".join(lines)
-                
-                try:
-                    return json.loads(clean_text)
-                except json.JSONDecodeError as e:
-                    logger.error(f"❌ JSON Parse Error: {e}")
-                    logger.debug(f"Bad JSON: {text}")
-                    
-                    if attempt < 3:
-                        logger.warning(f"🔄 Triggering Self-Correction (Attempt {attempt+1})...")
-                        correction_prompt = f"""
-                        Previous response was invalid JSON: {e}
-                        
-                        Original Prompt:
-                        {prompt}
-                        
-                        FIXED RESPONSE (VALID JSON ONLY):
-                        """
-                        return await self.generate(
-                            prompt=correction_prompt,
-                            response_format="json",
-                            temperature=temperature,
-                            max_tokens=max_tokens,
-                            attempt=attempt+1
-                        )
-                    else:
-                        logger.error("❌ Failed to correct JSON after 3 attempts.")
-                        return {"error": "JSON parse failed", "raw": text}
-            
-            return text
-            
+            yield trace
+        except asyncio.CancelledError:
+            trace.outcome = "cancelled"
+            raise
         except Exception as e:
-            logger.error(f"❌ Anthropic API Error: {e}")
+            trace.error = f"{type(e).__name__}: {e}"
             raise
+        finally:
+            try:
+                current_trace.reset(token)
+            except ValueError:
+                # A stream closed from another context (e.g. garbage collected)
+                pass
+            trace.finish()
+            self.telemetry.record(trace)
+    
+    @staticmethod
+    def _trace_usage(trace: CallTrace, kwargs: Dict[str, Any], usage: Any, text: str) -> None:
+        """
+        Add one response's usage to a trace. The API reports thinking as
+        part of output_tokens, so it is estimated as output minus the
+        visible text.
+        """
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        trace.input_tokens += getattr(usage, "input_tokens", 0) or 0
+        trace.output_tokens += output_tokens
+        trace.cache_read_tokens += getattr(usage, "cache_read_input_tokens", 0) or 0
+        trace.cache_creation_tokens += getattr(usage, "cache_creation_input_tokens", 0) or 0
+        if "thinking" in kwargs:
+            trace.thinking_tokens += max(0, output_tokens - estimate_tokens(text))
+    
+    async def _generate(
+        self,
+        prompt: str,
+        system_prompt: str,
+        prefix: Optional[str],
+        response_format: str,
+        temperature: float,
+        plan: BudgetPlan,
+        task_class: str = "generation",
+        priority: Priority = Priority.NORMAL
+    ) -> Tuple[Union[Dict[str, Any], List[Any], str], bool]:
+        """
+        Uncached generation.
+        
+        Transient API errors are retried inside _create() only. A bad JSON
+        reply is repaired locally first; only if that fails is it sent to
+        the repair model, at most llm_json_max_regenerations times.
+        
+        Returns:
+            (result, cacheable). Failures, replies cut off at max_tokens
+            (SALVAGED) and replies from a fallback provider are not
+            cacheable: the cache key names the Claude model.
+        """
+        kwargs = self._build_request(prompt, system_prompt, prefix, temperature, plan, task_class)
+        input_tokens = self._estimate_input(prompt, system_prompt, prefix)
+        
+        logger.info(f"🤖 User Prompt: {prompt[:50]}...")
+        response = await self._create(kwargs, priority, input_tokens)
+        self.budgets.observe(plan, response.usage.output_tokens, response.text, response.stop_reason)
+        text = response.text
+        trace = current_trace.get()
+        fallback = response.provider != AnthropicProvider.name
+        
+        if response_format != "json":
+            truncated = response.stop_reason == "max_tokens"
+            if trace is not None:
+                trace.outcome = "truncated" if truncated else "text"
+            return text, not truncated and not fallback
+        
+        regenerations = 0
+        while True:
+            try:
+                repaired = repair_json(text, truncated=response.stop_reason == "max_tokens")
+            except json.JSONDecodeError as e:
+                logger.error(f"❌ JSON Parse Error: {e}")
+                logger.debug(f"Bad JSON: {text}")
+                
+                if regenerations >= settings.llm_json_max_regenerations:
+                    break
+                regenerations += 1
+                self.repairs.record("regenerated")
+                if trace is not None:
+                    trace.repair_attempts = regenerations
+                logger.warning(f"🔄 Local repair failed, asking repair model for valid JSON ({regenerations})...")
+                
+                repair = self._repair_request(kwargs, text, e)
+                response = await self._create(
+                    repair, priority, estimate_tokens(text) if repair is not kwargs else input_tokens
+                )
+                text = response.text
+                fallback = fallback or response.provider != AnthropicProvider.name
+                continue
+            
+            self.repairs.record(repaired.outcome.value)
+            salvaged = repaired.outcome == RepairOutcome.SALVAGED
+            if repaired.outcome != RepairOutcome.VALID:
+                logger.warning(f"🩹 JSON {repaired.outcome.value} locally")
+            if trace is not None:
+                trace.outcome = "regenerated" if regenerations and not salvaged else repaired.outcome.value
+            return repaired.value, not salvaged and not fallback
+        
+        self.repairs.record("failed")
+        if trace is not None:
+            trace.outcome = "failed"
+        logger.error(f"❌ Failed to get valid JSON after {regenerations} regeneration(s).")
+        return {"error": "JSON parse failed", "raw": text}, False
+    
+    @retry(
+        stop=stop_after_attempt(settings.llm_api_max_attempts),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(TRANSIENT_ERRORS),
+        reraise=True
+    )
+    async def _create(
+        self,
+        kwargs: Dict[str, Any],
+        priority: Priority,
+        input_tokens: int
+    ) -> LLMResponse:
+        """
+        One completion under the governor, on whichever provider the
+        router picks (Claude unless configured otherwise).
+        
+        Returns:
+            The response (text has thinking blocks skipped)
+        """
+        trace = current_trace.get()
+        if trace is not None:
+            trace.api_attempts += 1
+        
+        async with self.governor.slot(
+            priority,
+            input_tokens=input_tokens,
+            output_tokens=kwargs["max_tokens"]
+        ) as lease:
+            if trace is not None:
+                trace.queue_wait_seconds += lease.wait_seconds
+            try:
+                response = await self.router.complete(
+                    kwargs,
+                    # A hedged request is one more request against the limits
+                    hedge_slot=lambda: self.governor.slot(
+                        priority, input_tokens=input_tokens, output_tokens=kwargs["max_tokens"]
+                    )
+                )
+            except Exception as e:
+                logger.error(f"❌ LLM API Error: {e}")
+                raise
+            
+            self._record_usage(response, lease)
+        
+        if trace is not None:
+            trace.provider = response.provider
+            trace.model = response.model
+            self._trace_usage(trace, kwargs, response.usage, response.text)
+        
+        if response.provider != AnthropicProvider.name:
+            logger.info(f"🔀 Served by {response.provider} ({response.model})")
+        return response
+    
+    def _repair_request(
+        self,
+        original: Dict[str, Any],
+        bad_reply: str,
+        error: json.JSONDecodeError
+    ) -> Dict[str, Any]:
+        """
+        Request for the repair model: fix the broken reply into valid JSON.
+        
+        Only the bad reply is sent (not the original prompt), to the small
+        repair model without thinking. An empty reply has nothing to fix,
+        so the original request is simply sent again.
+        """
+        if not bad_reply:
+            return original
+        
+        instruction = (
+            f"The text below was meant to be JSON but is invalid ({error.msg} at char {error.pos}). "
+            "Return the same content as complete, valid JSON only, no markdown. "
+            "Do not add, drop or rewrite any values."
+        )
+        return {
+            "model": self._model_for("repair"),
+            "max_tokens": min(
+                self.budgets.max_output_tokens,
+                int(estimate_tokens(bad_reply) * 1.3) + 256
+            ),
+            "temperature": 0.0,
+            "system": self._build_system_blocks(self._build_system_prompt("json"), None),
+            "messages": [{"role": "user", "content": f"{instruction}\n\n{bad_reply}"}]
+        }
     
     async def generate_with_thinking(
         self,
@@ -9,11 +9,14 @@ Provides:
 SOLID Principle: Dependency Inversion (D)
 """
 
+import asyncio
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from app.services.anthropic_client import AnthropicClient
+from app.services.json_stream import JSONArrayStreamParser
+from app.services.llm_governor import Priority
 
 
 class AIService(ABC):
@@ -24,8 +27,22 @@ class AIService(ABC):
     1. Receive AI client via dependency injection (not hardcoded)
     2. Use consistent logging
     3. Share common error handling patterns
+    
+    Subclasses set `priority` to their scheduling class in the shared
+    LLM governor (interactive work is dispatched before bulk work),
+    `task` to their token budget profile (see token_budget.PROFILES) and
+    `task_class` to pick the model tier (see anthropic_client.TASK_CLASSES).
+    Services whose output is meant to be new on every call (headlines,
+    scripts) set `use_cache = False`: a replayed reply would only repeat
+    the last batch. Idempotent work (routing, analysis, summaries) keeps
+    the response cache.
     """
     
+    priority: Priority = Priority.NORMAL
+    task: Optional[str] = None
+    task_class: str = "generation"
+    use_cache: bool = True
+    
     def __init__(self, ai_client: Optional[AnthropicClient] = None):
         """
         Initialize with an AI client.
@@ -36,13 +53,20 @@ class AIService(ABC):
         self.ai = ai_client or AnthropicClient()
         self.logger = logging.getLogger(self.__class__.__name__)
     
-    async def _generate_json(self, prompt: str, **kwargs) -> Dict[str, Any]:
+    async def _generate_json(
+        self,
+        prompt: str,
+        prefix: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
         """
         Wrapper for AI JSON generation with standardized error handling.
         
         Args:
-            prompt: The prompt to send to AI
+            prompt: The dynamic part of the prompt
+            prefix: Static instructions, sent as a prompt-cached prefix
             **kwargs: Additional arguments for generate()
+                      (e.g. use_cache=False to bypass the response cache)
             
         Returns:
             Parsed JSON response as dict
@@ -51,7 +75,14 @@ class AIService(ABC):
             ValueError: If AI returns invalid response
         """
         try:
-            result = await self.ai.generate(prompt, response_format="json", **kwargs)
+            kwargs.setdefault("priority", self.priority)
+            kwargs.setdefault("task", self.task)
+            kwargs.setdefault("task_class", self.task_class)
+            kwargs.setdefault("service", self.__class__.__name__)
+            kwargs.setdefault("use_cache", self.use_cache)
+            result = await self.ai.generate(
+                prompt, response_format="json", prefix=prefix, **kwargs
+            )
             
             if isinstance(result, dict) and "error" in result:
                 self.logger.error(f"AI returned error: {result.get('error')}")
@@ -63,12 +94,125 @@ class AIService(ABC):
             self.logger.error(f"AI generation error: {e}")
             raise
     
-    async def _generate_text(self, prompt: str, **kwargs) -> str:
+    async def _generate_text(
+        self,
+        prompt: str,
+        prefix: Optional[str] = None,
+        **kwargs
+    ) -> str:
         """
         Wrapper for AI text generation.
+        
+        Identical requests are served from the response cache unless
+        use_cache=False is passed (or set on the service).
         """
         try:
-            return await self.ai.generate(prompt, response_format="text", **kwargs)
+            kwargs.setdefault("priority", self.priority)
+            kwargs.setdefault("task", self.task)
+            kwargs.setdefault("task_class", self.task_class)
+            kwargs.setdefault("service", self.__class__.__name__)
+            kwargs.setdefault("use_cache", self.use_cache)
+            return await self.ai.generate(
+                prompt, response_format="text", prefix=prefix, **kwargs
+            )
         except Exception as e:
             self.logger.error(f"AI text generation error: {e}")
             raise
+    
+    async def _generate_json_bulk(
+        self,
+        prompts: Dict[str, str],
+        prefix: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Offline JSON generation of many prompts via the Message Batches API.
+        
+        Args:
+            prompts: custom_id -> dynamic prompt (use the item IDs so results
+                     map straight back to items)
+            prefix: Static instructions shared by every prompt
+            **kwargs: Additional arguments for generate_bulk()
+            
+        Returns:
+            custom_id -> parsed JSON. Items that failed in the batch are
+            retried once through the normal interactive path; items that
+            still fail are left out (and logged).
+        """
+        kwargs.setdefault("task", self.task)
+        kwargs.setdefault("task_class", self.task_class)
+        kwargs.setdefault("service", self.__class__.__name__)
+        kwargs.setdefault("use_cache", self.use_cache)
+        results = await self.ai.generate_bulk(
+            prompts, response_format="json", prefix=prefix, **kwargs
+        )
+        
+        parsed: Dict[str, Any] = {}
+        failed: List[str] = []
+        for custom_id, result in results.items():
+            if isinstance(result, dict) and "error" in result:
+                self.logger.warning(f"Bulk item {custom_id} failed: {result.get('error')}")
+                failed.append(custom_id)
+            else:
+                parsed[custom_id] = result
+        
+        if failed:
+            self.logger.info(f"Retrying {len(failed)} failed bulk items directly")
+            retried = await asyncio.gather(
+                *(self._generate_json(prompts[custom_id], prefix=prefix, **kwargs) for custom_id in failed),
+                return_exceptions=True
+            )
+            for custom_id, result in zip(failed, retried):
+                if isinstance(result, Exception):
+                    self.logger.error(f"Bulk item {custom_id} dropped: {result}")
+                else:
+                    parsed[custom_id] = result
+        
+        return parsed
+    
+    async def _stream_json_items(
+        self,
+        prompt: str,
+        key: Optional[str] = None,
+        prefix: Optional[str] = None,
+        **kwargs
+    ) -> AsyncIterator[Any]:
+        """
+        Stream a JSON array reply, yielding each element once it is complete.
+        
+        Args:
+            prompt: The dynamic part of the prompt
+            key: Top-level key holding the array (None = reply is the array)
+            prefix: Static instructions, sent as a prompt-cached prefix
+            **kwargs: Additional arguments for stream()/generate()
+            
+        If the stream yields nothing usable (API error before the first
+        element, or malformed JSON), falls back to _generate_json(), which
+        has retries and self-correction.
+        """
+        kwargs.setdefault("priority", self.priority)
+        kwargs.setdefault("task", self.task)
+        kwargs.setdefault("task_class", self.task_class)
+        kwargs.setdefault("service", self.__class__.__name__)
+        kwargs.setdefault("use_cache", self.use_cache)
+        parser = JSONArrayStreamParser(key)
+        
+        try:
+            async for chunk in self.ai.stream(
+                prompt, response_format="json", prefix=prefix, **kwargs
+            ):
+                for element in parser.feed(chunk):
+                    yield element
+        except Exception as e:
+            if parser.emitted:
+                self.logger.error(f"AI stream broke after {parser.emitted} items: {e}")
+                raise
+            self.logger.warning(f"AI stream failed, falling back to full generation: {e}")
+        
+        if parser.emitted:
+            return
+        
+        result = await self._generate_json(prompt, prefix=prefix, **kwargs)
+        items = result.get(key, []) if key and isinstance(result, dict) else result
+        for element in items if isinstance(items, list) else []:
+            yield element
@@ -0,0 +1,105 @@
+"""
+Bulk Jobs - Background runs of offline (Message Batches) work.
+
+A Message Batch can take up to llm_batch_timeout_seconds (24h) to end;
+no HTTP client or proxy waits that long, and a disconnect would lose the
+result. Bulk endpoints therefore prepare their batches, start the job
+here and return at once; clients poll /producer/batch/{id}.
+
+While a job runs, batch.bulk_job names the step (headlines / scripts /
+visuals); it is cleared when the job ends. A failed job marks its
+batches FAILED with the error.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+from app.models.batch import BatchResponse, BatchState
+from app.services.batch_repository import BatchRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+class BulkJobs:
+    """
+    Fire-and-forget runner for offline bulk steps.
+
+    Usage:
+        jobs.start("scripts", [batch], lambda: writer.write_scripts_bulk(batch.id))
+        return batch   # batch.bulk_job == "scripts" until the job ends
+    """
+
+    def __init__(self, batch_repo: BatchRepository):
+        """
+        Args:
+            batch_repo: Repository holding the batches the jobs fill in
+        """
+        self.batch_repo = batch_repo
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats: Dict[str, int] = {
+            "started": 0,
+            "completed": 0,
+            "failed": 0,
+        }
+
+    def start(
+        self,
+        step: str,
+        batches: List[BatchResponse],
+        job: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """
+        Mark the batches and run job() in the background.
+
+        Args:
+            step: What the job produces (shown as batch.bulk_job)
+            batches: Batches the job writes to
+            job: Creates the coroutine doing the work
+        """
+        for batch in batches:
+            batch.bulk_job = step
+            self.batch_repo.save(batch)
+
+        batch_ids = [batch.id for batch in batches]
+        task = asyncio.ensure_future(self._run(step, batch_ids, job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.stats["started"] += 1
+        logger.info(f"📦 Bulk {step} job started for {len(batch_ids)} batch(es)")
+
+    def running(self) -> int:
+        """Number of jobs still running."""
+        return len(self._tasks)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "running": self.running()}
+
+    async def close(self) -> None:
+        """Cancel running jobs (on shutdown)."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, step: str, batch_ids: List[str], job: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await job()
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"❌ Bulk {step} job failed: {e}")
+            for batch_id in batch_ids:
+                batch = self.batch_repo.get(batch_id)
+                if batch is not None:
+                    batch.state = BatchState.FAILED
+                    batch.errors.append(f"Bulk {step} job failed: {e}")
+                    self.batch_repo.save(batch)
+        else:
+            self.stats["completed"] += 1
+            logger.info(f"✅ Bulk {step} job finished for {len(batch_ids)} batch(es)")
+        finally:
+            for batch_id in batch_ids:
+                batch = self.batch_repo.get(batch_id)
+                if batch is not None and batch.bulk_job is not None:
+                    batch.bulk_job = None
+                    self.batch_repo.save(batch)
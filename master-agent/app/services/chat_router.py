@@ -6,14 +6,23 @@ SOLID Principle: Single Responsibility (S)
 - Routes to appropriate actions based on AI analysis
 """
 
+import json
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 
+from app.config import get_settings
+from app.services.anthropic_client import AnthropicClient
 from app.services.base.ai_service import AIService
+from app.services.intent_classifier import IntentClassifier, IntentMatch, get_intent_classifier
+from app.services.json_repair import repair_json
+from app.services.json_stream import JSONStringStreamParser
+from app.services.llm_governor import Priority
 
 
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
 
 # System prompt for the router agent
 ROUTER_SYSTEM_PROMPT = """You are the Master Agent, an expert AI Producer.
@@ -31,6 +40,8 @@ CRITICAL RULES:
 1. **LANGUAGE**: ALWAYS reply in the user's language (likely Russian). Do NOT switch to English.
 2. **DECISIVENESS**: Do not ask for confirmation if the intent is clear. If user wants headlines, JUST GENERATE THEM.
 3. "Make headlines on any topic" -> Call `start_batch(topic=None)`. Do not ask "what topic?".
+4. **CONTEXT**: The context may include the current batch and the conversation so far.
+   Use it to resolve references ("same topic", "5 more", "the second one").
 
 Analyze the user's message and decide which tool to call.
 If no tool matches, just reply conversationally.
@@ -43,21 +54,50 @@ OUTPUT FORMAT (JSON):
 }
 """
 
+# Replies for decisions made without the LLM
+FAST_PATH_REPLIES = {
+    "start_batch": "Принято! Генерирую заголовки...",
+    "approve_headlines": "Принято! Передаю выбранные заголовки сценаристу...",
+    "start_production": "Запускаю производство видео...",
+}
+
 
 class ChatRouter(AIService):
     """
     Service for routing user chat messages to appropriate actions.
     
     Responsibilities:
-    1. Analyze user intent using AI
+    1. Analyze user intent (locally if obvious, otherwise using AI)
     2. Extract action and arguments
     3. Return structured routing decision
     """
     
+    priority = Priority.INTERACTIVE
+    task = "router"
+    task_class = "router"
+    
+    def __init__(
+        self,
+        ai_client: Optional[AnthropicClient] = None,
+        intent: Optional[IntentClassifier] = None
+    ):
+        """
+        Args:
+            ai_client: Injected AI client. If None, creates default instance.
+            intent: Injected local intent classifier. If None, uses the
+                    shared one (unless the fast path is disabled in settings).
+        """
+        super().__init__(ai_client)
+        if intent is None and settings.chat_fast_path_enabled:
+            intent = get_intent_classifier()
+        self.intent = intent
+    
     async def route(
         self,
         message: str,
-        batch_id: Optional[str] = None
+        batch_id: Optional[str] = None,
+        context: Optional[str] = None,
+        has_history: bool = False
     ) -> Dict[str, Any]:
         """
         Route a user message to an action.
@@ -65,6 +105,10 @@ class ChatRouter(AIService):
         Args:
             message: User's message
             batch_id: Current batch context (if any)
+            context: Bounded conversation history and batch digest
+                     (see ConversationStore.render / batch_digest)
+            has_history: The session has earlier turns; messages that may
+                         depend on them skip the local fast path
             
         Returns:
             Dict with:
@@ -72,21 +116,80 @@ class ChatRouter(AIService):
             - action: Action to take (or None)
             - args: Action arguments (or None)
         """
-        prompt = f"""{ROUTER_SYSTEM_PROMPT}
-
-Context:
-Batch ID: {batch_id or "None"}
-User Message: "{message}"
-"""
+        if self.intent is not None:
+            match = self.intent.classify(message, has_history)
+            if match is not None:
+                return self._fast_path(match)
+        
+        return await self._route_llm(message, batch_id, context)
+    
+    async def route_stream(
+        self,
+        message: str,
+        batch_id: Optional[str] = None,
+        context: Optional[str] = None,
+        has_history: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Route a user message, streaming the reply while it is generated.
+        Same arguments as route().
+        
+        Yields:
+            {"event": "reply", "delta": str} as reply text arrives, then
+            one {"event": "routing", "data": <route() result>}
+        """
+        if self.intent is not None:
+            match = self.intent.classify(message, has_history)
+            if match is not None:
+                routing = self._fast_path(match)
+                yield {"event": "reply", "delta": routing["reply"]}
+                yield {"event": "routing", "data": routing}
+                return
         
+        parser = JSONStringStreamParser("reply")
         try:
-            response = await self._generate_json(prompt)
-            
-            return {
-                "reply": response.get("reply"),
-                "action": response.get("action"),
-                "args": response.get("args") or {}
-            }
+            async for chunk in self.ai.stream(
+                self._build_prompt(message, batch_id, context),
+                response_format="json",
+                prefix=ROUTER_SYSTEM_PROMPT,
+                priority=self.priority,
+                task=self.task,
+                task_class=self.task_class,
+                service=self.__class__.__name__
+            ):
+                delta = parser.feed(chunk)
+                if delta:
+                    yield {"event": "reply", "delta": delta}
+        except Exception as e:
+            if not parser.value:
+                # Nothing shown yet: the non-streaming path has retries
+                logger.warning(f"Chat stream failed before the reply, falling back: {e}")
+                yield {"event": "routing", "data": await self._route_llm(message, batch_id, context)}
+                return
+            logger.error(f"Chat stream broke mid-reply: {e}")
+        
+        try:
+            response = repair_json(parser.text).value
+        except json.JSONDecodeError:
+            response = None
+        if not isinstance(response, dict):
+            # Keep what the user already saw, but take no action
+            response = {"reply": parser.value, "action": None, "args": None}
+        
+        yield {"event": "routing", "data": self._to_routing(message, response)}
+    
+    async def _route_llm(
+        self,
+        message: str,
+        batch_id: Optional[str],
+        context: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Routing decision from the LLM (non-streaming, with retries)."""
+        try:
+            response = await self._generate_json(
+                self._build_prompt(message, batch_id, context), prefix=ROUTER_SYSTEM_PROMPT
+            )
+            return self._to_routing(message, response)
             
         except Exception as e:
             logger.error(f"Chat routing error: {e}")
@@ -96,6 +199,34 @@ User Message: "{message}"
                 "args": {}
             }
     
+    def _build_prompt(self, message: str, batch_id: Optional[str], context: Optional[str] = None) -> str:
+        history = f"{context}\n" if context else ""
+        return f"""Context:
+Batch ID: {batch_id or "None"}
+{history}User Message: "{message}"
+"""
+    
+    def _to_routing(self, message: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize an LLM routing reply (and log it as training data)."""
+        # LLM decisions are the training data for the local classifier
+        if self.intent is not None:
+            self.intent.record(message, response.get("action"))
+        
+        return {
+            "reply": response.get("reply"),
+            "action": response.get("action"),
+            "args": response.get("args") or {}
+        }
+    
+    def _fast_path(self, match: IntentMatch) -> Dict[str, Any]:
+        """Routing result for a locally resolved intent."""
+        logger.info(f"⚡ Fast-path intent: {match.action} {match.args} ({match.source}, {match.confidence})")
+        return {
+            "reply": FAST_PATH_REPLIES[match.action],
+            "action": match.action,
+            "args": match.args
+        }
+    
     def is_action(self, routing_result: Dict, action_name: str) -> bool:
         """Check if routing result matches a specific action."""
         return routing_result.get("action") == action_name
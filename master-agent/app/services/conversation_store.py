@@ -0,0 +1,256 @@
+"""
+Conversation Store - Bounded per-session chat memory.
+
+The router prompt gets the conversation, but its size must not grow with
+the session. Each session keeps:
+- recent turns verbatim, within settings.chat_history_tokens
+- older turns folded into a rolling summary (capped at
+  settings.chat_summary_tokens), refreshed only when turns are folded,
+  so it is computed once and reused by every later prompt
+
+Batch state goes in as batch_digest(): a few lines, never the whole
+BatchResponse.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from app.config import get_settings
+from app.models.batch import BatchResponse, ItemStatus
+from app.services.token_counter import estimate_tokens
+
+
+logger = logging.getLogger(__name__)
+
+# A single turn never takes more than this share of the history budget
+MAX_TURN_SHARE = 0.25
+
+# Headlines listed in a batch digest
+DIGEST_HEADLINES = 5
+DIGEST_HEADLINE_CHARS = 80
+
+
+@dataclass
+class Turn:
+    """One chat message."""
+    role: str                          # user / assistant
+    text: str
+    tokens: int = 0
+
+    def __post_init__(self):
+        if not self.tokens:
+            self.tokens = estimate_tokens(self.text)
+
+
+@dataclass
+class Conversation:
+    """Memory of one chat session."""
+    session_id: str
+    turns: List[Turn] = field(default_factory=list)
+    summary: str = ""
+    folded_turns: int = 0
+    updated_at: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    @property
+    def verbatim_tokens(self) -> int:
+        return sum(turn.tokens for turn in self.turns)
+
+
+# (previous summary, turns to fold) -> new summary
+Summarizer = Callable[[str, List[Turn]], Awaitable[str]]
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens (keeps the start)."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # estimate_tokens is ~chars/2.5 for Russian; trim proportionally
+    keep = max(1, int(len(text) * max_tokens / max(1, estimate_tokens(text))))
+    return text[:keep].rstrip() + "…"
+
+
+def batch_digest(batch: BatchResponse) -> str:
+    """
+    Compact description of a batch for the router prompt.
+
+    Args:
+        batch: Full batch
+
+    Returns:
+        A few lines: state, item counts, the first headlines
+    """
+    approved = sum(1 for h in batch.headlines if h.status == ItemStatus.APPROVED)
+    rejected = sum(1 for h in batch.headlines if h.status == ItemStatus.REJECTED)
+    videos = sum(1 for v in batch.visuals if v.final_video_url)
+
+    lines = [
+        f"Batch {batch.id}: state {batch.state.value}, "
+        f"{len(batch.headlines)} headlines ({approved} approved, {rejected} rejected), "
+        f"{len(batch.scripts)} scripts, {videos}/{len(batch.visuals)} videos ready"
+    ]
+    for headline in batch.headlines[:DIGEST_HEADLINES]:
+        text = headline.headline
+        if len(text) > DIGEST_HEADLINE_CHARS:
+            text = text[:DIGEST_HEADLINE_CHARS].rstrip() + "…"
+        lines.append(f"- [{headline.status.value}] {text}")
+    if len(batch.headlines) > DIGEST_HEADLINES:
+        lines.append(f"- ... {len(batch.headlines) - DIGEST_HEADLINES} more")
+    if batch.errors:
+        lines.append(f"Errors: {len(batch.errors)}")
+    return "\n".join(lines)
+
+
+class ConversationStore:
+    """
+    In-memory session store (LRU over sessions, idle TTL).
+
+    Usage:
+        store.append(session_id, "user", message)
+        history = store.render(session_id)      # bounded prompt block
+        store.schedule_compaction(session_id, summarizer)
+    """
+
+    def __init__(
+        self,
+        history_tokens: int = 1200,
+        summary_tokens: int = 250,
+        max_sessions: int = 1000,
+        ttl_seconds: float = 24 * 3600
+    ):
+        """
+        Args:
+            history_tokens: Budget for verbatim turns in the prompt
+            summary_tokens: Cap for the rolling summary
+            max_sessions: Least recently used sessions beyond this are dropped
+            ttl_seconds: Sessions idle for longer are dropped
+        """
+        self.history_tokens = history_tokens
+        self.summary_tokens = summary_tokens
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats: Dict[str, int] = {
+            "compactions": 0,
+            "summary_failures": 0,
+            "evicted": 0,
+        }
+
+    def get(self, session_id: str) -> Conversation:
+        """Session memory (created on first use)."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            conversation = self._sessions.get(session_id)
+            if conversation is None:
+                conversation = Conversation(session_id)
+                self._sessions[session_id] = conversation
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.stats["evicted"] += 1
+            self._sessions.move_to_end(session_id)
+            conversation.updated_at = now
+            return conversation
+
+    def append(self, session_id: str, role: str, text: str) -> None:
+        """Add a turn. Oversized turns are truncated."""
+        max_turn = max(1, int(self.history_tokens * MAX_TURN_SHARE))
+        self.get(session_id).turns.append(Turn(role, _truncate(text.strip(), max_turn)))
+
+    def render(self, session_id: str) -> str:
+        """
+        Conversation block for the prompt: the summary, then the newest
+        turns that fit the history budget. Empty for a new session.
+        """
+        conversation = self.get(session_id)
+        lines: List[str] = []
+        budget = self.history_tokens
+        for turn in reversed(conversation.turns):
+            if turn.tokens > budget:
+                break
+            budget -= turn.tokens
+            lines.append(f"{turn.role}: {turn.text}")
+        lines.reverse()
+
+        if conversation.summary:
+            lines.insert(0, f"(Earlier: {conversation.summary})")
+        return "\n".join(lines)
+
+    def schedule_compaction(self, session_id: str, summarize: Summarizer) -> None:
+        """Run compact() in the background (the reply does not wait for it)."""
+        if self.get(session_id).verbatim_tokens <= self.history_tokens:
+            return
+        task = asyncio.ensure_future(self.compact(session_id, summarize))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def compact(self, session_id: str, summarize: Summarizer) -> bool:
+        """
+        Fold the oldest turns into the summary once the verbatim turns
+        exceed the history budget, keeping the newest half of the budget.
+
+        Returns:
+            True if turns were folded
+        """
+        conversation = self.get(session_id)
+        async with conversation.lock:
+            if conversation.verbatim_tokens <= self.history_tokens:
+                return False
+
+            keep_tokens = self.history_tokens // 2
+            split = len(conversation.turns)
+            kept = 0
+            while split > 0 and kept + conversation.turns[split - 1].tokens <= keep_tokens:
+                split -= 1
+                kept += conversation.turns[split].tokens
+            folded = conversation.turns[:split]
+
+            try:
+                summary = await summarize(conversation.summary, folded)
+            except Exception as e:
+                # Keep going without the model: a plain transcript excerpt
+                logger.warning(f"Conversation summary failed, using excerpt: {e}")
+                self.stats["summary_failures"] += 1
+                summary = " ".join(
+                    [conversation.summary] + [f"{t.role}: {t.text}" for t in folded]
+                ).strip()
+
+            # Turns appended while summarizing are after `split`, untouched
+            conversation.turns = conversation.turns[split:]
+            conversation.summary = _truncate(summary.strip(), self.summary_tokens)
+            conversation.folded_turns += len(folded)
+            self.stats["compactions"] += 1
+            logger.info(f"🗜️ Folded {len(folded)} turns of session {session_id[:12]} into the summary")
+            return True
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "sessions": len(self._sessions)}
+
+    def _expire(self, now: float) -> None:
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.updated_at <= self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+            self.stats["evicted"] += 1
+
+
+@lru_cache()
+def get_conversation_store() -> ConversationStore:
+    """Get the process-wide session store."""
+    settings = get_settings()
+    return ConversationStore(
+        history_tokens=settings.chat_history_tokens,
+        summary_tokens=settings.chat_summary_tokens,
+        max_sessions=settings.chat_max_sessions,
+        ttl_seconds=settings.chat_session_ttl_seconds
+    )
@@ -0,0 +1,55 @@
+"""
+Conversation Summarizer Service - Rolling summaries of chat sessions.
+
+SOLID Principle: Single Responsibility (S)
+- This class ONLY condenses old chat turns for the ConversationStore
+- Runs on the fast model; the summary is reused by every later prompt
+"""
+
+from typing import List
+
+from app.services.base.ai_service import AIService
+from app.services.conversation_store import Turn
+from app.services.llm_governor import Priority
+
+
+SUMMARY_SYSTEM_PROMPT = """You maintain a running summary of a chat between a user and the Master Agent,
+an AI producer of short viral videos.
+
+Merge the previous summary with the new messages into ONE short paragraph
+(at most 4 sentences). Keep what matters for later requests: chosen topics,
+counts, preferences and rejections, batch IDs and decisions. Drop greetings
+and small talk. Write in the language of the conversation.
+Reply with the summary text only."""
+
+
+class ConversationSummarizer(AIService):
+    """
+    Service for folding chat turns into a rolling summary.
+    
+    Responsibilities:
+    1. Merge the previous summary with the turns being folded
+    2. Keep it short enough for the router prompt
+    """
+    
+    priority = Priority.NORMAL
+    task = "summary"
+    task_class = "short"
+    
+    async def summarize(self, previous: str, turns: List[Turn]) -> str:
+        """
+        Args:
+            previous: Current summary ("" if none)
+            turns: Oldest turns being removed from the verbatim history
+            
+        Returns:
+            New summary text
+        """
+        transcript = "\n".join(f"{turn.role}: {turn.text}" for turn in turns)
+        prompt = f"""Previous summary:
+{previous or "(none)"}
+
+New messages:
+{transcript}
+"""
+        return await self._generate_text(prompt, prefix=SUMMARY_SYSTEM_PROMPT, temperature=0.2)
@@ -1,32 +1,35 @@
 """
-Gemini Client - Integration with Google Gemini 2.0 Flash Thinking
+Gemini Client - Integration with Google Gemini via the google-genai SDK
 
 Handles all AI interactions with structured output (JSON mode).
 """
 
 import json
+import logging
 from typing import Any, Dict, Optional, Union, List
-import google.generativeai as genai
 
-from app.config import get_settings
+from app.services.json_repair import repair_json
+from app.services.llm_providers import GeminiProvider
 
-settings = get_settings()
+
+logger = logging.getLogger("gemini_client")
 
 
 class GeminiClient:
     """
-    Client for Google Gemini 2.0 Flash Thinking model.
+    Client for Google Gemini (async, google-genai).
     
     Optimized for:
     - JSON structured output
     - Reasoning and thinking tasks
     - Content generation with explanations
+    
+    Uses the same GeminiProvider the LLM router can fall back to.
     """
     
-    def __init__(self):
-        genai.configure(api_key=settings.gemini_api_key)
-        # Using the experimental 2.0 model as requested/configured originally
-        self.model = genai.GenerativeModel('gemini-2.0-flash-thinking-exp-01-21')
+    def __init__(self, provider: Optional[GeminiProvider] = None):
+        self.provider = provider or GeminiProvider()
+        self.model = self.provider.model
     
     async def generate(
         self,
@@ -47,46 +50,29 @@ class GeminiClient:
         Returns:
             Parsed JSON object/array or raw text
         """
-        generation_config = genai.GenerationConfig(
-            temperature=temperature,
-            max_output_tokens=max_tokens,
-        )
-        
-        # Add JSON instruction if needed
-        if response_format == "json":
-            prompt = f"{prompt}\n\nIMPORTANT: Respond ONLY with valid JSON, no markdown code blocks."
+        system = "Respond ONLY with valid JSON, no markdown code blocks." if response_format == "json" else ""
         
         try:
-            response = await self.model.generate_content_async(
-                prompt,
-                generation_config=generation_config
-            )
-            
-            text = response.text.strip()
-            
-            # Parse JSON if requested
-            if response_format == "json":
-                # Clean up markdown if present
-                if text.startswith("```"):
-                    lines = text.split("\n")
-                    # Handle case where first line is ```json and last is ```
-                    if lines[0].strip().startswith("```"):
-                        lines = lines[1:]
-                    if lines[-1].strip() == "```":
-                        lines = lines[:-1]
-                    text = "\n".join(lines)
-                
-                return json.loads(text)
-            
+            response = await self.provider.complete({
+                "system": system,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": temperature,
+                "max_tokens": max_tokens
+            })
+        except Exception as e:
+            logger.error(f"❌ Gemini Error: {e}")
+            raise
+        
+        text = response.text
+        if response_format != "json":
             return text
-            
+        
+        try:
+            return repair_json(text).value
         except json.JSONDecodeError as e:
-            print(f"[Gemini] JSON parse error: {e}")
-            print(f"[Gemini] Raw response: {text[:500]}")
+            logger.error(f"❌ Gemini JSON parse error: {e}")
+            logger.debug(f"Raw response: {text[:500]}")
             return {"error": "JSON parse failed", "raw": text}
-        except Exception as e:
-            print(f"[Gemini] Error: {e}")
-            raise
     
     async def generate_with_thinking(
         self,
@@ -6,10 +6,11 @@ SOLID Principle: Single Responsibility (S)
 - Uses trends to create compelling headlines
 """
 
-import json
+import asyncio
+import re
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from app.models.batch import (
     BatchResponse,
@@ -17,11 +18,32 @@ from app.models.batch import (
     HeadlineItem,
     ItemStatus,
 )
-from app.prompts.producer_prompts import TREND_ANALYSIS_PROMPT
+from app.config import get_settings
+from app.prompts.producer_prompts import (
+    HEADLINE_AVOID_SUFFIX,
+    HEADLINE_SHARD_HOOKS,
+    HEADLINE_SHARD_SUFFIX,
+    TOPIC_HEADLINES_PROMPT,
+    TOPIC_HEADLINES_TASK,
+    TOPIC_TRENDS_SUFFIX,
+    TREND_ANALYSIS_PROMPT,
+    TREND_ANALYSIS_TASK,
+    TREND_PATTERNS_PROMPT,
+)
 from app.services.base.ai_service import AIService
+from app.services.headline_index import HeadlineIndex, get_headline_index
+from app.services.headline_pool import HeadlinePool, get_headline_pool
+from app.services.llm_governor import Priority
+from app.services.pattern_analyzer import PatternAnalyzer
 from app.services.trend_analyzer import TrendAnalyzer
+from app.services.trend_digest import TrendDigest, get_trend_digest
 from app.services.batch_repository import BatchRepository
 
+settings = get_settings()
+
+# Marks the end of one shard's stream in generate_iter()
+_SHARD_DONE = object()
+
 
 class HeadlineGenerator(AIService):
     """
@@ -33,8 +55,16 @@ class HeadlineGenerator(AIService):
     3. Generate headline candidates
     """
     
+    priority = Priority.BULK
+    task = "headlines"
+    use_cache = False
+    
     def __init__(self, trend_analyzer: Optional[TrendAnalyzer] = None, 
                  batch_repo: Optional[BatchRepository] = None,
+                 headline_index: Optional[HeadlineIndex] = None,
+                 trend_digest: Optional[TrendDigest] = None,
+                 pattern_analyzer: Optional[PatternAnalyzer] = None,
+                 headline_pool: Optional[HeadlinePool] = None,
                  **kwargs):
         """
         Initialize with dependencies.
@@ -42,10 +72,27 @@ class HeadlineGenerator(AIService):
         Args:
             trend_analyzer: Injected trend analyzer
             batch_repo: Injected batch repository
+            headline_index: Injected near-duplicate index. If None, uses the
+                            shared one (unless dedupe is disabled in settings).
+            trend_digest: Injected token-budgeted trends formatter
+            pattern_analyzer: Injected per-item analyzer. If None, one is
+                              created (unless disabled in settings).
+            headline_pool: Injected hot-topic reserve. If None, uses the
+                           shared one (unless disabled in settings).
         """
         super().__init__(**kwargs)
         self.trend_analyzer = trend_analyzer or TrendAnalyzer()
         self.batch_repo = batch_repo or BatchRepository()
+        if headline_index is None and settings.headline_dedupe_enabled:
+            headline_index = get_headline_index()
+        self.index = headline_index
+        self.digest = trend_digest or get_trend_digest()
+        if pattern_analyzer is None and settings.pattern_analysis_enabled:
+            pattern_analyzer = PatternAnalyzer(ai_client=self.ai)
+        self.patterns = pattern_analyzer
+        if headline_pool is None and settings.headline_pool_enabled:
+            headline_pool = get_headline_pool()
+        self.pool = headline_pool
     
     async def generate(
         self,
@@ -57,6 +104,15 @@ class HeadlineGenerator(AIService):
         """
         Generate headlines for a new batch.
         
+        Counts above settings.headline_shard_size are split into parallel
+        shards (see _generate_sharded); a failed shard is recorded in
+        batch.errors instead of failing the batch. Near-duplicates of each
+        other or of earlier batches are dropped and topped up once.
+        
+        Topic requests are served from the headline pool when it holds
+        enough headlines for the topic; the pool is refilled in the
+        background either way.
+        
         Args:
             count: Number of headlines to generate
             days: Look back period for trends
@@ -66,21 +122,230 @@ class HeadlineGenerator(AIService):
         Returns:
             New batch with generated headlines
         """
-        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
-        
-        # Get prompt based on topic or trends
-        prompt = await self._build_prompt(count, days, min_views, topic)
+        batch_id = self.new_batch_id()
+        shards = self._shard_counts(count)
+        errors: List[str] = []
+        pooled = self._take_pooled(topic, count)
         
-        # Generate headlines via AI
-        result = await self._generate_json(prompt)
+        if pooled is not None:
+            headlines = pooled
+        elif len(shards) == 1:
+            # Get prompt based on topic or trends
+            prefix, prompt = await self._build_prompt(count, days, min_views, topic)
+            
+            # Generate headlines via AI
+            result = await self._generate_json(prompt, prefix=prefix, items=count)
+            
+            # Parse response into HeadlineItems
+            headlines = self._parse_headlines(result)
+        else:
+            headlines, errors = await self._generate_sharded(shards, days, min_views, topic)
         
-        # Parse response into HeadlineItems
-        headlines = self._parse_headlines(result)
+        generated = len(headlines)
+        headlines = await self._drop_duplicates(headlines, count, days, min_views, topic)
         
         # Create and save batch
-        batch = BatchResponse(
+        batch = self._new_batch(batch_id, headlines, BatchState.REVIEW_HEADLINES)
+        batch.errors.extend(errors)
+        if generated and not headlines:
+            batch.state = BatchState.FAILED
+            batch.errors.append(f"All {generated} generated headlines duplicate earlier ones")
+        
+        self.batch_repo.save(batch)
+        await self._index(batch)
+        self.logger.info(f"Generated {len(headlines)} headlines for batch {batch_id}")
+        
+        return batch
+    
+    async def generate_iter(
+        self,
+        count: int = 10,
+        days: int = 7,
+        min_views: int = 100000,
+        topic: Optional[str] = None,
+        batch_id: Optional[str] = None
+    ) -> AsyncIterator[HeadlineItem]:
+        """
+        Streaming variant of generate(): yields each headline as soon as
+        Claude has finished writing it.
+        
+        Same pipeline as generate(), so a request gives the same kind of
+        batch on both paths: topic requests are served from the headline
+        pool when it holds enough; large counts are generated as parallel
+        shards whose streams are merged as items arrive (a failed shard is
+        recorded in batch.errors); duplicates, within the batch or of
+        earlier batches, are dropped and topped up once.
+        
+        The batch is saved in PLANNING state before the first headline
+        (so get_batch() sees it fill up) and moves to REVIEW_HEADLINES when
+        the stream ends, also when the client disconnects early (FAILED if
+        no headline was accepted). IDs are assigned in arrival order (hl_1..hl_N).
+        
+        Args:
+            batch_id: Optional pre-allocated ID (see new_batch_id())
+        """
+        batch = self._new_batch(batch_id or self.new_batch_id(), [], BatchState.PLANNING)
+        self.batch_repo.save(batch)
+        seen: Dict[str, None] = {}
+        dropped: List[str] = []
+        generated = 0
+        
+        async def accept(headline: Optional[HeadlineItem]) -> Optional[HeadlineItem]:
+            """The headline, renumbered and saved, unless it is a duplicate or over count."""
+            nonlocal generated
+            if headline is None or len(batch.headlines) >= count:
+                return None
+            generated += 1
+            key = self._headline_key(headline.headline)
+            if key in seen or not await self._is_new(headline, batch.id):
+                dropped.append(headline.headline)
+                return None
+            seen[key] = None
+            headline = headline.model_copy(update={"id": f"hl_{len(batch.headlines) + 1}"})
+            batch.headlines.append(headline)
+            batch.total_items = len(batch.headlines)
+            self.batch_repo.save(batch)
+            return headline
+        
+        candidates = self._stream_candidates(count, days, min_views, topic, batch.errors)
+        topup: Optional[AsyncIterator[Dict[str, Any]]] = None
+        failed = False
+        try:
+            async for candidate in candidates:
+                headline = await accept(candidate)
+                if headline is not None:
+                    yield headline
+                if len(batch.headlines) >= count:
+                    break
+            # Stops (cancels) the shard streams still running
+            await candidates.aclose()
+            
+            missing = count - len(batch.headlines)
+            if dropped and missing > 0 and settings.headline_dedupe_topup:
+                self.logger.info(f"Dropped {len(dropped)} near-duplicate headlines, requesting {missing} more")
+                avoid = [h.headline for h in batch.headlines] + dropped
+                try:
+                    prefix, prompt = await self._build_prompt(missing, days, min_views, topic)
+                    prompt += HEADLINE_AVOID_SUFFIX.format(headlines="\n".join(f"- {text}" for text in avoid))
+                    topup = self._stream_json_items(
+                        prompt, key="generated_headlines", prefix=prefix, items=missing
+                    )
+                    async for item in topup:
+                        headline = await accept(self._parse_headline(item))
+                        if headline is not None:
+                            yield headline
+                        if len(batch.headlines) >= count:
+                            break
+                except Exception as e:
+                    # The batch is still usable, just smaller
+                    self.logger.warning(f"Headline top-up failed: {e}")
+        except Exception as e:
+            failed = True
+            batch.errors.append(str(e))
+            raise
+        finally:
+            # Also runs when the client disconnects (GeneratorExit) or the
+            # task is cancelled: the batch must not stay in PLANNING
+            await candidates.aclose()
+            if topup is not None:
+                await topup.aclose()
+            
+            if failed:
+                batch.state = BatchState.FAILED
+            elif generated and not batch.headlines:
+                batch.state = BatchState.FAILED
+                batch.errors.append(f"All {generated} generated headlines duplicate earlier ones")
+            elif not batch.headlines:
+                batch.state = BatchState.FAILED
+                batch.errors.append("No headlines generated before the stream ended")
+            else:
+                batch.state = BatchState.REVIEW_HEADLINES
+            self.batch_repo.save(batch)
+            self.logger.info(f"Streamed {len(batch.headlines)} headlines for batch {batch.id}")
+    
+    def begin_bulk(self, topics: List[str]) -> List[BatchResponse]:
+        """
+        Save one empty PLANNING batch per topic, for clients to poll
+        while generate_bulk(batch_ids=...) fills them in.
+        """
+        batches = [self._new_batch(self.new_batch_id(), [], BatchState.PLANNING) for _ in topics]
+        for batch in batches:
+            self.batch_repo.save(batch)
+        return batches
+    
+    async def generate_bulk(
+        self,
+        topics: List[str],
+        count: int = 10,
+        batch_ids: Optional[List[str]] = None
+    ) -> List[BatchResponse]:
+        """
+        Offline variant for overnight runs: one batch per topic, all
+        generated through a single Message Batches submission.
+        
+        Args:
+            topics: Topics to generate headlines for
+            count: Headlines per topic
+            batch_ids: IDs from begin_bulk(), one per topic (default: new IDs)
+            
+        Returns:
+            One batch per topic, in order (FAILED if its request failed)
+        """
+        contexts = await asyncio.gather(
+            *(self._topic_context(topic, settings.default_trend_days) for topic in topics)
+        )
+        prompts = {
+            f"topic_{i}": TOPIC_HEADLINES_TASK.format(count=count, topic=topic) + context
+            for i, (topic, context) in enumerate(zip(topics, contexts))
+        }
+        results = await self._generate_json_bulk(
+            prompts, prefix=TOPIC_HEADLINES_PROMPT, items=count
+        )
+        
+        batches = []
+        for i, topic in enumerate(topics):
+            result = results.get(f"topic_{i}")
+            headlines = self._parse_headlines(result) if isinstance(result, dict) else []
+            headlines, _ = await self._filter_new(headlines)
+            
+            batch_id = batch_ids[i] if batch_ids else self.new_batch_id()
+            batch = self._new_batch(batch_id, self._renumber(headlines), BatchState.REVIEW_HEADLINES)
+            if not headlines:
+                batch.state = BatchState.FAILED
+                batch.errors.append(f"No headlines generated for topic: {topic}")
+            self.batch_repo.save(batch)
+            await self._index(batch)
+            batches.append(batch)
+        
+        self.logger.info(f"Bulk-generated headlines for {len(topics)} topics")
+        return batches
+    
+    async def pool_headlines(self, topic: str, count: int) -> List[HeadlineItem]:
+        """
+        Fresh headlines for the pool (see HeadlinePool.refill). Duplicates
+        of indexed headlines are dropped; nothing is indexed until a batch
+        takes them.
+        """
+        headlines, _ = await self._generate_sharded(
+            self._shard_counts(count), settings.default_trend_days, settings.default_min_views, topic
+        )
+        kept, _ = await self._filter_new(headlines)
+        return kept
+    
+    @staticmethod
+    def new_batch_id() -> str:
+        """Allocate a fresh batch ID."""
+        return f"batch_{uuid.uuid4().hex[:12]}"
+    
+    def _new_batch(
+        self,
+        batch_id: str,
+        headlines: List[HeadlineItem],
+        state: BatchState
+    ) -> BatchResponse:
+        return BatchResponse(
             id=batch_id,
-            state=BatchState.REVIEW_HEADLINES,
+            state=state,
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow(),
             total_items=len(headlines),
@@ -88,11 +353,261 @@ class HeadlineGenerator(AIService):
             scripts=[],
             visuals=[]
         )
+    
+    def _take_pooled(self, topic: Optional[str], count: int) -> Optional[List[HeadlineItem]]:
+        """Pooled headlines for a topic request (None = generate) and a background refill."""
+        if not topic or self.pool is None:
+            return None
+        headlines = self.pool.take(topic, count)
+        self.pool.schedule_refill(topic, self.pool_headlines)
+        return headlines
+    
+    @staticmethod
+    def _shard_counts(count: int) -> List[int]:
+        """Split a headline count into near-equal shards (one shard if small)."""
+        size = max(1, settings.headline_shard_size)
+        shards = max(1, min(settings.headline_max_shards, -(-count // size)))
+        base, extra = divmod(count, shards)
+        return [base + 1] * extra + [base] * (shards - extra)
+    
+    async def _generate_sharded(
+        self,
+        shards: List[int],
+        days: int,
+        min_views: int,
+        topic: Optional[str]
+    ) -> Tuple[List[HeadlineItem], List[str]]:
+        """
+        Generate shards concurrently and merge them.
+        
+        Each shard gets its own slice of the trends (round-robin, so every
+        slice mixes top and lower performers) and a different hook focus.
+        
+        Returns:
+            (merged, deduplicated headlines; errors of failed shards)
+            
+        Raises:
+            The first shard's error if every shard failed
+        """
+        prefix, prompts = await self._shard_prompts(shards, days, min_views, topic)
+        
+        self.logger.info(f"Generating {sum(shards)} headlines in {len(shards)} parallel shards")
+        results = await asyncio.gather(
+            *(
+                self._generate_json(prompt, prefix=prefix, items=shard_count)
+                for prompt, shard_count in zip(prompts, shards)
+            ),
+            return_exceptions=True
+        )
         
-        self.batch_repo.save(batch)
-        self.logger.info(f"Generated {len(headlines)} headlines for batch {batch_id}")
+        parsed: List[List[HeadlineItem]] = []
+        errors: List[str] = []
+        for i, result in enumerate(results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"Headline shard {i + 1}/{len(shards)} failed: {result}")
+                errors.append(f"Headline shard {i + 1}/{len(shards)} failed: {result}")
+            else:
+                parsed.append(self._parse_headlines(result) if isinstance(result, dict) else [])
         
-        return batch
+        if not parsed:
+            raise results[0]
+        
+        return self._merge_headlines(parsed, sum(shards)), errors
+    
+    async def _shard_prompts(
+        self,
+        shards: List[int],
+        days: int,
+        min_views: int,
+        topic: Optional[str]
+    ) -> Tuple[str, List[str]]:
+        """
+        (static prefix, one task per shard). Each shard gets its own slice
+        of the trends (round-robin, so every slice mixes top and lower
+        performers) and a different hook focus.
+        """
+        if topic:
+            prefix, trends = TOPIC_HEADLINES_PROMPT, []
+            context = await self._topic_context(topic, days)
+        else:
+            prefix = self._trends_prefix()
+            trends = self.digest.select(await self._fetch_trends(days, min_views))
+        
+        prompts = []
+        for i, shard_count in enumerate(shards):
+            if topic:
+                task = TOPIC_HEADLINES_TASK.format(count=shard_count, topic=topic) + context
+            else:
+                task = TREND_ANALYSIS_TASK.format(
+                    count=shard_count,
+                    trends_json=self.digest.render(trends[i::len(shards)] or trends)
+                )
+            prompts.append(task + HEADLINE_SHARD_SUFFIX.format(
+                shard=i + 1,
+                shards=len(shards),
+                hook_type=HEADLINE_SHARD_HOOKS[i % len(HEADLINE_SHARD_HOOKS)]
+            ))
+        return prefix, prompts
+    
+    async def _stream_candidates(
+        self,
+        count: int,
+        days: int,
+        min_views: int,
+        topic: Optional[str],
+        errors: List[str]
+    ) -> AsyncIterator[Optional[HeadlineItem]]:
+        """
+        Headlines for generate_iter() as they become available: pooled
+        ones, a single stream, or parallel shard streams merged in arrival
+        order. Malformed items come through as None.
+        
+        Args:
+            errors: Failed shards are appended here
+            
+        Raises:
+            The error of a single stream, or the first shard's error if
+            every shard failed without producing anything
+        """
+        pooled = self._take_pooled(topic, count)
+        if pooled is not None:
+            for headline in pooled:
+                yield headline
+            return
+        
+        shards = self._shard_counts(count)
+        if len(shards) == 1:
+            prefix, prompt = await self._build_prompt(count, days, min_views, topic)
+            async for item in self._stream_json_items(
+                prompt, key="generated_headlines", prefix=prefix, items=count
+            ):
+                yield self._parse_headline(item)
+            return
+        
+        prefix, prompts = await self._shard_prompts(shards, days, min_views, topic)
+        self.logger.info(f"Streaming {sum(shards)} headlines in {len(shards)} parallel shards")
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def pump(prompt: str, shard_count: int) -> None:
+            try:
+                async for item in self._stream_json_items(
+                    prompt, key="generated_headlines", prefix=prefix, items=shard_count
+                ):
+                    await queue.put(item)
+            finally:
+                await queue.put(_SHARD_DONE)
+        
+        tasks = [asyncio.ensure_future(pump(p, n)) for p, n in zip(prompts, shards)]
+        produced = 0
+        try:
+            for _ in tasks:
+                while (item := await queue.get()) is not _SHARD_DONE:
+                    produced += 1
+                    yield self._parse_headline(item)
+        finally:
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        failures = [(i, r) for i, r in enumerate(results) if isinstance(r, Exception)]
+        for i, error in failures:
+            self.logger.error(f"Headline shard {i + 1}/{len(shards)} failed: {error}")
+            errors.append(f"Headline shard {i + 1}/{len(shards)} failed: {error}")
+        if failures and len(failures) == len(tasks) and not produced:
+            raise failures[0][1]
+    
+    async def _drop_duplicates(
+        self,
+        headlines: List[HeadlineItem],
+        count: int,
+        days: int,
+        min_views: int,
+        topic: Optional[str]
+    ) -> List[HeadlineItem]:
+        """
+        Drop near-duplicates (within the list and against the index) and,
+        if that leaves fewer than `count`, ask once for replacements that
+        avoid the dropped ones. Returns the list renumbered hl_1..hl_N.
+        """
+        kept, dropped = await self._filter_new(headlines)
+        missing = count - len(kept)
+        
+        if dropped and missing > 0 and settings.headline_dedupe_topup:
+            self.logger.info(f"Dropped {len(dropped)} near-duplicate headlines, requesting {missing} more")
+            avoid = [h.headline for h in kept] + dropped
+            try:
+                prefix, prompt = await self._build_prompt(missing, days, min_views, topic)
+                prompt += HEADLINE_AVOID_SUFFIX.format(headlines="\n".join(f"- {text}" for text in avoid))
+                result = await self._generate_json(prompt, prefix=prefix, items=missing)
+                extra, _ = await self._filter_new(kept + self._parse_headlines(result))
+                kept = extra[:count]
+            except Exception as e:
+                # The batch is still usable, just smaller
+                self.logger.warning(f"Headline top-up failed: {e}")
+        
+        return self._renumber(kept)
+    
+    async def _filter_new(self, headlines: List[HeadlineItem]) -> Tuple[List[HeadlineItem], List[str]]:
+        """
+        Split into (new headlines, texts of near-duplicates). Duplicates of
+        an earlier item in the list or of an indexed headline are dropped.
+        """
+        if self.index is None or not headlines:
+            return headlines, []
+        keep, dropped = await self.index.filter_new([h.headline for h in headlines])
+        for i, match in dropped:
+            self.logger.info(
+                f"Near-duplicate headline dropped ({match.similarity:.2f}): "
+                f"{headlines[i].headline[:60]!r} ~ {match.headline[:60]!r}"
+            )
+        return [headlines[i] for i in keep], [headlines[i].headline for i, _ in dropped]
+    
+    async def _is_new(self, headline: HeadlineItem, batch_id: str) -> bool:
+        """Streaming check: True (and indexed right away) if not a near-duplicate."""
+        if self.index is None:
+            return True
+        kept, _ = await self._filter_new([headline])
+        if not kept:
+            return False
+        await self.index.add(batch_id, [headline.headline])
+        return True
+    
+    async def _index(self, batch: BatchResponse) -> None:
+        """Remember a batch's headlines for future duplicate checks."""
+        if self.index is None:
+            return
+        try:
+            await self.index.add(batch.id, [h.headline for h in batch.headlines])
+        except Exception as e:
+            self.logger.warning(f"Headline index update failed: {e}")
+    
+    @staticmethod
+    def _renumber(headlines: List[HeadlineItem]) -> List[HeadlineItem]:
+        """Sequential IDs (merged or topped-up lists have colliding ones)."""
+        return [h.model_copy(update={"id": f"hl_{i + 1}"}) for i, h in enumerate(headlines)]
+    
+    @staticmethod
+    def _headline_key(text: str) -> str:
+        """Exact-duplicate key: case, punctuation and censoring asterisks ignored."""
+        return re.sub(r"[\W_]+", " ", text.replace("*", "").lower()).strip()
+    
+    @staticmethod
+    def _merge_headlines(shards: List[List[HeadlineItem]], limit: int) -> List[HeadlineItem]:
+        """
+        Concatenate shard results, drop duplicates (case, punctuation and
+        censoring asterisks ignored) and renumber IDs (every shard starts
+        at hl_1).
+        """
+        merged: List[HeadlineItem] = []
+        seen: Dict[str, None] = {}
+        for headlines in shards:
+            for headline in headlines:
+                key = HeadlineGenerator._headline_key(headline.headline)
+                if key in seen:
+                    continue
+                seen[key] = None
+                merged.append(headline.model_copy(update={"id": f"hl_{len(merged) + 1}"}))
+        return merged[:limit]
     
     async def _build_prompt(
         self,
@@ -100,56 +615,102 @@ class HeadlineGenerator(AIService):
         days: int,
         min_views: int,
         topic: Optional[str]
-    ) -> str:
-        """Build the appropriate prompt based on input."""
+    ) -> Tuple[str, str]:
+        """
+        Build the appropriate prompt based on input.
+        
+        Returns:
+            (static prefix, dynamic task) pair
+        """
         
         if topic:
-            # Topic-based generation (no trend analysis needed)
-            return f"""You are a creative Content Strategist.
-            
-TASK: Generate {count} viral headlines based SPECIFICALLY on this topic:
-TOPIC: "{topic}"
-
-Apply viral psychology (curiosity, fear, benefit) to this topic.
-
-OUTPUT FORMAT (JSON):
-{{
-    "generated_headlines": [
-        {{
-            "id": "hl_1",
-            "headline": "...",
-            "source_pattern": "User Topic: {topic}",
-            "hook_type": "specific_topic"
-        }}
-    ]
-}}
-"""
+            # Topic-based generation, grounded in matching viral items if any
+            return TOPIC_HEADLINES_PROMPT, TOPIC_HEADLINES_TASK.format(
+                count=count,
+                topic=topic
+            ) + await self._topic_context(topic, days)
         else:
             # Trend-based generation
-            trends = await self.trend_analyzer.get_viral_content(
-                days=days,
-                min_views=min_views,
-                limit=50
-            )
+            trends = await self._fetch_trends(days, min_views)
             
-            if not trends:
-                raise ValueError("No viral content found for the specified criteria")
-            
-            return TREND_ANALYSIS_PROMPT.format(
+            return self._trends_prefix(), TREND_ANALYSIS_TASK.format(
                 count=count,
-                trends_json=json.dumps(trends, indent=2, ensure_ascii=False)
+                trends_json=self.digest.build(trends)
+            )
+    
+    def _trends_prefix(self) -> str:
+        """Trend prompt: the analysis is precomputed per item when the analyzer is on."""
+        return TREND_PATTERNS_PROMPT if self.patterns is not None else TREND_ANALYSIS_PROMPT
+    
+    async def _fetch_trends(self, days: int, min_views: int) -> List[Dict[str, Any]]:
+        """
+        Viral content for trend-based generation (raises if there is none),
+        with each item's stored pattern analysis attached as "analysis".
+        """
+        trends = await self.trend_analyzer.get_viral_content(
+            days=days,
+            min_views=min_views,
+            limit=50
+        )
+        
+        if not trends:
+            raise ValueError("No viral content found for the specified criteria")
+        
+        return await self._with_analyses(trends)
+    
+    async def _topic_context(self, topic: str, days: int) -> str:
+        """
+        Prompt suffix with the most viral items matching the topic
+        (full-text search), or "" if none match.
+        """
+        trends = await self.trend_analyzer.search_viral_content(
+            topic,
+            days=max(days, settings.topic_trend_days),
+            limit=settings.topic_trend_items
+        )
+        if not trends:
+            return ""
+        self.logger.info(f"Grounding topic '{topic}' in {len(trends)} matching viral items")
+        trends = await self._with_analyses(trends)
+        return TOPIC_TRENDS_SUFFIX.format(trends_json=self.digest.build(trends))
+    
+    async def _with_analyses(self, trends: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach each item's stored pattern analysis as "analysis" (when enabled)."""
+        if self.patterns is None:
+            return trends
+        try:
+            analyses = await self.patterns.analyses_for(
+                trends, analyze_missing=settings.pattern_analyze_inline
             )
+        except Exception as e:
+            # Without analyses the prompt carries transcript excerpts instead
+            self.logger.warning(f"Pattern analyses unavailable: {e}")
+            analyses = {}
+        return [
+            {**row, "analysis": analyses[str(row.get("id"))]} if str(row.get("id")) in analyses else row
+            for row in trends
+        ]
     
     def _parse_headlines(self, result: dict) -> List[HeadlineItem]:
         """Parse AI response into HeadlineItem objects."""
         headlines = []
         
         for item in result.get("generated_headlines", []):
-            headlines.append(HeadlineItem(
-                id=item.get("id", f"hl_{uuid.uuid4().hex[:8]}"),
-                headline=item["headline"],
-                source_pattern=item.get("source_pattern"),
-                status=ItemStatus.PENDING
-            ))
+            headline = self._parse_headline(item)
+            if headline is not None:
+                headlines.append(headline)
         
         return headlines
+    
+    def _parse_headline(self, item: Any) -> Optional[HeadlineItem]:
+        """Parse a single generated element (None if it has no headline)."""
+        if not isinstance(item, dict) or not item.get("headline"):
+            self.logger.warning(f"Skipping malformed headline item: {item!r}")
+            return None
+        
+        return HeadlineItem(
+            id=item.get("id", f"hl_{uuid.uuid4().hex[:8]}"),
+            headline=item["headline"],
+            source_pattern=item.get("source_pattern"),
+            status=ItemStatus.PENDING
+        )
@@ -0,0 +1,314 @@
+"""
+Headline Index - Near-duplicate detection across all generated headlines.
+
+Headlines are normalized (lowercase, ё→е, censoring asterisks and
+punctuation dropped), cut into character shingles and reduced to a
+MinHash signature. Signatures are split into LSH bands; two headlines
+that share any band bucket become candidates, and candidates are kept
+only if their estimated Jaccard similarity reaches the threshold.
+
+Lookups touch only the matching buckets (an indexed SQLite query), so
+they stay fast with hundreds of thousands of stored headlines. The
+SQLite file lives in settings.data_dir and survives restarts.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import re
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+# Character shingle length (on normalized text, spaces included)
+SHINGLE_SIZE = 4
+
+# MinHash permutations = LSH bands * rows per band. 16 bands of 4 rows
+# make pairs above ~0.5 Jaccard collide in some band with high probability.
+NUM_PERM = 64
+LSH_BANDS = 16
+
+# Mersenne prime for the (a * x + b) mod p permutation family
+_PRIME = (1 << 61) - 1
+
+# Fixed seed: signatures must be identical across processes and restarts
+_rng = random.Random(20240601)
+_PERMUTATIONS: List[Tuple[int, int]] = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)
+]
+
+
+def normalize(text: str) -> str:
+    """Canonical form for comparison: case, ё, punctuation and "*" ignored."""
+    text = text.lower().replace("ё", "е").replace("*", "")
+    return re.sub(r"[\W_]+", " ", text).strip()
+
+
+def shingles(text: str) -> List[int]:
+    """CRC32 hashes of the character shingles of normalized text."""
+    norm = normalize(text)
+    if len(norm) <= SHINGLE_SIZE:
+        return [zlib.crc32(norm.encode("utf-8"))]
+    return list({
+        zlib.crc32(norm[i:i + SHINGLE_SIZE].encode("utf-8"))
+        for i in range(len(norm) - SHINGLE_SIZE + 1)
+    })
+
+
+def minhash(text: str) -> Tuple[int, ...]:
+    """MinHash signature (NUM_PERM values)."""
+    hashes = shingles(text)
+    return tuple(
+        min((a * h + b) % _PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def band_buckets(signature: Sequence[int]) -> List[int]:
+    """One bucket key per LSH band (63-bit, fits an SQLite INTEGER)."""
+    rows = len(signature) // LSH_BANDS
+    keys = []
+    for band in range(LSH_BANDS):
+        packed = struct.pack(f">H{rows}Q", band, *signature[band * rows:(band + 1) * rows])
+        digest = hashlib.blake2b(packed, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big") >> 1)
+    return keys
+
+
+def _pack(signature: Sequence[int]) -> bytes:
+    return struct.pack(f">{len(signature)}Q", *signature)
+
+
+def _unpack(blob: bytes) -> Tuple[int, ...]:
+    return struct.unpack(f">{len(blob) // 8}Q", blob)
+
+
+@dataclass
+class SimilarHeadline:
+    """A stored headline close to the queried one."""
+    headline: str
+    batch_id: Optional[str]
+    similarity: float
+
+
+class HeadlineIndex:
+    """
+    Persistent MinHash/LSH index of headlines.
+
+    Usage:
+        kept, dropped = await index.filter_new(["...", "..."])
+        await index.add(batch_id, kept)
+    """
+
+    def __init__(self, db_path: Optional[str] = None, threshold: float = 0.6):
+        """
+        Args:
+            db_path: SQLite file. None = in-memory only (tests, one process).
+            threshold: Estimated Jaccard similarity at which two headlines
+                       count as near-duplicates
+        """
+        self.db_path = db_path or ":memory:"
+        self.threshold = threshold
+        self._in_memory = db_path is None
+        self._lock = threading.Lock()
+        # One long-lived connection (lookups run once per streamed headline);
+        # a :memory: database also lives only as long as its connection
+        self._conn: Optional[sqlite3.Connection] = None
+        self.stats: Dict[str, int] = {
+            "lookups": 0,
+            "duplicates": 0,
+            "added": 0,
+        }
+        self._init_db()
+
+    # ==========================================
+    # Public API
+    # ==========================================
+
+    async def filter_new(
+        self,
+        headlines: List[str],
+        exclude_batch: Optional[str] = None
+    ) -> Tuple[List[int], List[Tuple[int, SimilarHeadline]]]:
+        """
+        Split candidates into new ones and near-duplicates, comparing each
+        against the index and against the candidates before it.
+
+        Args:
+            headlines: Candidate headline texts
+            exclude_batch: Ignore stored headlines of this batch (regeneration)
+
+        Returns:
+            (indices of headlines to keep, [(index, the headline it duplicates)])
+        """
+        return await asyncio.to_thread(self._filter_new, headlines, exclude_batch)
+
+    async def add(self, batch_id: Optional[str], headlines: List[str]) -> None:
+        """Store headlines (call once they are part of a batch)."""
+        if headlines:
+            await asyncio.to_thread(self._add, batch_id, headlines)
+
+    def find_similar(
+        self,
+        headline: str,
+        limit: int = 5,
+        exclude_batch: Optional[str] = None
+    ) -> List[SimilarHeadline]:
+        """Stored headlines at or above the threshold, most similar first."""
+        signature = minhash(headline)
+        matches = [
+            SimilarHeadline(text, batch_id, round(similarity(signature, stored), 3))
+            for text, batch_id, stored in self._candidates(band_buckets(signature))
+            if exclude_batch is None or batch_id != exclude_batch
+        ]
+        matches = [m for m in matches if m.similarity >= self.threshold]
+        matches.sort(key=lambda m: m.similarity, reverse=True)
+        return matches[:limit]
+
+    def size(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM headlines").fetchone()[0]
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "size": self.size()}
+
+    # ==========================================
+    # Internals
+    # ==========================================
+
+    def _filter_new(
+        self,
+        headlines: List[str],
+        exclude_batch: Optional[str]
+    ) -> Tuple[List[int], List[Tuple[int, SimilarHeadline]]]:
+        kept: List[int] = []
+        dropped: List[Tuple[int, SimilarHeadline]] = []
+        # Candidates already accepted in this call, by bucket
+        local: Dict[int, List[int]] = {}
+        signatures = [minhash(text) for text in headlines]
+
+        for i, signature in enumerate(signatures):
+            self.stats["lookups"] += 1
+            buckets = band_buckets(signature)
+
+            duplicate = None
+            for j in {j for key in buckets for j in local.get(key, [])}:
+                score = similarity(signature, signatures[j])
+                if score >= self.threshold:
+                    duplicate = SimilarHeadline(headlines[j], None, round(score, 3))
+                    break
+
+            if duplicate is None:
+                for text, batch_id, stored in self._candidates(buckets):
+                    if exclude_batch is not None and batch_id == exclude_batch:
+                        continue
+                    score = similarity(signature, stored)
+                    if score >= self.threshold:
+                        duplicate = SimilarHeadline(text, batch_id, round(score, 3))
+                        break
+
+            if duplicate is not None:
+                self.stats["duplicates"] += 1
+                dropped.append((i, duplicate))
+                continue
+
+            kept.append(i)
+            for key in buckets:
+                local.setdefault(key, []).append(i)
+
+        return kept, dropped
+
+    def _candidates(self, buckets: List[int]) -> List[Tuple[str, Optional[str], Tuple[int, ...]]]:
+        placeholders = ",".join("?" * len(buckets))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT DISTINCT h.headline, h.batch_id, h.signature
+                FROM headline_buckets b JOIN headlines h ON h.id = b.headline_id
+                WHERE b.bucket IN ({placeholders})
+                """,
+                buckets
+            ).fetchall()
+        return [(text, batch_id, _unpack(blob)) for text, batch_id, blob in rows]
+
+    def _add(self, batch_id: Optional[str], headlines: List[str]) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            for text in headlines:
+                signature = minhash(text)
+                cursor = conn.execute(
+                    "INSERT INTO headlines (headline, batch_id, signature, created_at) VALUES (?, ?, ?, ?)",
+                    (text, batch_id, _pack(signature), now)
+                )
+                conn.executemany(
+                    "INSERT INTO headline_buckets (bucket, headline_id) VALUES (?, ?)",
+                    [(key, cursor.lastrowid) for key in band_buckets(signature)]
+                )
+        self.stats["added"] += len(headlines)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """The shared connection, locked for the block; commits on success."""
+        with self._lock, self._conn:
+            yield self._conn
+
+    def _init_db(self) -> None:
+        directory = "" if self._in_memory else os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+        if not self._in_memory:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS headlines (
+                    id INTEGER PRIMARY KEY,
+                    headline TEXT NOT NULL,
+                    batch_id TEXT,
+                    signature BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS headline_buckets (
+                    bucket INTEGER NOT NULL,
+                    headline_id INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_headline_buckets_bucket ON headline_buckets (bucket)"
+            )
+
+
+@lru_cache()
+def get_headline_index() -> HeadlineIndex:
+    """Get the process-wide index."""
+    settings = get_settings()
+    return HeadlineIndex(
+        db_path=os.path.join(settings.data_dir, "headline_index.db"),
+        threshold=settings.headline_similarity_threshold
+    )
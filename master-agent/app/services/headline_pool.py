@@ -0,0 +1,249 @@
+"""
+Headline Pool - Ready reserve of headlines for hot topics.
+
+Topic-based generation for recurring topics paid the full LLM latency on
+every /producer/start. The pool keeps pre-generated headlines per topic:
+- hot topics are the configured ones (settings.headline_pool_topics) plus
+  topics requested often enough recently
+- take() hands out pooled headlines and removes them (consumed), then the
+  caller schedules a background refill up to the per-topic cap
+- headlines older than max_age_seconds are evicted (trends and the
+  near-duplicate index move on; stale reserve is worse than none)
+- cold topics beyond max_topics are dropped, least recently requested first
+
+The pool is in-memory and per process; losing it only costs a refill.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from app.config import get_settings
+from app.models.batch import HeadlineItem
+
+
+logger = logging.getLogger(__name__)
+
+# (topic, count) -> fresh headlines for the topic
+Producer = Callable[[str, int], Awaitable[List[HeadlineItem]]]
+
+
+def normalize_topic(topic: str) -> str:
+    """Pool key: case, ё and extra whitespace ignored."""
+    return " ".join(topic.lower().replace("ё", "е").split())
+
+
+@dataclass
+class _Pooled:
+    headline: HeadlineItem
+    created_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _TopicPool:
+    topic: str                                   # As first requested (used in prompts)
+    items: Deque[_Pooled] = field(default_factory=deque)
+    requests: Deque[float] = field(default_factory=deque)
+    refill: Optional[asyncio.Task] = None
+
+
+class HeadlinePool:
+    """
+    Per-topic headline reserve.
+
+    Usage:
+        headlines = pool.take(topic, count)      # None = not enough pooled
+        pool.schedule_refill(topic, produce)     # background top-up
+    """
+
+    def __init__(
+        self,
+        size: int = 30,
+        max_age_seconds: float = 6 * 3600,
+        hot_topics: Optional[List[str]] = None,
+        popular_requests: int = 3,
+        popular_window_seconds: float = 24 * 3600,
+        max_topics: int = 20
+    ):
+        """
+        Args:
+            size: Headlines kept per topic (refills stop at this cap)
+            max_age_seconds: Pooled headlines older than this are evicted
+            hot_topics: Topics always kept warm
+            popular_requests: Requests within the window that make a topic hot
+            popular_window_seconds: Window for counting requests
+            max_topics: Tracked topics beyond this are dropped (LRU)
+        """
+        self.size = size
+        self.max_age_seconds = max_age_seconds
+        self.hot_topics = {normalize_topic(t): t.strip() for t in hot_topics or [] if t.strip()}
+        self.popular_requests = popular_requests
+        self.popular_window_seconds = popular_window_seconds
+        self.max_topics = max_topics
+        self._topics: "OrderedDict[str, _TopicPool]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "consumed": 0,
+            "refilled": 0,
+            "refill_failures": 0,
+            "evicted_stale": 0,
+        }
+
+    def take(self, topic: str, count: int) -> Optional[List[HeadlineItem]]:
+        """
+        Consume `count` pooled headlines for a topic (oldest first).
+
+        Also counts the request towards the topic's popularity.
+
+        Returns:
+            The headlines, or None if fewer than `count` are pooled
+            (nothing is consumed then)
+        """
+        pool = self._pool(topic)
+        now = time.monotonic()
+        pool.requests.append(now)
+        self._evict_stale(pool, now)
+
+        if count <= 0 or len(pool.items) < count:
+            self.stats["misses"] += 1
+            return None
+
+        headlines = [pool.items.popleft().headline for _ in range(count)]
+        self.stats["hits"] += 1
+        self.stats["consumed"] += count
+        logger.info(f"🏊 Served {count} pooled headlines for '{pool.topic}' ({len(pool.items)} left)")
+        return headlines
+
+    def is_hot(self, topic: str) -> bool:
+        """Configured, or requested popular_requests times within the window."""
+        key = normalize_topic(topic)
+        if key in self.hot_topics:
+            return True
+        pool = self._topics.get(key)
+        if pool is None:
+            return False
+        self._expire_requests(pool, time.monotonic())
+        return len(pool.requests) >= self.popular_requests
+
+    def available(self, topic: str) -> int:
+        pool = self._topics.get(normalize_topic(topic))
+        return len(pool.items) if pool else 0
+
+    def schedule_refill(self, topic: str, produce: Producer) -> None:
+        """Top the topic up to `size` in the background (if hot and not already running)."""
+        if not self.is_hot(topic):
+            return
+        self._refill_task(topic, produce)
+
+    async def refill(self, topic: str, produce: Producer) -> int:
+        """
+        Generate headlines until the topic holds `size` fresh ones.
+
+        Returns:
+            Number of headlines added
+        """
+        pool = self._pool(topic, touch=False)
+        self._evict_stale(pool, time.monotonic())
+        missing = self.size - len(pool.items)
+        if missing <= 0:
+            return 0
+
+        try:
+            headlines = await produce(pool.topic, missing)
+        except Exception as e:
+            self.stats["refill_failures"] += 1
+            logger.warning(f"Headline pool refill for '{pool.topic}' failed: {e}")
+            return 0
+
+        added = headlines[:self.size - len(pool.items)]
+        pool.items.extend(_Pooled(h) for h in added)
+        self.stats["refilled"] += len(added)
+        logger.info(f"🏊 Pooled {len(added)} headlines for '{pool.topic}' ({len(pool.items)}/{self.size})")
+        return len(added)
+
+    async def warm(self, produce: Producer) -> int:
+        """
+        Refill every hot topic (configured and popular) concurrently.
+
+        Topics with a refill already running wait for it instead of
+        starting a second generation.
+        """
+        for key, topic in self.hot_topics.items():
+            if key not in self._topics:
+                self._pool(topic, touch=False)
+        topics = [pool.topic for pool in list(self._topics.values()) if self.is_hot(pool.topic)]
+        added = await asyncio.gather(*(self._refill_task(topic, produce) for topic in topics))
+        return sum(added)
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            **self.stats,
+            "topics": {
+                pool.topic: {"pooled": len(pool.items), "hot": self.is_hot(pool.topic)}
+                for pool in list(self._topics.values())
+            },
+        }
+
+    # ==========================================
+    # Internals
+    # ==========================================
+
+    def _pool(self, topic: str, touch: bool = True) -> _TopicPool:
+        key = normalize_topic(topic)
+        pool = self._topics.get(key)
+        if pool is None:
+            pool = _TopicPool(topic=self.hot_topics.get(key, topic.strip()))
+            self._topics[key] = pool
+            self._drop_cold_topics()
+        if touch:
+            self._topics.move_to_end(key)
+        return pool
+
+    def _refill_task(self, topic: str, produce: Producer) -> "asyncio.Task[int]":
+        """The topic's running refill, or a new one (one refill per topic at a time)."""
+        pool = self._pool(topic, touch=False)
+        if pool.refill is not None and not pool.refill.done():
+            return pool.refill
+        task = asyncio.ensure_future(self.refill(topic, produce))
+        pool.refill = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _drop_cold_topics(self) -> None:
+        """Forget least recently requested topics that are not configured."""
+        for key in list(self._topics):
+            if len(self._topics) <= self.max_topics:
+                break
+            if key not in self.hot_topics:
+                del self._topics[key]
+
+    def _evict_stale(self, pool: _TopicPool, now: float) -> None:
+        self._expire_requests(pool, now)
+        while pool.items and now - pool.items[0].created_at > self.max_age_seconds:
+            pool.items.popleft()
+            self.stats["evicted_stale"] += 1
+
+    def _expire_requests(self, pool: _TopicPool, now: float) -> None:
+        while pool.requests and now - pool.requests[0] > self.popular_window_seconds:
+            pool.requests.popleft()
+
+
+@lru_cache()
+def get_headline_pool() -> HeadlinePool:
+    """Get the process-wide pool."""
+    settings = get_settings()
+    return HeadlinePool(
+        size=settings.headline_pool_size,
+        max_age_seconds=settings.headline_pool_max_age_seconds,
+        hot_topics=[t for t in settings.headline_pool_topics.split(",") if t.strip()],
+        popular_requests=settings.headline_pool_popular_requests,
+        popular_window_seconds=settings.headline_pool_popular_window_seconds,
+        max_topics=settings.headline_pool_max_topics
+    )
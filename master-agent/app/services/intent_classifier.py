@@ -0,0 +1,550 @@
+"""
+Intent Classifier - Local fast path for chat routing.
+
+Most chat messages are one of three commands ("сделай заголовки на любую
+тему", "пиши сценарии", "запускай производство"). Sending them to Claude
+costs a round-trip for a decision a regex can make. Two local stages run
+before the LLM:
+
+1. Rules: anchored keyword patterns, strong but not certain evidence
+2. Model: char n-gram TF-IDF + multinomial logistic regression, trained
+   from built-in seed phrases plus the routing decisions the LLM made
+   (logged to data/routing_log.jsonl) and retrained on process start
+
+A rule hit is scored together with the model's probability for the same
+action; either way the confidence has to reach the threshold. Negated
+commands ("не делай видео пока"), questions ("сделай видео без музыки?"),
+a prediction of "none" (small talk) and a topic that can't be extracted
+cleanly go to the LLM as before, as do edits of existing output
+("сделай заголовки короче", "переделай сценарий"). So do messages that lean on the
+conversation ("ещё 5 на ту же тему") and, once a session has history, a
+start_batch without a topic: only the LLM router sees the chat memory.
+count/topic are extracted locally.
+"""
+
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+# Actions the fast path may resolve; "none" = leave it to the LLM
+ACTIONS = ("start_batch", "approve_headlines", "start_production")
+NONE = "none"
+
+# Char n-gram sizes (on " word " padded tokens)
+NGRAM_RANGE = (2, 4)
+
+# Highest headline count accepted from chat (StartBatchRequest allows 100)
+MAX_COUNT = 100
+
+# Weight of a rule hit, combined noisy-OR with the model probability:
+# a rule alone reaches 0.85 once the model gives the action >= 0.25
+RULE_WEIGHT = 0.8
+
+
+# ==========================================
+# Rules
+# ==========================================
+
+RULES: List[Tuple[str, re.Pattern]] = [
+    ("start_production", re.compile(
+        r"(запуска\w*|запусти\w*|начина\w*|начни|старт\w*)\s+(видео\s*)?(производств|продакшн)"
+        r"|(сделай|делай|сгенерируй|снимай|сними|рендер\w*)\s+(\w+\s+)?видео"
+        r"|\bstart\s+production\b|\bmake\s+(the\s+)?videos?\b",
+        re.IGNORECASE
+    )),
+    ("approve_headlines", re.compile(
+        r"(пиши|напиши|сделай|делай|давай|генерируй|сгенерируй)\s+(\w+\s+)?сценари"
+        r"|(выбрал\w*|отметил\w*|утверд\w*)\s+(\w+\s+)?заголов"
+        r"|\b(make|write)\s+(the\s+)?scripts?\b|\bi\s+(have\s+)?selected\b",
+        re.IGNORECASE
+    )),
+    ("start_batch", re.compile(
+        r"(сделай|делай|придумай|сгенерируй|генерируй|дай|накидай|нужн\w*|хочу)\s+"
+        r"(мне\s+)?(\w+\s+){0,2}(заголов\w*|иде[йия]\w*|тем\w*\s+для)"
+        r"|\b(generate|make|give\s+me)\s+(\d+\s+)?(new\s+)?(headlines|ideas)\b",
+        re.IGNORECASE
+    )),
+]
+
+# Negations anywhere and questions at the end are never resolved locally
+_NEGATION_RE = re.compile(
+    r"(?<!\w)(не|нет|нельзя|пока\s+не|don'?t|do\s+not|not|never)(?!\w)",
+    re.IGNORECASE
+)
+
+_NUMBER_WORDS = {
+    "один": 1, "одну": 1, "два": 2, "две": 2, "три": 3, "четыре": 4, "пять": 5,
+    "шесть": 6, "семь": 7, "восемь": 8, "девять": 9, "десять": 10,
+    "пятнадцать": 15, "двадцать": 20, "тридцать": 30, "сорок": 40,
+    "пятьдесят": 50, "сто": 100, "дюжину": 12,
+}
+
+_COUNT_RE = re.compile(
+    r"\b(\d{1,3}|" + "|".join(_NUMBER_WORDS) + r")\s+(\w+\s+)?"
+    r"(заголов\w*|иде\w*|тем\w*|вариант\w*|headlines?|ideas?)",
+    re.IGNORECASE
+)
+
+_ANY_TOPIC_RE = re.compile(
+    r"любую\s+тем|любой\s+тем|без\s+тем|какую\s+хочешь|на\s+твой\s+выбор|вирусн|any\s+topic|viral",
+    re.IGNORECASE
+)
+
+_TOPIC_RE = re.compile(
+    r"(?<!\w)(?:на\s+тем[уы]|по\s+теме|про|об?|насч[её]т|about|on)\s+[«\"']?(?P<topic>[^«»\"'.!?\n]{2,80})",
+    re.IGNORECASE
+)
+
+# "о том, как похудеть" -> "похудеть"
+_TOPIC_LEAD_RE = re.compile(
+    r"^(?:том|тем|того)\s*,?\s*(?:как|что|чтобы|почему|зачем)?(?!\w)\s*",
+    re.IGNORECASE
+)
+
+# A topic starting with one of these refers to something else in the chat
+_TOPIC_REFERENCES = {
+    "это", "этом", "эту", "этой", "этих", "том", "то", "ту", "тот", "те", "них", "нем", "нём",
+    "ней", "него", "неё", "нее", "чем", "чём", "что", "такое", "такую", "same", "that", "this", "it",
+}
+
+
+# References to earlier turns: only the LLM router sees the conversation
+_ANAPHORA_RE = re.compile(
+    r"(?<!\w)(ещё|еще|ту\s+же|то\s+же|тот\s+же|те\s+же|таки[ехм]\s+же|это\w*|эт[аиоу]\w*|их"
+    r"|same|again|more|these|those|them)(?!\w)",
+    re.IGNORECASE
+)
+
+
+# Edits of existing output ("сделай заголовки короче", "переделай сценарий"):
+# comparatives, "по...че" modifiers and edit verbs. The rules would read
+# them as a new pipeline step.
+_MODIFIER_RE = re.compile(
+    r"(?<!\w)(\w{3,}(?:ее|[нрлв]ей)|по\w*че|короче|длиннее|проще|лучше|хуже"
+    r"|измени\w*|переделай\w*|переделать|исправь\w*|исправить|перепиши\w*|поменяй\w*|сократи\w*"
+    r"|shorter|longer|rewrite|change|fix|edit)(?!\w)",
+    re.IGNORECASE
+)
+
+
+def is_edit_request(message: str) -> bool:
+    """True if the message asks to change existing output rather than start a step."""
+    return bool(_MODIFIER_RE.search(message))
+
+
+def has_anaphora(message: str) -> bool:
+    """True if the message refers back to the conversation ("ещё", "ту же", "это", "их")."""
+    return bool(_ANAPHORA_RE.search(message))
+
+
+def rule_action(message: str) -> Optional[str]:
+    """Action of the first matching rule, if any."""
+    for action, pattern in RULES:
+        if pattern.search(message):
+            return action
+    return None
+
+
+def is_negated_or_question(message: str) -> bool:
+    """True for commands the rules can't read safely: negated or asked as a question."""
+    text = message.strip()
+    return text.endswith("?") or bool(_NEGATION_RE.search(text))
+
+
+def extract_topic(message: str) -> Tuple[bool, Optional[str]]:
+    """
+    Topic named in a start_batch message.
+
+    Returns:
+        (clean, topic): topic is None when no topic is named (any topic).
+        clean is False when a topic is named but can't be taken verbatim:
+        empty after stripping, a reference ("про это"), a subordinate
+        clause or cut off at the length limit.
+    """
+    if _ANY_TOPIC_RE.search(message):
+        return True, None
+    found = _TOPIC_RE.search(message)
+    if not found:
+        return True, None
+
+    topic = _TOPIC_LEAD_RE.sub("", found.group("topic").strip(" ,;:"), count=1).strip(" ,;:")
+    words = re.findall(r"\w+", topic.lower())
+    if (
+        not words
+        or words[0] in _TOPIC_REFERENCES
+        or "," in topic
+        or re.match(r"\w", message[found.end():])
+    ):
+        return False, None
+    return True, topic
+
+
+def extract_args(action: str, message: str) -> Optional[Dict[str, Any]]:
+    """
+    Arguments for a fast-path action.
+
+    Args:
+        action: Resolved action
+        message: User message
+
+    Returns:
+        {"count": int, "topic": str | None} for start_batch, else {}.
+        None when the topic can't be extracted cleanly (the LLM decides).
+    """
+    if action != "start_batch":
+        return {}
+
+    args: Dict[str, Any] = {"count": 10, "topic": None}
+
+    count = _COUNT_RE.search(message)
+    if count:
+        raw = count.group(1).lower()
+        value = int(raw) if raw.isdigit() else _NUMBER_WORDS[raw]
+        args["count"] = max(1, min(MAX_COUNT, value))
+
+    clean, args["topic"] = extract_topic(message)
+    return args if clean else None
+
+
+# ==========================================
+# Model
+# ==========================================
+
+# Cold-start training data; the routing log adds real traffic on top
+SEED_EXAMPLES: List[Tuple[str, str]] = [
+    ("сделай заголовки на любую тему", "start_batch"),
+    ("сделай 10 заголовков про деньги", "start_batch"),
+    ("придумай идеи для роликов", "start_batch"),
+    ("нужны новые заголовки", "start_batch"),
+    ("накидай вирусных идей", "start_batch"),
+    ("дай 20 заголовков на тему фитнес", "start_batch"),
+    ("генерируй заголовки", "start_batch"),
+    ("хочу новые идеи для видео", "start_batch"),
+    ("новая партия заголовков", "start_batch"),
+    ("generate headlines about crypto", "start_batch"),
+    ("give me some viral ideas", "start_batch"),
+    ("пиши сценарии", "approve_headlines"),
+    ("я выбрал заголовки", "approve_headlines"),
+    ("делай сценарии по выбранным", "approve_headlines"),
+    ("отметил заголовки, пиши сценарии", "approve_headlines"),
+    ("утвердил заголовки", "approve_headlines"),
+    ("готово, выбрал", "approve_headlines"),
+    ("make scripts", "approve_headlines"),
+    ("i selected the headlines", "approve_headlines"),
+    ("запускай производство", "start_production"),
+    ("делай видео", "start_production"),
+    ("запусти продакшн", "start_production"),
+    ("сценарии ок, снимай видео", "start_production"),
+    ("начинай производство видео", "start_production"),
+    ("рендери ролики", "start_production"),
+    ("start production", "start_production"),
+    ("make the videos", "start_production"),
+    ("привет", NONE),
+    ("как дела?", NONE),
+    ("что ты умеешь?", NONE),
+    ("спасибо", NONE),
+    ("почему этот заголовок плохой?", NONE),
+    ("объясни, как ты выбираешь темы", NONE),
+    ("сколько стоит производство одного видео?", NONE),
+    ("какие тренды сейчас?", NONE),
+    ("кто ты?", NONE),
+    ("hello", NONE),
+    ("what can you do?", NONE),
+    ("сделай видео короче", NONE),
+    ("сделай заголовки короче", NONE),
+    ("сделай заголовки позитивнее", NONE),
+    ("напиши сценарий покороче", NONE),
+    ("сделай сценарии длиннее", NONE),
+    ("измени третий заголовок", NONE),
+    ("переделай сценарий", NONE),
+    ("исправь заголовки", NONE),
+    ("make the headlines shorter", NONE),
+]
+
+
+def _features(text: str) -> Counter:
+    """Char n-gram counts over lowercased, whitespace-normalized words."""
+    grams: Counter = Counter()
+    low, high = NGRAM_RANGE
+    for word in re.findall(r"\w+", text.lower()):
+        padded = f" {word} "
+        for n in range(low, high + 1):
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+
+class NgramClassifier:
+    """
+    TF-IDF (sublinear tf, L2-normalized) + softmax regression trained
+    with SGD. Pure Python: the vocabulary is a few thousand n-grams and
+    training takes well under a second on the seed set.
+    """
+
+    def __init__(self, epochs: int = 30, learning_rate: float = 0.5, l2: float = 1e-4, seed: int = 0):
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.seed = seed
+        self.labels: List[str] = []
+        self.idf: Dict[str, float] = {}
+        self.weights: Dict[str, Dict[str, float]] = {}
+        self.bias: Dict[str, float] = {}
+
+    @property
+    def trained(self) -> bool:
+        return bool(self.labels)
+
+    def fit(self, examples: List[Tuple[str, str]]) -> "NgramClassifier":
+        """
+        Train on (text, label) pairs.
+
+        Raises:
+            ValueError: Fewer than two distinct labels
+        """
+        labels = sorted({label for _, label in examples})
+        if len(labels) < 2:
+            raise ValueError("Need at least two labels to train the intent classifier")
+
+        docs = [_features(text) for text, _ in examples]
+        df: Counter = Counter()
+        for doc in docs:
+            df.update(doc.keys())
+        total = len(docs)
+        self.idf = {gram: math.log((1 + total) / (1 + count)) + 1 for gram, count in df.items()}
+        self.labels = labels
+        self.weights = {label: {} for label in labels}
+        self.bias = {label: 0.0 for label in labels}
+
+        vectors = [self._vectorize(doc) for doc in docs]
+        order = list(range(total))
+        rng = random.Random(self.seed)
+        for epoch in range(self.epochs):
+            rng.shuffle(order)
+            rate = self.learning_rate / (1 + epoch * 0.1)
+            for i in order:
+                x, target = vectors[i], examples[i][1]
+                probs = self._softmax(x)
+                for label in labels:
+                    gradient = probs[label] - (1.0 if label == target else 0.0)
+                    w = self.weights[label]
+                    for gram, value in x.items():
+                        w[gram] = w.get(gram, 0.0) * (1 - rate * self.l2) - rate * gradient * value
+                    self.bias[label] -= rate * gradient
+        return self
+
+    def probability(self, text: str, label: str) -> float:
+        """Probability of one label (0.0 for unknown labels or an untrained model)."""
+        if not self.trained or label not in self.labels:
+            return 0.0
+        return self._softmax(self._vectorize(_features(text)))[label]
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """
+        Returns:
+            (label, probability)
+        """
+        if not self.trained:
+            return NONE, 0.0
+        probs = self._softmax(self._vectorize(_features(text)))
+        label = max(probs, key=probs.get)
+        return label, probs[label]
+
+    def _vectorize(self, doc: Counter) -> Dict[str, float]:
+        vector = {
+            gram: (1 + math.log(count)) * self.idf[gram]
+            for gram, count in doc.items()
+            if gram in self.idf
+        }
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {gram: v / norm for gram, v in vector.items()}
+
+    def _softmax(self, x: Dict[str, float]) -> Dict[str, float]:
+        scores = {
+            label: self.bias[label] + sum(self.weights[label].get(g, 0.0) * v for g, v in x.items())
+            for label in self.labels
+        }
+        top = max(scores.values())
+        exp = {label: math.exp(score - top) for label, score in scores.items()}
+        total = sum(exp.values())
+        return {label: value / total for label, value in exp.items()}
+
+
+# ==========================================
+# Classifier
+# ==========================================
+
+@dataclass
+class IntentMatch:
+    """A routing decision made locally."""
+    action: str
+    args: Dict[str, Any] = field(default_factory=dict)
+    confidence: float = 0.0
+    source: str = "rule"               # rule / model
+
+
+class IntentClassifier:
+    """
+    Rules + n-gram model in front of the LLM router.
+
+    Usage:
+        match = classifier.classify(message)
+        if match is None:
+            ...ask the LLM, then classifier.record(message, action)
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        log_path: Optional[str] = None,
+        max_log_examples: int = 5000
+    ):
+        """
+        Args:
+            threshold: Minimum confidence (rule or model) to skip the LLM
+            log_path: JSONL file of LLM routing decisions (training data).
+                      None = no logging, seed examples only.
+            max_log_examples: Only the most recent decisions are used
+        """
+        self.threshold = threshold
+        self.log_path = log_path
+        self.max_log_examples = max_log_examples
+        self.model = NgramClassifier()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "messages": 0,
+            "rule_hits": 0,
+            "model_hits": 0,
+            "guarded": 0,
+            "llm_fallbacks": 0,
+        }
+
+    def train(self) -> int:
+        """
+        (Re)train the model on seed examples plus the routing log.
+
+        Returns:
+            Number of training examples
+        """
+        examples = list(SEED_EXAMPLES) + self._load_log()
+        self.model = NgramClassifier().fit(examples)
+        logger.info(f"🧭 Intent classifier trained on {len(examples)} examples")
+        return len(examples)
+
+    def classify(self, message: str, has_history: bool = False) -> Optional[IntentMatch]:
+        """
+        Resolve a message locally.
+
+        Args:
+            message: User message
+            has_history: The session has earlier turns. A start_batch
+                         without a topic may then mean "the same topic",
+                         which only the LLM router (with the memory) can tell.
+
+        Returns:
+            The match, or None if the LLM should decide
+        """
+        text = message.strip()
+        guarded = is_negated_or_question(text) or has_anaphora(text) or is_edit_request(text)
+        match = None
+        if not guarded:
+            # A rule hit is decided on the rule's action alone
+            action = rule_action(text)
+            match = self._match_rule(action, text) if action else self._match_model(text)
+        if (
+            match is not None and has_history and match.action == "start_batch"
+            and match.args.get("topic") is None and not _ANY_TOPIC_RE.search(text)
+        ):
+            guarded, match = True, None
+
+        with self._lock:
+            self.stats["messages"] += 1
+            if guarded:
+                self.stats["guarded"] += 1
+            if match is None:
+                self.stats["llm_fallbacks"] += 1
+            else:
+                self.stats[f"{match.source}_hits"] += 1
+        return match
+
+    def record(self, message: str, action: Optional[str]) -> None:
+        """Append an LLM routing decision to the training log."""
+        if not self.log_path:
+            return
+        label = action if action in ACTIONS else NONE
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"message": message, "action": label}, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"Routing log write failed: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        hits = stats["rule_hits"] + stats["model_hits"]
+        stats["fast_path_hit_rate"] = round(hits / stats["messages"], 4) if stats["messages"] else 0.0
+        stats["threshold"] = self.threshold
+        return stats
+
+    def _match_rule(self, action: str, text: str) -> Optional[IntentMatch]:
+        probability = self.model.probability(text, action)
+        confidence = 1 - (1 - RULE_WEIGHT) * (1 - probability)
+        return self._accept(action, text, confidence, "rule")
+
+    def _match_model(self, text: str) -> Optional[IntentMatch]:
+        label, confidence = self.model.predict(text)
+        if label == NONE:
+            return None
+        return self._accept(label, text, confidence, "model")
+
+    def _accept(self, action: str, text: str, confidence: float, source: str) -> Optional[IntentMatch]:
+        """The match if it clears the threshold and its arguments are clean."""
+        if confidence < self.threshold:
+            return None
+        args = extract_args(action, text)
+        if args is None:
+            return None
+        return IntentMatch(action, args, round(confidence, 4), source)
+
+    def _load_log(self) -> List[Tuple[str, str]]:
+        if not self.log_path or not os.path.exists(self.log_path):
+            return []
+        examples: List[Tuple[str, str]] = []
+        try:
+            with open(self.log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get("message") and entry.get("action") in ACTIONS + (NONE,):
+                        examples.append((entry["message"], entry["action"]))
+        except OSError as e:
+            logger.warning(f"Routing log read failed: {e}")
+        return examples[-self.max_log_examples:]
+
+
+@lru_cache()
+def get_intent_classifier() -> IntentClassifier:
+    """Get the process-wide classifier, trained on first use."""
+    settings = get_settings()
+    classifier = IntentClassifier(
+        threshold=settings.chat_fast_path_threshold,
+        log_path=os.path.join(settings.data_dir, "routing_log.jsonl")
+    )
+    classifier.train()
+    return classifier
@@ -0,0 +1,295 @@
+"""
+JSON Repair - Local, tolerant recovery of malformed model replies.
+
+Runs before any self-correction round-trip to the model. Handles the
+failure modes we actually see from Claude:
+- markdown fences anywhere in the reply, or prose around the JSON
+- trailing commas before } or ]
+- replies truncated at max_tokens: open arrays/objects are
+  closed, and an unfinished trailing element is dropped so the
+  completed elements of the array survive
+
+A truncated reply is never reported as REPAIRED: whatever was cut off
+is lost, so closing it is SALVAGED and callers must not cache it.
+Outcomes are counted process-wide in RepairStats (see /metrics/llm).
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RepairOutcome(str, Enum):
+    """How the value was obtained."""
+    VALID = "valid"          # Parsed as-is (after fence stripping)
+    REPAIRED = "repaired"    # Syntax fixed, no content lost
+    SALVAGED = "salvaged"    # Truncated; anything after the cut is lost
+
+
+@dataclass
+class RepairResult:
+    value: Any
+    outcome: RepairOutcome
+
+
+_FENCE_RE = re.compile(r"```[a-zA-Z]*[ \t]*\n?(.*?)(?:```|$)", re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+
+# Give up after this many cut points; truncated replies only lose the tail
+_MAX_CUT_ATTEMPTS = 64
+
+
+def repair_json(text: str, truncated: bool = False) -> RepairResult:
+    """
+    Parse a model reply as JSON, repairing it locally if needed.
+
+    Args:
+        text: Raw reply text
+        truncated: The model stopped at max_tokens. Whatever parses is
+                   then SALVAGED, even if the cut fell between elements.
+
+    Returns:
+        RepairResult with the parsed value and how it was obtained
+
+    Raises:
+        json.JSONDecodeError: If the reply cannot be recovered locally
+    """
+    result = _repair(text)
+    if truncated and result.outcome != RepairOutcome.SALVAGED:
+        return RepairResult(result.value, RepairOutcome.SALVAGED)
+    return result
+
+
+def _repair(text: str) -> RepairResult:
+    candidate = _strip_fences(text)
+
+    try:
+        return RepairResult(json.loads(candidate), RepairOutcome.VALID)
+    except json.JSONDecodeError as e:
+        original_error = e
+
+    body = _extract_json_body(candidate)
+    if body is None:
+        raise original_error
+
+    fixed = _remove_trailing_commas(body)
+    try:
+        return RepairResult(json.loads(fixed), RepairOutcome.REPAIRED)
+    except json.JSONDecodeError:
+        pass
+
+    # Open containers at the end: the reply was cut off, content is missing
+    closed = _close_truncated(fixed)
+    if closed is not None:
+        return RepairResult(closed, RepairOutcome.SALVAGED)
+
+    salvaged = _salvage(fixed)
+    if salvaged is not None:
+        return RepairResult(salvaged, RepairOutcome.SALVAGED)
+
+    raise original_error
+
+
+class RepairStats:
+    """
+    How JSON replies were obtained, across every client in the process:
+    valid / repaired / salvaged (see RepairOutcome), regenerated (sent to
+    the repair model) and failed.
+    """
+
+    KEYS = tuple(outcome.value for outcome in RepairOutcome) + ("regenerated", "failed")
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {key: 0 for key in self.KEYS}
+
+    def record(self, outcome: str) -> None:
+        self.counts[outcome] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+
+@lru_cache()
+def get_repair_stats() -> RepairStats:
+    """Get the process-wide JSON repair counters (shared by all AnthropicClient instances)."""
+    return RepairStats()
+
+
+# ==========================================
+# Steps
+# ==========================================
+
+def _strip_fences(text: str) -> str:
+    """Return the content of the first ``` fence (closed or not), else the text."""
+    text = text.strip()
+    match = _FENCE_RE.search(text)
+    if match and match.group(1).strip():
+        return match.group(1).strip()
+    return text
+
+
+def _extract_json_body(text: str) -> Optional[str]:
+    """Drop prose before the first { or [ (and after its matching close)."""
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return None
+    start = min(starts)
+
+    end = _matching_close(text, start)
+    return text[start:end + 1] if end is not None else text[start:]
+
+
+def _remove_trailing_commas(text: str) -> str:
+    """Remove commas directly before a closing bracket (outside strings)."""
+    out: List[str] = []
+    last = 0
+    for start, end in _string_free_spans(text):
+        out.append(text[last:start])
+        out.append(_TRAILING_COMMA_RE.sub(r"\1", text[start:end]))
+        last = end
+    out.append(text[last:])
+    return "".join(out)
+
+
+def _close_truncated(text: str) -> Optional[Any]:
+    """
+    Close all open containers at the very end.
+
+    A reply cut off inside a string is left to _salvage(): closing the
+    string would keep a half-written headline or caption.
+    """
+    stack, in_string, _ = _scan(text)
+    if not stack or in_string:
+        return None
+
+    tail = text.rstrip()
+    if tail.endswith(","):
+        tail = tail[:-1]
+    try:
+        return json.loads(tail + _closers(stack))
+    except json.JSONDecodeError:
+        return None
+
+
+def _salvage(text: str) -> Optional[Any]:
+    """
+    Cut the text at an earlier comma and close everything open there.
+
+    Cuts right after a finished object/array are tried first, so whole
+    array elements are kept and the unfinished one is dropped.
+    """
+    _, _, commas = _scan(text)
+    preferred = [c for c in commas if c[2]]
+    others = [c for c in commas if not c[2]]
+
+    for position, stack, _ in (preferred[::-1] + others[::-1])[:_MAX_CUT_ATTEMPTS]:
+        try:
+            return json.loads(text[:position] + _closers(stack))
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+# ==========================================
+# Scanning helpers
+# ==========================================
+
+def _scan(text: str) -> Tuple[List[str], bool, List[Tuple[int, List[str], bool]]]:
+    """
+    Walk the text tracking strings and brackets.
+
+    Returns:
+        (open containers at the end, whether a string is open at the end,
+         [(comma position, open containers there, comma follows a closed container)])
+    """
+    stack: List[str] = []
+    commas: List[Tuple[int, List[str], bool]] = []
+    in_string = False
+    escape = False
+    last_significant = ""
+
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                last_significant = '"'
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+        elif ch == ",":
+            commas.append((i, list(stack), last_significant in "}]"))
+
+        if not ch.isspace():
+            last_significant = ch
+
+    return stack, in_string, commas
+
+
+def _string_free_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) spans of the text that lie outside string literals."""
+    spans: List[Tuple[int, int]] = []
+    in_string = False
+    escape = False
+    span_start = 0
+
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                span_start = i + 1
+        elif ch == '"':
+            spans.append((span_start, i))
+            in_string = True
+
+    if not in_string:
+        spans.append((span_start, len(text)))
+    return spans
+
+
+def _matching_close(text: str, start: int) -> Optional[int]:
+    """Index of the bracket closing the container opened at `start`."""
+    depth = 0
+    in_string = False
+    escape = False
+
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return i
+    return None
+
+
+def _closers(stack: List[str]) -> str:
+    return "".join("}" if opener == "{" else "]" for opener in reversed(stack))
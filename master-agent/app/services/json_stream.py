@@ -0,0 +1,296 @@
+"""
+JSON Stream - Incremental parsers for JSON documents arriving in chunks.
+
+Claude streams a JSON document token by token. Instead of waiting for
+the closing bracket, JSONArrayStreamParser emits each element of the
+target array as soon as that element is complete, e.g. every headline
+object of {"generated_headlines": [...]} or every script of a top-level
+[...]. JSONStringStreamParser emits the characters of one top-level
+string field (the chat "reply") while it is being written.
+"""
+
+import json
+import logging
+from typing import Any, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class JSONArrayStreamParser:
+    """
+    Push parser: feed() text chunks, get back newly completed elements.
+
+    Only tracks structure (brackets, strings, escapes); each finished
+    element slice is decoded with json.loads. Text outside the JSON
+    document (e.g. a ```json fence) is ignored.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        """
+        Args:
+            key: Top-level object key holding the array
+                 (None = the document itself is the array)
+        """
+        self.key = key
+        self.text = ""
+
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._current_key: Optional[str] = None
+
+        self._target_depth: Optional[int] = None
+        self._element_start: Optional[int] = None
+        self._done = False
+        self.emitted = 0
+
+    @property
+    def done(self) -> bool:
+        """True once the target array has been closed."""
+        return self._done
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Consume a chunk of text.
+
+        Returns:
+            Elements completed within this chunk (possibly empty)
+        """
+        self.text += chunk
+        completed: List[Any] = []
+
+        text = self.text
+        while self._pos < len(text):
+            ch = text[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._on_string_end(text[self._string_start:self._pos + 1])
+                self._pos += 1
+                continue
+
+            if self._done:
+                self._pos += 1
+                continue
+
+            if ch == '"':
+                self._maybe_start_element()
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch in "{[":
+                self._maybe_start_element()
+                self._stack.append(ch)
+                if ch == "[" and self._is_target_open():
+                    self._target_depth = len(self._stack)
+            elif ch in "}]":
+                if self._at_target_level() and ch == "]":
+                    self._finish_element(self._pos, completed)
+                    self._done = True
+                if self._stack:
+                    self._stack.pop()
+                if self._at_target_level():
+                    self._finish_element(self._pos + 1, completed)
+            elif ch == ",":
+                if self._at_target_level():
+                    self._finish_element(self._pos, completed)
+                if len(self._stack) == 1:
+                    self._current_key = None
+            elif ch == ":":
+                if len(self._stack) == 1 and self._stack[0] == "{":
+                    self._current_key = self._last_string
+            elif not ch.isspace():
+                self._maybe_start_element()
+
+            self._pos += 1
+
+        return completed
+
+    # ==========================================
+    # Internals
+    # ==========================================
+
+    def _is_target_open(self) -> bool:
+        if self._target_depth is not None:
+            return False
+        if self.key is None:
+            return len(self._stack) == 1
+        return (
+            len(self._stack) == 2
+            and self._stack[0] == "{"
+            and self._current_key == self.key
+        )
+
+    def _at_target_level(self) -> bool:
+        return self._target_depth is not None and len(self._stack) == self._target_depth
+
+    def _maybe_start_element(self) -> None:
+        if self._at_target_level() and self._element_start is None:
+            self._element_start = self._pos
+
+    def _on_string_end(self, raw: str) -> None:
+        try:
+            self._last_string = json.loads(raw)
+        except json.JSONDecodeError:
+            self._last_string = None
+
+    def _finish_element(self, end: int, completed: List[Any]) -> None:
+        if self._element_start is None:
+            return
+        fragment = self.text[self._element_start:end]
+        self._element_start = None
+        try:
+            completed.append(json.loads(fragment))
+            self.emitted += 1
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed streamed element: {e}")
+
+
+class JSONStringStreamParser:
+    """
+    Push parser for one top-level string field: feed() returns the newly
+    decoded characters of its value, e.g. the "reply" of
+    {"reply": "...", "action": ..., "args": ...}, so it can be shown
+    before the rest of the object exists.
+    """
+
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self, key: str):
+        """
+        Args:
+            key: Top-level object key holding the string
+        """
+        self.key = key
+        self.text = ""
+        self.value = ""
+
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._current_key: Optional[str] = None
+        self._expect_value = False
+        self._in_target = False
+        self._done = False
+
+    @property
+    def done(self) -> bool:
+        """True once the target string has been closed."""
+        return self._done
+
+    def feed(self, chunk: str) -> str:
+        """
+        Consume a chunk of text.
+
+        Returns:
+            Characters of the target value decoded within this chunk
+            (possibly empty)
+        """
+        self.text += chunk
+        decoded: List[str] = []
+
+        text = self.text
+        while self._pos < len(text) and not self._done:
+            ch = text[self._pos]
+
+            if self._in_target:
+                if ch == "\\":
+                    value, length = self._decode_escape(text, self._pos)
+                    if value is None:
+                        # Escape sequence split across chunks: wait for the rest
+                        break
+                    decoded.append(value)
+                    self._pos += length
+                    continue
+                if ch == '"':
+                    self._in_target = False
+                    self._done = True
+                else:
+                    decoded.append(ch)
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    try:
+                        self._last_string = json.loads(text[self._string_start:self._pos + 1])
+                    except json.JSONDecodeError:
+                        self._last_string = None
+                self._pos += 1
+                continue
+
+            if ch == '"':
+                if self._depth == 1 and self._expect_value and self._current_key == self.key:
+                    self._in_target = True
+                else:
+                    self._in_string = True
+                    self._string_start = self._pos
+                self._expect_value = False
+            elif ch in "{[":
+                self._depth += 1
+                self._expect_value = False
+            elif ch in "}]":
+                self._depth -= 1
+            elif ch == ":":
+                if self._depth == 1:
+                    self._current_key = self._last_string
+                    self._expect_value = True
+            elif ch == ",":
+                if self._depth == 1:
+                    self._current_key = None
+            elif not ch.isspace():
+                self._expect_value = False
+
+            self._pos += 1
+
+        result = "".join(decoded)
+        self.value += result
+        return result
+
+    @classmethod
+    def _decode_escape(cls, text: str, pos: int) -> Tuple[Optional[str], int]:
+        """
+        Decode the escape sequence at text[pos] ("\\").
+
+        Returns:
+            (decoded, length), or (None, 0) if the sequence is incomplete
+        """
+        if pos + 1 >= len(text):
+            return None, 0
+        kind = text[pos + 1]
+        if kind != "u":
+            return cls._ESCAPES.get(kind, kind), 2
+
+        if pos + 6 > len(text):
+            return None, 0
+        length = 6
+        try:
+            code = int(text[pos + 2:pos + 6], 16)
+        except ValueError:
+            return "", length
+        if 0xD800 <= code <= 0xDBFF:
+            # High surrogate: decode together with the low one
+            if pos + 12 > len(text):
+                return None, 0
+            if text[pos + 6:pos + 8] == "\\u":
+                length = 12
+        try:
+            return json.loads('"' + text[pos:pos + length] + '"'), length
+        except json.JSONDecodeError:
+            return "", length
@@ -0,0 +1,347 @@
+"""
+LLM Governor - Process-wide concurrency and rate-limit control.
+
+Every Claude request goes through one governor so parallel API calls
+(/producer/chat, /start, /approve-*) share a single budget:
+- bounded number of in-flight requests
+- token buckets for requests/min, input tokens/min, output tokens/min
+- priority classes: interactive chat is dispatched before bulk generation
+- a shared pause after a 429, instead of every caller retrying blindly
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Dispatch order (lower value goes first)."""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `per_minute / 60` per second.
+
+    A budget of 0 disables the bucket. Requests larger than the bucket
+    capacity are admitted once the bucket is full, so they still make
+    progress instead of waiting forever.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        if not self.enabled:
+            return 0.0
+        self._refill()
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        """Consume tokens (may go negative when settling actual usage)."""
+        if self.enabled:
+            self._refill()
+            self.tokens -= amount
+
+    def refund(self, amount: float) -> None:
+        if self.enabled:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    future: asyncio.Future = field(compare=False)
+    input_tokens: int = field(compare=False, default=0)
+    output_tokens: int = field(compare=False, default=0)
+
+
+@dataclass
+class Lease:
+    """A granted request slot. Call settle() with actual usage when known."""
+    governor: "LLMGovernor"
+    priority: Priority
+    input_tokens: int
+    output_tokens: int
+    wait_seconds: float = 0.0
+    _settled: bool = False
+
+    def settle(self, input_tokens: int, output_tokens: int) -> None:
+        """Correct the reserved budget with the real message.usage numbers."""
+        if self._settled:
+            return
+        self._settled = True
+        self.governor._settle(self, input_tokens, output_tokens)
+
+
+class LLMGovernor:
+    """
+    Priority scheduler with concurrency and token-bucket limits.
+
+    Usage:
+        async with governor.slot(Priority.BULK, input_tokens=..., output_tokens=...) as lease:
+            message = await client.messages.create(...)
+            lease.settle(message.usage.input_tokens, message.usage.output_tokens)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        requests_per_minute: int = 0,
+        input_tokens_per_minute: int = 0,
+        output_tokens_per_minute: int = 0
+    ):
+        """
+        Args:
+            max_concurrency: Maximum in-flight requests
+            requests_per_minute: RPM budget (0 = unlimited)
+            input_tokens_per_minute: Input TPM budget (0 = unlimited)
+            output_tokens_per_minute: Output TPM budget (0 = unlimited)
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests = TokenBucket(requests_per_minute)
+        self.input_tokens = TokenBucket(input_tokens_per_minute)
+        self.output_tokens = TokenBucket(output_tokens_per_minute)
+
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self._waits: Dict[Priority, Dict[str, float]] = {
+            p: {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0} for p in Priority
+        }
+        self._rate_limited = 0
+
+    # ==========================================
+    # Public API
+    # ==========================================
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: Priority = Priority.NORMAL,
+        input_tokens: int = 0,
+        output_tokens: int = 0
+    ) -> AsyncIterator[Lease]:
+        """Wait for a request slot and budget, then hold it for the block."""
+        lease = await self.acquire(priority, input_tokens, output_tokens)
+        try:
+            yield lease
+        finally:
+            self.release(lease)
+
+    async def acquire(
+        self,
+        priority: Priority = Priority.NORMAL,
+        input_tokens: int = 0,
+        output_tokens: int = 0
+    ) -> Lease:
+        """Queue for a slot. Prefer slot() unless release is managed manually."""
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        waiter = _Waiter(
+            priority=int(priority),
+            seq=next(self._seq),
+            future=loop.create_future(),
+            input_tokens=input_tokens,
+            output_tokens=output_tokens
+        )
+        heapq.heappush(self._waiters, waiter)
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Slot was granted just as we got cancelled - hand it back
+                self._in_flight -= 1
+                self.requests.refund(1)
+                self.input_tokens.refund(input_tokens)
+                self.output_tokens.refund(output_tokens)
+                self._dispatch()
+            raise
+
+        waited = time.monotonic() - started
+        stats = self._waits[Priority(priority)]
+        stats["count"] += 1
+        stats["total_seconds"] += waited
+        stats["max_seconds"] = max(stats["max_seconds"], waited)
+        if waited > 1.0:
+            logger.info(f"⏳ LLM slot ({Priority(priority).name}) granted after {waited:.2f}s")
+
+        return Lease(
+            governor=self,
+            priority=Priority(priority),
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            wait_seconds=waited
+        )
+
+    def release(self, lease: Lease) -> None:
+        """
+        Return the slot and wake the next waiter.
+
+        A lease released without settle() (the call failed or timed out)
+        is settled as input sent, no output: the max_tokens output
+        reservation goes back to the bucket.
+        """
+        self._in_flight -= 1
+        if not lease._settled:
+            lease.settle(lease.input_tokens, 0)
+        else:
+            self._dispatch()
+
+    def backoff(self, seconds: float) -> None:
+        """
+        Pause all dispatching after a 429.
+
+        Args:
+            seconds: Server-provided retry-after (or our own estimate)
+        """
+        self._rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        logger.warning(f"🚦 Rate limited by API, pausing LLM dispatch for {seconds:.1f}s")
+
+    def snapshot(self) -> Dict[str, object]:
+        """Queue depth, in-flight count, wait times and bucket levels."""
+        waits = {}
+        for priority, stats in self._waits.items():
+            count = stats["count"]
+            waits[priority.name.lower()] = {
+                "count": int(count),
+                "avg_seconds": round(stats["total_seconds"] / count, 4) if count else 0.0,
+                "max_seconds": round(stats["max_seconds"], 4),
+            }
+
+        return {
+            "queue_depth": sum(1 for w in self._waiters if not w.future.done()),
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "paused_seconds": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "rate_limited": self._rate_limited,
+            "waits": waits,
+            "buckets": {
+                name: round(bucket.tokens, 1)
+                for name, bucket in self._buckets()
+                if bucket.enabled
+            },
+        }
+
+    # ==========================================
+    # Scheduling
+    # ==========================================
+
+    def _buckets(self) -> Tuple[Tuple[str, TokenBucket], ...]:
+        return (
+            ("requests", self.requests),
+            ("input_tokens", self.input_tokens),
+            ("output_tokens", self.output_tokens),
+        )
+
+    def _budget_delay(self, waiter: _Waiter) -> float:
+        return max(
+            self._paused_until - time.monotonic(),
+            self.requests.delay_for(1),
+            self.input_tokens.delay_for(waiter.input_tokens),
+            self.output_tokens.delay_for(waiter.output_tokens),
+        )
+
+    def _dispatch(self) -> None:
+        """
+        Grant slots strictly in (priority, arrival) order.
+
+        The head of the queue is never overtaken: if it is waiting for
+        budget, lower-priority requests wait too.
+        """
+        while self._waiters:
+            head = self._waiters[0]
+            if head.future.done():
+                heapq.heappop(self._waiters)
+                continue
+
+            if self._in_flight >= self.max_concurrency:
+                return
+
+            delay = self._budget_delay(head)
+            if delay > 0:
+                self._schedule(delay)
+                return
+
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.input_tokens.take(head.input_tokens)
+            self.output_tokens.take(head.output_tokens)
+            self._in_flight += 1
+            head.future.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + delay
+        if self._timer is not None:
+            if self._timer.when() <= deadline:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_at(deadline, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _settle(self, lease: Lease, input_tokens: int, output_tokens: int) -> None:
+        # Output is reserved at max_tokens and usually refunded;
+        # input is an estimate and may need topping up.
+        for bucket, delta in (
+            (self.input_tokens, input_tokens - lease.input_tokens),
+            (self.output_tokens, output_tokens - lease.output_tokens),
+        ):
+            if delta > 0:
+                bucket.take(delta)
+            else:
+                bucket.refund(-delta)
+        self._dispatch()
+
+
+@lru_cache()
+def get_governor() -> LLMGovernor:
+    """Get the process-wide governor."""
+    settings = get_settings()
+    return LLMGovernor(
+        max_concurrency=settings.llm_max_concurrency,
+        requests_per_minute=settings.llm_requests_per_minute,
+        input_tokens_per_minute=settings.llm_input_tokens_per_minute,
+        output_tokens_per_minute=settings.llm_output_tokens_per_minute
+    )
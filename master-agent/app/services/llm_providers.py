@@ -0,0 +1,491 @@
+"""
+LLM Providers - Common async interface over Anthropic, Gemini and
+OpenAI-compatible endpoints (e.g. the LiteLLM proxy in docker-compose.yml).
+
+Requests use the Messages API shape that AnthropicClient already builds
+(system blocks, messages, max_tokens, temperature, thinking); each
+provider translates it to its own API. ProviderRouter picks the provider
+per request:
+- healthy providers first (rolling error rate below the threshold)
+- among those with enough samples, the lowest rolling p95 latency
+- optional hedging: if the first provider has not answered within
+  llm_hedge_after_seconds, the next one is asked too and the first
+  successful reply wins. The hedge is a request of its own, so it takes
+  its own governor slot (see complete(hedge_slot=...)); the loser is
+  cancelled and leaves no latency sample.
+"""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, AsyncContextManager, Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+from anthropic import AsyncAnthropic, RateLimitError
+from google import genai
+from google.genai import errors, types
+
+from app.config import get_settings
+from app.services.llm_governor import get_governor
+
+
+logger = logging.getLogger(__name__)
+
+
+class TransientProviderError(Exception):
+    """Retryable failure (429, 5xx, timeout) from a non-Anthropic provider."""
+
+
+@dataclass
+class Usage:
+    """Token usage, in Anthropic's field names."""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    provider: str
+    model: str
+    stop_reason: Optional[str] = None    # Normalized: end_turn / max_tokens / ...
+    usage: Usage = field(default_factory=Usage)
+
+
+def retry_after(error: RateLimitError, default: float = 10.0) -> float:
+    """Seconds to pause after a 429, from the retry-after header if present."""
+    try:
+        return float(error.response.headers.get("retry-after", default))
+    except (AttributeError, TypeError, ValueError):
+        return default
+
+
+def _system_text(request: Dict[str, Any]) -> str:
+    """Flatten Anthropic system blocks for providers without block support."""
+    system = request.get("system") or ""
+    if isinstance(system, str):
+        return system
+    return "\n\n".join(block.get("text", "") for block in system)
+
+
+# ==========================================
+# Providers
+# ==========================================
+
+class LLMProvider(ABC):
+    """One backend able to complete a Messages-API-shaped request."""
+
+    name: str = "provider"
+
+    @abstractmethod
+    async def complete(self, request: Dict[str, Any]) -> LLMResponse:
+        """
+        Run a request to completion.
+
+        Args:
+            request: messages.create() kwargs as built by AnthropicClient
+
+        Raises:
+            Provider SDK errors, or TransientProviderError for retryable ones
+        """
+
+
+class AnthropicProvider(LLMProvider):
+    """Claude via the official SDK (prompt caching and thinking supported)."""
+
+    name = "anthropic"
+
+    def __init__(
+        self,
+        client: Optional[AsyncAnthropic] = None,
+        on_rate_limit: Optional[Callable[[float], None]] = None
+    ):
+        """
+        Args:
+            client: Injected SDK client. If None, built from settings.
+            on_rate_limit: Called with retry-after seconds on a 429
+                           (the shared governor's backoff())
+        """
+        self.client = client or AsyncAnthropic(api_key=get_settings().anthropic_api_key)
+        self.on_rate_limit = on_rate_limit
+
+    async def complete(self, request: Dict[str, Any]) -> LLMResponse:
+        try:
+            message = await self.client.messages.create(**request)
+        except RateLimitError as e:
+            if self.on_rate_limit is not None:
+                self.on_rate_limit(retry_after(e))
+            raise
+
+        # Extract text from content blocks (skipping ThinkingBlock)
+        text = "".join(block.text for block in message.content if hasattr(block, "text"))
+        usage = message.usage
+        return LLMResponse(
+            text=text.strip(),
+            provider=self.name,
+            model=request.get("model", ""),
+            stop_reason=getattr(message, "stop_reason", None),
+            usage=Usage(
+                input_tokens=usage.input_tokens,
+                output_tokens=usage.output_tokens,
+                cache_creation_input_tokens=getattr(usage, "cache_creation_input_tokens", 0) or 0,
+                cache_read_input_tokens=getattr(usage, "cache_read_input_tokens", 0) or 0,
+            )
+        )
+
+
+class GeminiProvider(LLMProvider):
+    """Gemini via the google-genai async client."""
+
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+        settings = get_settings()
+        self.client = genai.Client(api_key=api_key or settings.gemini_api_key)
+        self.model = model or settings.gemini_model
+
+    async def complete(self, request: Dict[str, Any]) -> LLMResponse:
+        contents = [
+            types.Content(
+                role="model" if message["role"] == "assistant" else "user",
+                parts=[types.Part(text=message["content"])]
+            )
+            for message in request["messages"]
+        ]
+        config = types.GenerateContentConfig(
+            system_instruction=_system_text(request) or None,
+            temperature=request.get("temperature"),
+            max_output_tokens=request.get("max_tokens")
+        )
+
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=self.model, contents=contents, config=config
+            )
+        except errors.APIError as e:
+            if e.code == 429 or e.code >= 500:
+                raise TransientProviderError(f"Gemini {e.code}: {e}") from e
+            raise
+
+        finish = None
+        if response.candidates and response.candidates[0].finish_reason is not None:
+            finish = response.candidates[0].finish_reason.value
+        metadata = response.usage_metadata
+        return LLMResponse(
+            text=(response.text or "").strip(),
+            provider=self.name,
+            model=self.model,
+            stop_reason="max_tokens" if finish == "MAX_TOKENS" else "end_turn",
+            usage=Usage(
+                input_tokens=getattr(metadata, "prompt_token_count", 0) or 0,
+                output_tokens=getattr(metadata, "candidates_token_count", 0) or 0,
+                cache_read_input_tokens=getattr(metadata, "cached_content_token_count", 0) or 0,
+            )
+        )
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Any /v1/chat/completions endpoint, e.g. the LiteLLM proxy on :4000."""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        http: Optional[httpx.AsyncClient] = None
+    ):
+        settings = get_settings()
+        self.base_url = (base_url or settings.openai_compat_base_url).rstrip("/")
+        self.api_key = api_key if api_key is not None else settings.openai_compat_api_key
+        self.model = model or settings.openai_compat_model
+        self.http = http or httpx.AsyncClient(timeout=httpx.Timeout(300.0, connect=10.0))
+
+    async def complete(self, request: Dict[str, Any]) -> LLMResponse:
+        messages = []
+        system = _system_text(request)
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.extend({"role": m["role"], "content": m["content"]} for m in request["messages"])
+
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": request.get("max_tokens"),
+        }
+        if request.get("temperature") is not None:
+            payload["temperature"] = request["temperature"]
+
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        try:
+            response = await self.http.post(
+                f"{self.base_url}/chat/completions", json=payload, headers=headers
+            )
+        except httpx.TransportError as e:
+            raise TransientProviderError(f"{self.name}: {e}") from e
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientProviderError(f"{self.name} {response.status_code}: {response.text[:200]}")
+        response.raise_for_status()
+
+        body = response.json()
+        choice = body["choices"][0]
+        usage = body.get("usage") or {}
+        return LLMResponse(
+            text=(choice["message"].get("content") or "").strip(),
+            provider=self.name,
+            model=body.get("model", self.model),
+            stop_reason="max_tokens" if choice.get("finish_reason") == "length" else "end_turn",
+            usage=Usage(
+                input_tokens=usage.get("prompt_tokens", 0),
+                output_tokens=usage.get("completion_tokens", 0),
+            )
+        )
+
+
+# ==========================================
+# Routing
+# ==========================================
+
+class ProviderStats:
+    """Rolling latency/error window for one provider."""
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.last_failure = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def record(self, ok: bool, latency: float) -> None:
+        self.requests += 1
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+        else:
+            self.errors += 1
+            self.last_failure = time.monotonic()
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ProviderRouter:
+    """
+    Routes each request across providers by health and rolling p95 latency,
+    with failover and optional hedging.
+    """
+
+    def __init__(
+        self,
+        providers: List[LLMProvider],
+        window: int = 50,
+        min_samples: int = 5,
+        max_error_rate: float = 0.5,
+        cooldown_seconds: float = 30.0,
+        hedge_after_seconds: float = 0.0
+    ):
+        """
+        Args:
+            providers: In preference order (used until there is latency data)
+            window: Requests per provider in the rolling window
+            min_samples: Successful samples before p95 is trusted for ranking
+            max_error_rate: Above this a provider is demoted...
+            cooldown_seconds: ...until this long after its last failure
+            hedge_after_seconds: Ask the next provider too if the first has
+                                 not answered by then (0 = no hedging)
+        """
+        if not providers:
+            raise ValueError("ProviderRouter needs at least one provider")
+        self.providers = providers
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.cooldown_seconds = cooldown_seconds
+        self.hedge_after_seconds = hedge_after_seconds
+        self.stats: Dict[str, ProviderStats] = {p.name: ProviderStats(window) for p in providers}
+
+    def ranked(self) -> List[LLMProvider]:
+        """Providers in the order they should be tried."""
+        now = time.monotonic()
+
+        def key(indexed: Tuple[int, LLMProvider]) -> Tuple[bool, float, int]:
+            index, provider = indexed
+            stats = self.stats[provider.name]
+            unhealthy = (
+                stats.error_rate > self.max_error_rate
+                and now - stats.last_failure < self.cooldown_seconds
+            )
+            p95 = stats.percentile(0.95) if len(stats.latencies) >= self.min_samples else None
+            return unhealthy, p95 if p95 is not None else float("inf"), index
+
+        # Preference order breaks ties (and ranks providers without data)
+        return [p for _, p in sorted(enumerate(self.providers), key=key)]
+
+    async def complete(
+        self,
+        request: Dict[str, Any],
+        hedge_slot: Optional[Callable[[], AsyncContextManager[Any]]] = None
+    ) -> LLMResponse:
+        """
+        Complete on the best provider, failing over (and hedging) as needed.
+
+        Args:
+            request: Messages API request
+            hedge_slot: Creates the governor slot a hedged request runs
+                        in. The caller's slot covers one request at a
+                        time (the first one, then each failover); a hedge
+                        runs alongside it and must be counted too.
+
+        Raises:
+            The first provider's error if every provider failed
+        """
+        candidates = self.ranked()
+        pending: Dict[asyncio.Task, str] = {}
+        errors: List[BaseException] = []
+        next_index = 0
+        hedged = False
+
+        def launch(slot: Optional[Callable[[], AsyncContextManager[Any]]] = None) -> None:
+            nonlocal next_index
+            provider = candidates[next_index]
+            next_index += 1
+            pending[asyncio.ensure_future(self._timed(provider, request, slot))] = provider.name
+
+        launch()
+        try:
+            while pending:
+                can_hedge = self.hedge_after_seconds > 0 and next_index < len(candidates)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_after_seconds if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    self.stats[candidates[next_index].name].hedges += 1
+                    logger.info(
+                        f"🪁 No reply after {self.hedge_after_seconds:.1f}s, "
+                        f"hedging to {candidates[next_index].name}"
+                    )
+                    hedged = True
+                    launch(hedge_slot)
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is None:
+                        if hedged and name != candidates[0].name:
+                            self.stats[name].hedge_wins += 1
+                        return task.result()
+                    errors.append(task.exception())
+                    logger.warning(f"⚠️ Provider {name} failed: {task.exception()}")
+
+                if not pending and next_index < len(candidates):
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+                # Retrieve late results/errors so asyncio doesn't warn
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        raise errors[0]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-provider rolling latency, error rate and hedging counters."""
+        order = [p.name for p in self.ranked()]
+        snapshot = {}
+        for name, stats in self.stats.items():
+            p50, p95 = stats.percentile(0.5), stats.percentile(0.95)
+            snapshot[name] = {
+                "rank": order.index(name),
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "error_rate": round(stats.error_rate, 4),
+                "p50_seconds": round(p50, 3) if p50 is not None else None,
+                "p95_seconds": round(p95, 3) if p95 is not None else None,
+                "hedges": stats.hedges,
+                "hedge_wins": stats.hedge_wins,
+            }
+        return snapshot
+
+    async def _timed(
+        self,
+        provider: LLMProvider,
+        request: Dict[str, Any],
+        slot: Optional[Callable[[], AsyncContextManager[Any]]] = None
+    ) -> LLMResponse:
+        if slot is None:
+            return await self._measure(provider, request)
+        async with slot():
+            return await self._measure(provider, request)
+
+    async def _measure(self, provider: LLMProvider, request: Dict[str, Any]) -> LLMResponse:
+        """
+        One request, recorded in the provider's window. A request cancelled
+        because it lost a hedge race leaves no sample: its latency is only
+        a lower bound, and without an outcome it would skew p95.
+        """
+        started = time.monotonic()
+        try:
+            response = await provider.complete(request)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.stats[provider.name].record(False, time.monotonic() - started)
+            raise
+        self.stats[provider.name].record(True, time.monotonic() - started)
+        return response
+
+
+def build_providers(
+    names: List[str],
+    on_rate_limit: Optional[Callable[[float], None]] = None
+) -> List[LLMProvider]:
+    """
+    Instantiate providers by name ("anthropic", "gemini", "openai").
+
+    Providers missing credentials are skipped with a warning.
+    """
+    settings = get_settings()
+    providers: List[LLMProvider] = []
+    for name in names:
+        if name == "anthropic":
+            providers.append(AnthropicProvider(on_rate_limit=on_rate_limit))
+        elif name == "gemini":
+            if not settings.gemini_api_key:
+                logger.warning("GEMINI_API_KEY not set, gemini provider disabled")
+                continue
+            providers.append(GeminiProvider())
+        elif name == "openai":
+            providers.append(OpenAICompatibleProvider())
+        else:
+            raise ValueError(f"Unknown LLM provider: {name}")
+    return providers
+
+
+@lru_cache()
+def get_provider_router() -> ProviderRouter:
+    """Get the process-wide router (stats are shared by all clients)."""
+    settings = get_settings()
+    names = [n.strip() for n in settings.llm_providers.split(",") if n.strip()]
+    return ProviderRouter(
+        build_providers(names, on_rate_limit=get_governor().backoff),
+        window=settings.llm_router_window,
+        max_error_rate=settings.llm_router_max_error_rate,
+        hedge_after_seconds=settings.llm_hedge_after_seconds
+    )
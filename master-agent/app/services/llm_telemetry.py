@@ -0,0 +1,171 @@
+"""
+LLM Telemetry - Per-call records of every AnthropicClient call.
+
+Each generate()/stream()/generate_bulk() call produces one CallTrace:
+which service asked, which model/provider answered, how long it queued
+in the governor, time to first token, total latency, tokens (input,
+output, estimated thinking, prompt-cache reads/writes), API attempts
+(tenacity retries), JSON repair round-trips and the outcome.
+
+Traces live in a bounded ring buffer; snapshot() aggregates rolling
+percentiles per service for /metrics/llm.
+"""
+
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config import get_settings
+
+
+@dataclass
+class CallTrace:
+    """Everything measured about one client call."""
+    service: str
+    mode: str                                   # generate / stream / bulk
+    task: Optional[str] = None
+    task_class: Optional[str] = None
+    model: Optional[str] = None
+    provider: Optional[str] = None
+    started_at: float = field(default_factory=time.time)
+    queue_wait_seconds: float = 0.0
+    ttft_seconds: Optional[float] = None        # Streams only
+    latency_seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    thinking_tokens: int = 0                    # Estimated: output minus visible text
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    api_attempts: int = 0
+    repair_attempts: int = 0
+    items: int = 1
+    outcome: str = "pending"                    # cache_hit / coalesced / valid / repaired / ...
+    error: Optional[str] = None
+    _started: float = field(default_factory=time.monotonic, repr=False)
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.api_attempts - 1)
+
+    def mark_first_token(self) -> None:
+        if self.ttft_seconds is None:
+            self.ttft_seconds = time.monotonic() - self._started
+
+    def finish(self) -> None:
+        self.latency_seconds = time.monotonic() - self._started
+        if self.outcome == "pending":
+            self.outcome = "error" if self.error else "ok"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("_started")
+        data["retries"] = self.retries
+        for key in ("queue_wait_seconds", "ttft_seconds", "latency_seconds"):
+            if data[key] is not None:
+                data[key] = round(data[key], 4)
+        return data
+
+
+# Trace of the call in progress. Inherited by the single-flight task
+# (asyncio copies the context), so _create() can fill in the details.
+current_trace: ContextVar[Optional[CallTrace]] = ContextVar("current_trace", default=None)
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+
+
+class LLMTelemetry:
+    """Bounded ring buffer of CallTraces with per-service aggregates."""
+
+    def __init__(self, capacity: int = 2000):
+        self.capacity = capacity
+        self._traces: Deque[CallTrace] = deque(maxlen=capacity)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def record(self, trace: CallTrace) -> None:
+        with self._lock:
+            self._traces.append(trace)
+            self._total += 1
+
+    def snapshot(self, service: Optional[str] = None, recent: int = 20) -> Dict[str, Any]:
+        """
+        Aggregates over the buffered calls.
+
+        Args:
+            service: Only this service (class name, e.g. "ScriptWriter")
+            recent: Number of most recent raw traces to include
+
+        Returns:
+            {"total_calls", "buffered", "services": {name: stats}, "recent": [...]}
+        """
+        with self._lock:
+            traces = [t for t in self._traces if service is None or t.service == service]
+            total = self._total
+
+        by_service: Dict[str, List[CallTrace]] = {}
+        for trace in traces:
+            by_service.setdefault(trace.service, []).append(trace)
+
+        return {
+            "total_calls": total,
+            "buffered": len(traces),
+            "capacity": self.capacity,
+            "services": {name: self._aggregate(items) for name, items in sorted(by_service.items())},
+            "recent": [t.to_dict() for t in traces[-recent:]] if recent > 0 else [],
+        }
+
+    @staticmethod
+    def _aggregate(traces: List[CallTrace]) -> Dict[str, Any]:
+        # Latency percentiles only over calls that reached the API
+        api_calls = [t for t in traces if t.api_attempts]
+        latencies = [t.latency_seconds for t in api_calls]
+        waits = [t.queue_wait_seconds for t in api_calls]
+        ttfts = [t.ttft_seconds for t in api_calls if t.ttft_seconds is not None]
+
+        outcomes: Dict[str, int] = {}
+        for trace in traces:
+            outcomes[trace.outcome] = outcomes.get(trace.outcome, 0) + 1
+
+        return {
+            "calls": len(traces),
+            "api_calls": len(api_calls),
+            "outcomes": outcomes,
+            "latency_seconds": {
+                "p50": _percentile(latencies, 0.5),
+                "p95": _percentile(latencies, 0.95),
+                "p99": _percentile(latencies, 0.99),
+            },
+            "queue_wait_seconds": {
+                "p50": _percentile(waits, 0.5),
+                "p95": _percentile(waits, 0.95),
+            },
+            "ttft_seconds": {
+                "p50": _percentile(ttfts, 0.5),
+                "p95": _percentile(ttfts, 0.95),
+            },
+            "tokens": {
+                "input": sum(t.input_tokens for t in traces),
+                "output": sum(t.output_tokens for t in traces),
+                "thinking": sum(t.thinking_tokens for t in traces),
+                "cache_read": sum(t.cache_read_tokens for t in traces),
+                "cache_creation": sum(t.cache_creation_tokens for t in traces),
+            },
+            "retries": sum(t.retries for t in traces),
+            "repair_attempts": sum(t.repair_attempts for t in traces),
+            "models": sorted({t.model for t in traces if t.model}),
+        }
+
+
+@lru_cache()
+def get_telemetry() -> LLMTelemetry:
+    """Get the process-wide telemetry buffer."""
+    return LLMTelemetry(capacity=get_settings().llm_telemetry_capacity)
@@ -11,15 +11,18 @@ SOLID Compliance:
 """
 
 import logging
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from app.services.anthropic_client import AnthropicClient
 from app.services.batch_repository import BatchRepository
+from app.services.bulk_jobs import BulkJobs
 from app.services.headline_generator import HeadlineGenerator
 from app.services.script_writer import ScriptWriter
 from app.services.visual_planner import VisualPlanner
 from app.services.production_orchestrator import ProductionOrchestrator
 from app.services.chat_router import ChatRouter
+from app.services.conversation_store import ConversationStore, batch_digest, get_conversation_store
+from app.services.conversation_summarizer import ConversationSummarizer
 from app.models.batch import BatchResponse, BatchSummary
 
 
@@ -37,7 +40,8 @@ class MasterAgentService:
     def __init__(
         self,
         ai_client: Optional[AnthropicClient] = None,
-        batch_repo: Optional[BatchRepository] = None
+        batch_repo: Optional[BatchRepository] = None,
+        conversations: Optional[ConversationStore] = None
     ):
         """
         Initialize with injected dependencies.
@@ -45,13 +49,16 @@ class MasterAgentService:
         Args:
             ai_client: Shared AI client (dependency injection)
             batch_repo: Shared batch repository (dependency injection)
+            conversations: Chat session memory (dependency injection)
         """
         # Shared dependencies
         self.ai = ai_client or AnthropicClient()
         self.batch_repo = batch_repo or BatchRepository()
+        self.conversations = conversations or get_conversation_store()
         
         # Compose services with shared dependencies
         self.router = ChatRouter(ai_client=self.ai)
+        self.summarizer = ConversationSummarizer(ai_client=self.ai)
         self.headlines = HeadlineGenerator(
             ai_client=self.ai,
             batch_repo=self.batch_repo
@@ -67,6 +74,7 @@ class MasterAgentService:
         self.production = ProductionOrchestrator(
             batch_repo=self.batch_repo
         )
+        self.bulk_jobs = BulkJobs(self.batch_repo)
         
         logger.info("🚀 Master Agent initialized with SOLID architecture")
     
@@ -74,17 +82,114 @@ class MasterAgentService:
     # Chat Interface (Delegates to ChatRouter)
     # ==========================================
     
-    async def chat(self, message: str, batch_id: Optional[str] = None) -> Dict:
+    async def chat(
+        self,
+        message: str,
+        batch_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> Dict:
         """
         Process a user chat message.
         
-        Routes intent and executes the appropriate action.
+        Routes intent and executes the appropriate action. With a
+        session_id the router also sees the (bounded) conversation so far.
         """
         # Get routing decision from AI
-        routing = await self.router.route(message, batch_id)
+        routing = await self.router.route(
+            message, batch_id, self._chat_context(batch_id, session_id), self._has_history(session_id)
+        )
+        result = await self._run_chat_action(routing, batch_id)
+        self._remember(session_id, message, result.get("reply"), result.get("action"))
+        return {**result, "session_id": session_id}
+    
+    async def chat_stream(
+        self,
+        message: str,
+        batch_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user chat message, emitting events as work progresses.
+        
+        Events: start (immediately) → reply (text deltas as the router
+        writes them) → action (routing decision / result) → for
+        start_batch: batch → item (one per headline) → done (full batch);
+        otherwise done.
+        """
+        yield {"event": "start", "batch_id": batch_id, "session_id": session_id}
+        
+        routing: Dict[str, Any] = {}
+        streamed = False
+        async for event in self.router.route_stream(
+            message, batch_id, self._chat_context(batch_id, session_id), self._has_history(session_id)
+        ):
+            if event["event"] == "reply":
+                streamed = True
+                yield event
+            else:
+                routing = event["data"]
         
+        if not streamed and routing.get("reply"):
+            yield {"event": "reply", "delta": routing["reply"]}
+        
+        args = routing.get("args") or {}
+        if routing.get("action") == "start_batch":
+            self._remember(session_id, message, routing.get("reply"), "start_batch")
+            yield {"event": "action", "action": "start_batch", "args": args}
+            async for event in self.start_batch_stream(
+                count=args.get("count", 10),
+                topic=args.get("topic")
+            ):
+                yield event
+            return
+        
+        result = await self._run_chat_action(routing, batch_id)
+        self._remember(session_id, message, result.get("reply"), result.get("action"))
+        yield {"event": "action", "action": result.get("action"), "data": result.get("data")}
+        yield {"event": "done", "reply": result.get("reply")}
+    
+    def _chat_context(self, batch_id: Optional[str], session_id: Optional[str]) -> Optional[str]:
+        """Batch digest + conversation memory for the router (constant size)."""
+        parts: List[str] = []
+        if batch_id:
+            batch = self.batch_repo.get(batch_id)
+            if batch:
+                parts.append(batch_digest(batch))
+        if session_id:
+            history = self.conversations.render(session_id)
+            if history:
+                parts.append(f"Conversation so far:\n{history}")
+        return "\n".join(parts) or None
+    
+    def _has_history(self, session_id: Optional[str]) -> bool:
+        """True if the session already has turns (verbatim or summarized)."""
+        if not session_id:
+            return False
+        conversation = self.conversations.get(session_id)
+        return bool(conversation.turns or conversation.summary)
+    
+    def _remember(
+        self,
+        session_id: Optional[str],
+        message: str,
+        reply: Optional[str],
+        action: Optional[str]
+    ) -> None:
+        """Store the exchange and fold old turns if over budget."""
+        if not session_id:
+            return
+        self.conversations.append(session_id, "user", message)
+        answer = reply or ""
+        if action:
+            answer = f"{answer} [{action}]".strip()
+        if answer:
+            self.conversations.append(session_id, "assistant", answer)
+        self.conversations.schedule_compaction(session_id, self.summarizer.summarize)
+    
+    async def _run_chat_action(self, routing: Dict[str, Any], batch_id: Optional[str]) -> Dict:
+        """Execute a routing decision (shared by chat() and chat_stream())."""
         action = routing.get("action")
-        args = routing.get("args", {})
+        args = routing.get("args") or {}
         reply = routing.get("reply")
         data = None
         
@@ -135,6 +240,53 @@ class MasterAgentService:
             topic=topic
         )
     
+    async def start_batches_bulk(
+        self,
+        topics: List[str],
+        count: int = 10
+    ) -> List[BatchResponse]:
+        """
+        Start one batch per topic in offline bulk mode (Message Batches API).
+        
+        Returns at once with the batches in PLANNING state; the headlines
+        are generated in the background (poll get_batch()).
+        """
+        batches = self.headlines.begin_bulk(topics)
+        batch_ids = [batch.id for batch in batches]
+        self.bulk_jobs.start(
+            "headlines",
+            batches,
+            lambda: self.headlines.generate_bulk(topics=topics, count=count, batch_ids=batch_ids)
+        )
+        return batches
+    
+    async def start_batch_stream(
+        self,
+        count: int = 10,
+        days: int = 7,
+        min_views: int = 100000,
+        topic: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Start a new batch, emitting events as headlines are produced.
+        
+        Events: batch (id) → item (one per headline) → done (full batch).
+        """
+        batch_id = self.headlines.new_batch_id()
+        yield {"event": "batch", "batch_id": batch_id}
+        
+        async for headline in self.headlines.generate_iter(
+            count=count,
+            days=days,
+            min_views=min_views,
+            topic=topic,
+            batch_id=batch_id
+        ):
+            yield {"event": "item", "data": headline.model_dump(mode="json")}
+        
+        batch = self.batch_repo.get_or_raise(batch_id)
+        yield {"event": "done", "data": batch.model_dump(mode="json")}
+    
     # ==========================================
     # Stage 2: Scripts (Delegates to ScriptWriter)
     # ==========================================
@@ -144,16 +296,51 @@ class MasterAgentService:
         batch_id: str,
         approved_ids: List[str],
         rejected_ids: List[str] = None,
-        edits: Dict[str, str] = None
+        edits: Dict[str, str] = None,
+        bulk: bool = False
     ) -> BatchResponse:
-        """Approve headlines and generate scripts."""
+        """
+        Approve headlines and generate scripts.
+        
+        With bulk=True this returns at once (batch in DRAFTING) and the
+        scripts are written in the background (poll get_batch()).
+        """
+        if bulk:
+            batch = self.scripts.begin_scripts(batch_id, approved_ids, rejected_ids, edits)
+            self.bulk_jobs.start("scripts", [batch], lambda: self.scripts.write_scripts_bulk(batch_id))
+            return batch
+        
         return await self.scripts.generate_scripts(
             batch_id=batch_id,
             approved_ids=approved_ids,
             rejected_ids=rejected_ids or [],
-            edits=edits or {}
+            edits=edits or {},
+            bulk=bulk
         )
     
+    async def approve_headlines_stream(
+        self,
+        batch_id: str,
+        approved_ids: List[str],
+        rejected_ids: List[str] = None,
+        edits: Dict[str, str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Approve headlines, emitting an event per script as it is written.
+        
+        Events: item (one per script) → done (full batch).
+        """
+        async for script in self.scripts.generate_scripts_iter(
+            batch_id=batch_id,
+            approved_ids=approved_ids,
+            rejected_ids=rejected_ids or [],
+            edits=edits or {}
+        ):
+            yield {"event": "item", "data": script.model_dump(mode="json")}
+        
+        batch = self.batch_repo.get_or_raise(batch_id)
+        yield {"event": "done", "data": batch.model_dump(mode="json")}
+    
     # ==========================================
     # Stage 3: Visuals (Delegates to VisualPlanner)
     # ==========================================
@@ -163,14 +350,27 @@ class MasterAgentService:
         batch_id: str,
         approved_ids: List[str],
         rejected_ids: List[str] = None,
-        feedback: Dict[str, str] = None
+        feedback: Dict[str, str] = None,
+        bulk: bool = False
     ) -> BatchResponse:
-        """Approve scripts and create visual blueprints."""
+        """
+        Approve scripts and create visual blueprints.
+        
+        With bulk=True this returns at once (batch still in REVIEW_SCRIPTS,
+        bulk_job set) and the blueprints are created in the background
+        (poll get_batch() until PRODUCTION).
+        """
+        if bulk:
+            batch = self.visuals.begin_blueprints(batch_id, approved_ids, rejected_ids)
+            self.bulk_jobs.start("visuals", [batch], lambda: self.visuals.create_blueprints_bulk(batch_id))
+            return batch
+        
         return await self.visuals.create_blueprints(
             batch_id=batch_id,
             approved_ids=approved_ids,
             rejected_ids=rejected_ids,
-            feedback=feedback
+            feedback=feedback,
+            bulk=bulk
         )
     
     # ==========================================
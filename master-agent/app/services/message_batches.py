@@ -0,0 +1,227 @@
+"""
+Message Batches - Offline bulk execution through the Message Batches API.
+
+Overnight runs don't need interactive latency. Submitting them as one
+message batch costs half the price and does not compete with interactive
+chat for the per-minute rate limits. Results arrive within 24 hours
+(usually minutes) and are matched back to requests by custom_id.
+
+The transport is pluggable: AnthropicBatchTransport talks to the real API
+(or to any compatible endpoint via settings.anthropic_batches_base_url,
+e.g. a local fake for tests), and tests can inject their own.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from anthropic import AsyncAnthropic
+
+from app.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+# API constraint on custom_id
+CUSTOM_ID_RE = re.compile(r"^[a-zA-Z0-9_-]{1,64}$")
+
+# Requests per submitted batch (the API allows 100k, we never need that many)
+MAX_BATCH_REQUESTS = 10_000
+
+
+class BatchTransport(ABC):
+    """Minimal surface of the Message Batches API used by the runner."""
+
+    @abstractmethod
+    async def create(self, requests: List[Dict[str, Any]]) -> str:
+        """
+        Submit requests ([{"custom_id": ..., "params": {...}}]).
+
+        Returns:
+            Batch ID
+        """
+
+    @abstractmethod
+    async def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        """Batch status: {"processing_status": ..., "request_counts": {...}}."""
+
+    @abstractmethod
+    async def results(self, batch_id: str) -> List[Dict[str, Any]]:
+        """
+        Per-request results of an ended batch:
+        [{"custom_id": ..., "result": {"type": "succeeded", "message": {...}}}]
+        """
+
+    async def cancel(self, batch_id: str) -> None:
+        """Best-effort cancel (optional for transports)."""
+
+
+class AnthropicBatchTransport(BatchTransport):
+    """Transport backed by the official SDK."""
+
+    def __init__(self, client: Optional[AsyncAnthropic] = None):
+        """
+        Args:
+            client: Injected SDK client. If None, one is built from settings,
+                    honouring anthropic_batches_base_url when set.
+        """
+        if client is None:
+            settings = get_settings()
+            client = AsyncAnthropic(
+                api_key=settings.anthropic_api_key,
+                base_url=settings.anthropic_batches_base_url or None
+            )
+        self.client = client
+
+    async def create(self, requests: List[Dict[str, Any]]) -> str:
+        batch = await self.client.messages.batches.create(requests=requests)
+        return batch.id
+
+    async def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        batch = await self.client.messages.batches.retrieve(batch_id)
+        return batch.model_dump()
+
+    async def results(self, batch_id: str) -> List[Dict[str, Any]]:
+        decoder = await self.client.messages.batches.results(batch_id)
+        return [entry.model_dump() async for entry in decoder]
+
+    async def cancel(self, batch_id: str) -> None:
+        await self.client.messages.batches.cancel(batch_id)
+
+
+@dataclass
+class BatchItemResult:
+    """Outcome of one request in a batch."""
+    custom_id: str
+    status: str                          # succeeded / errored / canceled / expired
+    text: str = ""
+    stop_reason: Optional[str] = None
+    usage: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "succeeded"
+
+
+class MessageBatchRunner:
+    """
+    Submits requests as message batches and polls until they end.
+
+    Usage:
+        runner = MessageBatchRunner()
+        results = await runner.run([{"custom_id": "hl_1", "params": {...}}])
+        results["hl_1"].text
+    """
+
+    def __init__(
+        self,
+        transport: Optional[BatchTransport] = None,
+        poll_seconds: Optional[float] = None,
+        timeout_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            transport: Injected transport. If None, uses the SDK transport.
+            poll_seconds: Delay between status polls
+            timeout_seconds: Give up (and cancel) after this long
+        """
+        settings = get_settings()
+        self.transport = transport or AnthropicBatchTransport()
+        self.poll_seconds = poll_seconds if poll_seconds is not None else settings.llm_batch_poll_seconds
+        self.timeout_seconds = (
+            timeout_seconds if timeout_seconds is not None else settings.llm_batch_timeout_seconds
+        )
+
+    async def run(self, requests: List[Dict[str, Any]]) -> Dict[str, BatchItemResult]:
+        """
+        Run requests to completion.
+
+        Args:
+            requests: [{"custom_id": ..., "params": <messages.create kwargs>}]
+
+        Returns:
+            custom_id -> BatchItemResult (requests missing from the
+            results are reported as "expired")
+
+        Raises:
+            ValueError: On invalid or duplicate custom_ids
+            TimeoutError: If a batch does not end within the timeout
+        """
+        seen = set()
+        for request in requests:
+            custom_id = request["custom_id"]
+            if not CUSTOM_ID_RE.match(custom_id):
+                raise ValueError(f"Invalid batch custom_id: {custom_id!r}")
+            if custom_id in seen:
+                raise ValueError(f"Duplicate batch custom_id: {custom_id!r}")
+            seen.add(custom_id)
+
+        results: Dict[str, BatchItemResult] = {}
+        chunks = [
+            requests[i:i + MAX_BATCH_REQUESTS]
+            for i in range(0, len(requests), MAX_BATCH_REQUESTS)
+        ]
+        for chunk_results in await asyncio.gather(*(self._run_one(chunk) for chunk in chunks)):
+            results.update(chunk_results)
+
+        for custom_id in seen - results.keys():
+            results[custom_id] = BatchItemResult(custom_id, "expired", error="missing from batch results")
+        return results
+
+    async def _run_one(self, requests: List[Dict[str, Any]]) -> Dict[str, BatchItemResult]:
+        batch_id = await self.transport.create(requests)
+        logger.info(f"📦 Submitted message batch {batch_id} ({len(requests)} requests)")
+
+        started = time.monotonic()
+        while True:
+            status = await self.transport.retrieve(batch_id)
+            if status.get("processing_status") == "ended":
+                break
+            if time.monotonic() - started > self.timeout_seconds:
+                try:
+                    await self.transport.cancel(batch_id)
+                except Exception as e:
+                    logger.warning(f"Failed to cancel batch {batch_id}: {e}")
+                raise TimeoutError(f"Message batch {batch_id} did not end in {self.timeout_seconds}s")
+            await asyncio.sleep(self.poll_seconds)
+
+        counts = status.get("request_counts") or {}
+        logger.info(
+            f"📦 Message batch {batch_id} ended after {time.monotonic() - started:.0f}s: {counts}"
+        )
+
+        return {
+            entry["custom_id"]: self._parse_entry(entry)
+            for entry in await self.transport.results(batch_id)
+        }
+
+    @staticmethod
+    def _parse_entry(entry: Dict[str, Any]) -> BatchItemResult:
+        result = entry.get("result") or {}
+        status = result.get("type", "errored")
+        item = BatchItemResult(custom_id=entry["custom_id"], status=status)
+
+        if status == "succeeded":
+            message = result.get("message") or {}
+            # Skip thinking blocks, same as AnthropicClient
+            item.text = "".join(
+                block.get("text", "")
+                for block in message.get("content", [])
+                if block.get("type") == "text"
+            ).strip()
+            item.stop_reason = message.get("stop_reason")
+            item.usage = message.get("usage")
+        elif status == "errored":
+            error = result.get("error") or {}
+            # Error responses are wrapped: {"type": "error", "error": {...}}
+            detail = error.get("error", error)
+            item.error = f"{detail.get('type', 'error')}: {detail.get('message', '')}"
+        else:
+            item.error = status
+
+        return item
@@ -0,0 +1,141 @@
+"""
+Pattern Analyzer Service - Per-item analysis of viral content.
+
+SOLID Principle: Single Responsibility (S)
+- This class ONLY analyzes individual content items (pain, trigger,
+  psychotype, emotion, pattern)
+- Each item is analyzed once; results live in the PatternStore and are
+  reused by every headline prompt until the item's content changes
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from app.prompts.producer_prompts import PATTERN_ANALYSIS_PROMPT, PATTERN_ANALYSIS_TASK
+from app.services.base.ai_service import AIService
+from app.services.llm_governor import Priority
+from app.services.pattern_store import ANALYSIS_FIELDS, PatternStore, get_pattern_store
+
+
+# Items per model call
+CHUNK_SIZE = 10
+
+# Transcript chars sent for analysis (the hook and the first beats)
+TRANSCRIPT_CHARS = 1500
+
+
+class PatternAnalyzer(AIService):
+    """
+    Service for per-item pattern analysis.
+
+    Responsibilities:
+    1. Look up stored analyses for trend rows
+    2. Analyze only new or changed items, in small groups
+    3. Persist the results
+    """
+
+    priority = Priority.BULK
+    task = "patterns"
+    task_class = "short"
+
+    def __init__(self, store: Optional[PatternStore] = None, **kwargs):
+        """
+        Args:
+            store: Injected analysis store. If None, uses the shared one.
+        """
+        super().__init__(**kwargs)
+        self.store = store or get_pattern_store()
+
+    async def analyses_for(
+        self,
+        items: List[Dict[str, Any]],
+        analyze_missing: bool = True
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        Analyses for trend rows.
+
+        Args:
+            items: Rows from TrendAnalyzer.get_viral_content()
+            analyze_missing: Analyze items without a stored analysis now
+                             (False = return only what is stored)
+
+        Returns:
+            {item id: analysis}; items whose analysis failed are absent
+        """
+        found = await self.store.get_many(items)
+        if analyze_missing:
+            missing = [item for item in items if item.get("id") and str(item["id"]) not in found]
+            if missing:
+                found.update(await self._analyze(missing))
+        return found
+
+    async def refresh(self, items: List[Dict[str, Any]]) -> int:
+        """
+        Analyze the items that have no stored analysis for their current
+        content (background prefetch).
+
+        Returns:
+            Number of items analyzed
+        """
+        found = await self.store.get_many(items)
+        missing = [item for item in items if item.get("id") and str(item["id"]) not in found]
+        if not missing:
+            return 0
+        return len(await self._analyze(missing))
+
+    async def _analyze(self, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+        """Analyze items in concurrent groups and store the results."""
+        chunks = [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+        results = await asyncio.gather(
+            *(self._analyze_chunk(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+
+        analyses: Dict[str, Dict[str, str]] = {}
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                # Those items go to the prompt with their transcript instead
+                self.logger.warning(f"Pattern analysis of {len(chunk)} items failed: {result}")
+                continue
+            analyses.update(result)
+
+        by_id = {str(item["id"]): item for item in items}
+        await self.store.put_many(
+            [(by_id[item_id], analysis) for item_id, analysis in analyses.items()],
+            model=self.ai._model_for(self.task_class)
+        )
+        self.logger.info(f"Analyzed {len(analyses)}/{len(items)} content items")
+        return analyses
+
+    async def _analyze_chunk(self, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+        payload = [
+            {
+                "id": str(item["id"]),
+                "headline": item.get("headline") or "",
+                "transcript": " ".join((item.get("transcript") or "").split())[:TRANSCRIPT_CHARS],
+            }
+            for item in items
+        ]
+        result = await self._generate_json(
+            PATTERN_ANALYSIS_TASK.format(
+                items_json=json.dumps(payload, ensure_ascii=False, indent=1)
+            ),
+            prefix=PATTERN_ANALYSIS_PROMPT,
+            temperature=0.2,
+            items=len(items)
+        )
+
+        wanted = {entry["id"] for entry in payload}
+        analyses: Dict[str, Dict[str, str]] = {}
+        for entry in result.get("analyses", []) if isinstance(result, dict) else []:
+            if not isinstance(entry, dict) or str(entry.get("id")) not in wanted:
+                continue
+            analysis = {
+                name: str(entry[name]).strip()
+                for name in ANALYSIS_FIELDS
+                if entry.get(name)
+            }
+            if analysis:
+                analyses[str(entry["id"])] = analysis
+        return analyses
@@ -0,0 +1,183 @@
+"""
+Pattern Store - Persisted per-content-item pattern analyses.
+
+Every headline prompt used to ask the model to re-derive pain, trigger,
+psychotype and pattern for the same viral videos. An item's analysis
+only depends on its headline and transcript, so it is stored once,
+keyed by (item id, content hash). An edited item gets a new hash and is
+analyzed again; its old analysis is replaced. The SQLite file lives in
+settings.data_dir and survives restarts.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+# Fields of one analysis (see PATTERN_ANALYSIS_PROMPT)
+ANALYSIS_FIELDS = ("pain", "trigger", "psychotype", "emotion", "pattern")
+
+
+def content_hash(item: Dict[str, Any]) -> str:
+    """Hash of what the analysis depends on (headline and transcript)."""
+    text = f"{item.get('headline') or ''}\n{item.get('transcript') or ''}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class PatternStore:
+    """
+    SQLite table of analyses.
+
+    Usage:
+        found = await store.get_many(trends)     # {item id: analysis}
+        await store.put_many([(item, analysis), ...], model="...")
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: SQLite file. None = in-memory only (tests, one process).
+        """
+        self.db_path = db_path or ":memory:"
+        self._lock = threading.Lock()
+        # A :memory: database lives only as long as its connection
+        self._memory_conn = sqlite3.connect(":memory:", check_same_thread=False) if db_path is None else None
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "stored": 0,
+        }
+        self._init_db()
+
+    async def get_many(self, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+        """
+        Stored analyses of items whose content is unchanged.
+
+        Args:
+            items: Trend rows (need id, headline, transcript)
+
+        Returns:
+            {item id: analysis} for the items found
+        """
+        if not items:
+            return {}
+        return await asyncio.to_thread(self._get_many, items)
+
+    async def put_many(
+        self,
+        entries: List[Tuple[Dict[str, Any], Dict[str, str]]],
+        model: Optional[str] = None
+    ) -> None:
+        """Store (item, analysis) pairs, replacing analyses of older content."""
+        if entries:
+            await asyncio.to_thread(self._put_many, entries, model)
+
+    def size(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM pattern_analyses").fetchone()[0]
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "size": self.size()}
+
+    # ==========================================
+    # Internals
+    # ==========================================
+
+    def _get_many(self, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+        wanted = {str(item["id"]): content_hash(item) for item in items if item.get("id")}
+        found: Dict[str, Dict[str, str]] = {}
+        ids = list(wanted)
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._connect() as conn:
+                rows = conn.execute(
+                    f"SELECT item_id, content_hash, analysis FROM pattern_analyses WHERE item_id IN ({placeholders})",
+                    chunk
+                ).fetchall()
+            for item_id, digest, analysis in rows:
+                if wanted.get(item_id) == digest:
+                    found[item_id] = json.loads(analysis)
+
+        self.stats["hits"] += len(found)
+        self.stats["misses"] += len(wanted) - len(found)
+        return found
+
+    def _put_many(
+        self,
+        entries: List[Tuple[Dict[str, Any], Dict[str, str]]],
+        model: Optional[str]
+    ) -> None:
+        now = time.time()
+        rows = [
+            (str(item["id"]), content_hash(item), json.dumps(analysis, ensure_ascii=False), model, now)
+            for item, analysis in entries
+        ]
+        with self._connect() as conn:
+            conn.executemany(
+                "DELETE FROM pattern_analyses WHERE item_id = ? AND content_hash != ?",
+                [(item_id, digest) for item_id, digest, *_ in rows]
+            )
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO pattern_analyses (item_id, content_hash, analysis, model, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+        self.stats["stored"] += len(rows)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection that commits on success and always closes."""
+        if self._memory_conn is not None:
+            with self._lock, self._memory_conn:
+                yield self._memory_conn
+            return
+
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        directory = os.path.dirname(self.db_path) if self._memory_conn is None else ""
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pattern_analyses (
+                    item_id TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    analysis TEXT NOT NULL,
+                    model TEXT,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (item_id, content_hash)
+                )
+                """
+            )
+
+
+@lru_cache()
+def get_pattern_store() -> PatternStore:
+    """Get the process-wide store."""
+    settings = get_settings()
+    return PatternStore(db_path=os.path.join(settings.data_dir, "pattern_analyses.db"))
@@ -0,0 +1,279 @@
+"""
+Response Cache - Content-addressed cache for LLM generations.
+
+Two tiers:
+- Memory: bounded LRU (entries + bytes) for hot prompts in this process
+- Disk: SQLite table, survives restarts and is shared by workers
+
+Both tiers expire entries after ttl_seconds; a disk hit copied into
+memory keeps the expiry of the disk entry.
+
+Keys are SHA-256 digests of the normalized request (model, system prompt,
+prompt, temperature, response_format, ...), so identical requests hit the
+same entry regardless of which service issued them.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+# Sentinel for "not in cache" (None/"" are valid cached values)
+MISS = object()
+
+
+def make_cache_key(**parts: Any) -> str:
+    """
+    Build a content-addressed key from request parts.
+
+    Args:
+        **parts: Anything that influences the generated output
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON encoding
+    """
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Tiered (memory LRU + SQLite) cache for AI responses.
+
+    Values are stored JSON-encoded, so anything generate() returns
+    (dict, list or str) round-trips through both tiers.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_entries: int = 512,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl_seconds: int = 24 * 3600,
+        disk_enabled: bool = True
+    ):
+        """
+        Initialize cache tiers.
+
+        Args:
+            db_path: SQLite file for the disk tier
+            max_entries: Memory tier entry limit
+            max_bytes: Memory tier size limit (encoded bytes)
+            ttl_seconds: Time-to-live of both tiers (0 = never expires)
+            disk_enabled: Disable to run memory-only
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path if disk_enabled else None
+
+        # key -> (expires_at, encoded)
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "bytes_read": 0,
+            "bytes_written": 0,
+        }
+
+        if self.db_path:
+            self._init_db()
+
+    # ==========================================
+    # Public API
+    # ==========================================
+
+    async def get(self, key: str) -> Any:
+        """
+        Look up a key in memory, then on disk.
+
+        Returns:
+            Cached value, or MISS
+        """
+        encoded = self._memory_get(key)
+        if encoded is not None:
+            self.stats["memory_hits"] += 1
+            self.stats["bytes_read"] += len(encoded)
+            return json.loads(encoded)
+
+        if self.db_path:
+            found = await asyncio.to_thread(self._disk_get, key)
+            if found is not None:
+                encoded, expires_at = found
+                self.stats["disk_hits"] += 1
+                self.stats["bytes_read"] += len(encoded)
+                self._memory_put(key, encoded, expires_at)
+                return json.loads(encoded)
+
+        self.stats["misses"] += 1
+        return MISS
+
+    async def set(self, key: str, value: Any) -> None:
+        """Store a value in both tiers."""
+        encoded = json.dumps(value, ensure_ascii=False)
+        self._memory_put(key, encoded)
+        if self.db_path:
+            await asyncio.to_thread(self._disk_put, key, encoded)
+        self.stats["writes"] += 1
+        self.stats["bytes_written"] += len(encoded)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus current tier sizes."""
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = lookups - self.stats["misses"]
+        return {
+            **self.stats,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Drop all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM llm_cache")
+
+    # ==========================================
+    # Memory tier
+    # ==========================================
+
+    def _expires_at(self, created_at: float) -> float:
+        return created_at + self.ttl_seconds if self.ttl_seconds else float("inf")
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+
+            expires_at, encoded = entry
+            if time.time() > expires_at:
+                del self._memory[key]
+                self._memory_bytes -= len(encoded)
+                return None
+            self._memory.move_to_end(key)
+            return encoded
+
+    def _memory_put(self, key: str, encoded: str, expires_at: Optional[float] = None) -> None:
+        size = len(encoded)
+        if size > self.max_bytes:
+            return
+        if expires_at is None:
+            expires_at = self._expires_at(time.time())
+
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous[1])
+
+            self._memory[key] = (expires_at, encoded)
+            self._memory_bytes += size
+
+            while self._memory and (
+                len(self._memory) > self.max_entries
+                or self._memory_bytes > self.max_bytes
+            ):
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self.stats["evictions"] += 1
+
+    # ==========================================
+    # Disk tier
+    # ==========================================
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection that commits on success and always closes."""
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            if self.ttl_seconds:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,)
+                )
+
+    def _disk_get(self, key: str) -> Optional[Tuple[str, float]]:
+        """(encoded value, expires_at), or None if missing or expired."""
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if not row:
+                    return None
+
+                value, created_at = row
+                if self.ttl_seconds and time.time() - created_at > self.ttl_seconds:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    return None
+                return value, self._expires_at(created_at)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache read failed: {e}")
+            return None
+
+    def _disk_put(self, key: str, encoded: str) -> None:
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, encoded, time.time())
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed: {e}")
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide cache instance."""
+    settings = get_settings()
+    return ResponseCache(
+        db_path=os.path.join(settings.data_dir, "llm_cache.db"),
+        max_entries=settings.llm_cache_max_entries,
+        max_bytes=settings.llm_cache_max_bytes,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        disk_enabled=settings.llm_cache_disk_enabled
+    )
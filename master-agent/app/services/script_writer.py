@@ -8,7 +8,7 @@ SOLID Principle: Single Responsibility (S)
 
 import json
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from app.models.batch import (
     BatchResponse,
@@ -17,8 +17,14 @@ from app.models.batch import (
     ScriptItem,
     ItemStatus,
 )
-from app.prompts.producer_prompts import SCRIPT_WRITER_PROMPT, SCRIPT_REFINE_PROMPT
+from app.prompts.producer_prompts import (
+    SCRIPT_REFINE_PROMPT,
+    SCRIPT_REFINE_TASK,
+    SCRIPT_WRITER_PROMPT,
+    SCRIPT_WRITER_TASK,
+)
 from app.services.base.ai_service import AIService
+from app.services.llm_governor import Priority
 from app.services.batch_repository import BatchRepository
 
 
@@ -32,6 +38,10 @@ class ScriptWriter(AIService):
     3. Handle script refinement based on feedback
     """
     
+    priority = Priority.BULK
+    task = "scripts"
+    use_cache = False
+    
     def __init__(self, batch_repo: Optional[BatchRepository] = None, **kwargs):
         """
         Initialize with dependencies.
@@ -47,7 +57,8 @@ class ScriptWriter(AIService):
         batch_id: str,
         approved_ids: List[str],
         rejected_ids: List[str] = None,
-        edits: Dict[str, str] = None
+        edits: Dict[str, str] = None,
+        bulk: bool = False
     ) -> BatchResponse:
         """
         Generate scripts for approved headlines.
@@ -57,10 +68,115 @@ class ScriptWriter(AIService):
             approved_ids: List of approved headline IDs
             rejected_ids: List of rejected headline IDs
             edits: Dict of headline_id -> edited_text
+            bulk: Offline mode: one Message Batches request per headline
+                  (cheaper, not interactive - may take minutes to hours)
             
         Returns:
             Updated batch with scripts
         """
+        batch, approved_headlines = self._prepare(batch_id, approved_ids, rejected_ids, edits)
+        
+        if bulk:
+            scripts = await self._generate_scripts_bulk(approved_headlines)
+        else:
+            result = await self._generate_json(
+                self._build_task(approved_headlines),
+                prefix=SCRIPT_WRITER_PROMPT,
+                items=len(approved_headlines)
+            )
+            scripts = self._parse_scripts(result)
+        
+        # Update batch
+        batch.scripts = scripts
+        batch.state = BatchState.REVIEW_SCRIPTS
+        self.batch_repo.save(batch)
+        
+        self.logger.info(f"Generated {len(scripts)} scripts for batch {batch_id}")
+        
+        return batch
+    
+    async def generate_scripts_iter(
+        self,
+        batch_id: str,
+        approved_ids: List[str],
+        rejected_ids: List[str] = None,
+        edits: Dict[str, str] = None
+    ) -> AsyncIterator[ScriptItem]:
+        """
+        Streaming variant of generate_scripts(): yields each script as soon
+        as Claude has finished writing it.
+        
+        The batch sits in DRAFTING while scripts arrive and moves to
+        REVIEW_SCRIPTS when the stream completes.
+        """
+        batch, approved_headlines = self._prepare(batch_id, approved_ids, rejected_ids, edits)
+        prompt = self._build_task(approved_headlines)
+        
+        batch.scripts = []
+        batch.state = BatchState.DRAFTING
+        self.batch_repo.save(batch)
+        
+        try:
+            async for item in self._stream_json_items(
+                prompt, prefix=SCRIPT_WRITER_PROMPT, items=len(approved_headlines)
+            ):
+                script = self._parse_script(item)
+                if script is None:
+                    continue
+                batch.scripts.append(script)
+                self.batch_repo.save(batch)
+                yield script
+        except Exception as e:
+            batch.state = BatchState.FAILED
+            batch.errors.append(str(e))
+            self.batch_repo.save(batch)
+            raise
+        
+        batch.state = BatchState.REVIEW_SCRIPTS
+        self.batch_repo.save(batch)
+        self.logger.info(f"Streamed {len(batch.scripts)} scripts for batch {batch_id}")
+    
+    def begin_scripts(
+        self,
+        batch_id: str,
+        approved_ids: List[str],
+        rejected_ids: List[str] = None,
+        edits: Dict[str, str] = None
+    ) -> BatchResponse:
+        """
+        Apply approvals/edits and move the batch to DRAFTING, for an
+        offline run of write_scripts_bulk() in the background.
+        
+        Raises:
+            ValueError: Batch not found or no headline approved
+        """
+        batch, _ = self._prepare(batch_id, approved_ids, rejected_ids, edits)
+        batch.state = BatchState.DRAFTING
+        self.batch_repo.save(batch)
+        return batch
+    
+    async def write_scripts_bulk(self, batch_id: str) -> BatchResponse:
+        """
+        Offline scripts for the APPROVED headlines of a batch prepared by
+        begin_scripts(); moves it to REVIEW_SCRIPTS.
+        """
+        batch = self.batch_repo.get_or_raise(batch_id)
+        approved = [hl for hl in batch.headlines if hl.status == ItemStatus.APPROVED]
+        batch.scripts = await self._generate_scripts_bulk(approved)
+        batch.state = BatchState.REVIEW_SCRIPTS
+        self.batch_repo.save(batch)
+        
+        self.logger.info(f"Generated {len(batch.scripts)} scripts for batch {batch_id} (bulk)")
+        return batch
+    
+    def _prepare(
+        self,
+        batch_id: str,
+        approved_ids: List[str],
+        rejected_ids: Optional[List[str]],
+        edits: Optional[Dict[str, str]]
+    ) -> Tuple[BatchResponse, List[HeadlineItem]]:
+        """Apply approvals/edits; returns the batch and its approved headlines."""
         rejected_ids = rejected_ids or []
         edits = edits or {}
         
@@ -74,30 +190,38 @@ class ScriptWriter(AIService):
         if not approved_headlines:
             raise ValueError("No headlines approved for script generation")
         
-        # Build prompt for script generation
+        return batch, approved_headlines
+    
+    def _build_task(self, headlines: List[HeadlineItem]) -> str:
+        """Build the dynamic script-writing task for these headlines."""
         headlines_json = [
             {"id": hl.id, "headline": hl.headline}
-            for hl in approved_headlines
+            for hl in headlines
         ]
         
-        prompt = SCRIPT_WRITER_PROMPT.format(
+        return SCRIPT_WRITER_TASK.format(
             headlines_json=json.dumps(headlines_json, indent=2, ensure_ascii=False)
         )
+    
+    async def _generate_scripts_bulk(self, headlines: List[HeadlineItem]) -> List[ScriptItem]:
+        """
+        One batch request per headline; results are mapped back by position,
+        so the script keeps its headline's ID whatever the model echoes.
+        """
+        prompts = {f"item_{i}": self._build_task([hl]) for i, hl in enumerate(headlines)}
+        results = await self._generate_json_bulk(prompts, prefix=SCRIPT_WRITER_PROMPT)
         
-        # Generate scripts
-        result = await self._generate_json(prompt)
-        
-        # Parse scripts
-        scripts = self._parse_scripts(result)
-        
-        # Update batch
-        batch.scripts = scripts
-        batch.state = BatchState.REVIEW_SCRIPTS
-        self.batch_repo.save(batch)
-        
-        self.logger.info(f"Generated {len(scripts)} scripts for batch {batch_id}")
+        scripts = []
+        for i, hl in enumerate(headlines):
+            parsed = self._parse_scripts(results.get(f"item_{i}"))
+            if not parsed:
+                self.logger.warning(f"No script generated for headline {hl.id}")
+                continue
+            script = parsed[0]
+            script.id = hl.id
+            scripts.append(script)
         
-        return batch
+        return scripts
     
     async def refine_script(
         self,
@@ -122,12 +246,19 @@ class ScriptWriter(AIService):
         if not script:
             raise ValueError(f"Script {script_id} not found in batch {batch_id}")
         
-        prompt = SCRIPT_REFINE_PROMPT.format(
+        prompt = SCRIPT_REFINE_TASK.format(
             original_script=json.dumps(script.model_dump(), indent=2),
             feedback=feedback
         )
         
-        result = await self._generate_json(prompt)
+        # A user is waiting on this single edit, don't queue it behind bulk work
+        result = await self._generate_json(
+            prompt,
+            prefix=SCRIPT_REFINE_PROMPT,
+            priority=Priority.NORMAL,
+            task="refine",
+            task_class="short"
+        )
         
         # Update script with refined content
         if isinstance(result, dict):
@@ -169,14 +300,25 @@ class ScriptWriter(AIService):
         items = result if isinstance(result, list) else []
         
         for item in items:
-            scripts.append(ScriptItem(
-                id=item["id"],
-                headline=item["headline"],
-                caption=item["caption"],
-                reasoning=item["reasoning"],
-                hook_type=item.get("hook_type"),
-                cta=item.get("cta"),
-                status=ItemStatus.PENDING
-            ))
+            script = self._parse_script(item)
+            if script is not None:
+                scripts.append(script)
         
         return scripts
+    
+    def _parse_script(self, item: Any) -> Optional[ScriptItem]:
+        """Parse a single generated element (None if required fields are missing)."""
+        required = ("id", "headline", "caption", "reasoning")
+        if not isinstance(item, dict) or any(field not in item for field in required):
+            self.logger.warning(f"Skipping malformed script item: {item!r}")
+            return None
+        
+        return ScriptItem(
+            id=item["id"],
+            headline=item["headline"],
+            caption=item["caption"],
+            reasoning=item["reasoning"],
+            hook_type=item.get("hook_type"),
+            cta=item.get("cta"),
+            status=ItemStatus.PENDING
+        )
@@ -0,0 +1,108 @@
+"""
+Single Flight - Coalescing of identical concurrent requests.
+
+A double-click, or a frontend retry of /producer/start or /regenerate,
+fires the same prompt at Claude several times within milliseconds. The
+response cache does not help there: nothing has been stored yet. Here
+the first caller starts the work and every identical caller that arrives
+while it is running awaits the same task.
+
+Cancellation: each caller waits on a shielded task, so one caller
+cancelling (client disconnect, timeout) does not affect the others. The
+shared task itself is cancelled only when every caller has gone.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Call:
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    Per-key deduplication of in-flight coroutines.
+
+    Usage:
+        result = await flight.do(key, lambda: expensive_call(...))
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.stats: Dict[str, int] = {
+            "executed": 0,
+            "coalesced": 0,
+            "cancelled": 0,
+        }
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run factory() for `key`, or join the run already in flight.
+
+        Args:
+            key: Normalized request key (identical requests -> identical key)
+            factory: Creates the coroutine; only called if nothing is in flight
+
+        Returns:
+            The shared result. Callers must not mutate it in place.
+
+        Raises:
+            Whatever the shared run raised (every waiter sees the same error)
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(task=asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._on_done(key, call))
+            self.stats["executed"] += 1
+        else:
+            self.stats["coalesced"] += 1
+            logger.info(f"🔗 Joined in-flight request {key[:12]} ({call.waiters} waiting)")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller gave up: stop the work, and make sure a
+                # newcomer starts a fresh run instead of joining a dying one
+                self.stats["cancelled"] += 1
+                self._forget(key, call)
+                call.task.cancel()
+
+    def in_flight(self) -> int:
+        """Number of distinct requests currently running."""
+        return len(self._calls)
+
+    def is_in_flight(self, key: str) -> bool:
+        """True if a call with this key is running (do() would join it)."""
+        return key in self._calls
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "in_flight": self.in_flight()}
+
+    def _on_done(self, key: str, call: _Call) -> None:
+        self._forget(key, call)
+        # Mark the exception as retrieved if nobody was left to await it
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+@lru_cache()
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide coalescer (shared by all AnthropicClient instances)."""
+    return SingleFlight()
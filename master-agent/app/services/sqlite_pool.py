@@ -0,0 +1,133 @@
+"""
+SQLite Read Pool - Non-blocking, reusable read-only connections.
+
+sqlite3 calls block the calling thread. Run on the event loop they stall
+every other request of the process for the duration of the query. The
+pool runs queries on a small dedicated thread pool instead:
+- each worker thread keeps one read-only connection (mode=ro, query_only)
+  and reuses it across queries
+- in WAL mode readers never block the writer (the harvester) and see the
+  last committed snapshot
+- a connection that hits a database error is dropped and reopened on the
+  next query (file replaced, schema migrated, ...)
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, TypeVar
+
+from app.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SQLiteReadPool:
+    """
+    Read-only SQLite access from async code.
+
+    Usage:
+        rows = await pool.fetchall("SELECT ... WHERE x >= ?", (10,))
+        result = await pool.run(lambda conn: ...)   # several statements
+    """
+
+    def __init__(self, db_path: str, size: int = 4, busy_timeout_ms: int = 5000):
+        """
+        Args:
+            db_path: SQLite file (must exist; read-only connections never create it)
+            size: Worker threads = open connections
+            busy_timeout_ms: How long a query waits on a lock before failing
+        """
+        self.db_path = db_path
+        self.size = size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="sqlite-read")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self.stats: Dict[str, int] = {
+            "queries": 0,
+            "connects": 0,
+            "errors": 0,
+        }
+
+    async def run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """
+        Run fn(connection) on a pool thread.
+
+        Raises:
+            sqlite3.Error: from the query (the connection is reopened next time)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn)
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        """Rows of one query (sqlite3.Row: access by column name)."""
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    def close(self) -> None:
+        """Stop the threads and close every connection."""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "size": self.size, "open_connections": len(self._connections)}
+
+    # ==========================================
+    # Internals (pool threads)
+    # ==========================================
+
+    def _call(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        conn = self._connection()
+        try:
+            result = fn(conn)
+        except sqlite3.Error:
+            with self._lock:
+                self.stats["errors"] += 1
+            self._discard(conn)
+            raise
+        with self._lock:
+            self.stats["queries"] += 1
+        return result
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            uri = f"{Path(self.db_path).absolute().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+                self.stats["connects"] += 1
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        self._local.conn = None
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+@lru_cache()
+def get_read_pool(db_path: str) -> SQLiteReadPool:
+    """Get the process-wide pool for a database file."""
+    settings = get_settings()
+    return SQLiteReadPool(db_path, size=settings.trend_db_pool_size)
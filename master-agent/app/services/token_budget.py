@@ -0,0 +1,230 @@
+"""
+Token Budget - Per-task sizing of max_tokens and the thinking budget.
+
+A flat 8192 max_tokens with 2048 thinking tokens is too much for a chat
+routing decision and too little for 30 scripts. Each task has a profile:
+  max_tokens = thinking + (base + per_item * items) * headroom
+The per-item (or, for single-shot tasks, base) output size is learned
+from observed message.usage with an exponential moving average, and a
+truncated reply (stop_reason == "max_tokens") bumps it immediately.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional
+
+from app.config import get_settings
+from app.services.token_counter import estimate_tokens
+
+
+logger = logging.getLogger(__name__)
+
+# API minimum for thinking.budget_tokens
+MIN_THINKING_TOKENS = 1024
+
+# Weight of a new observation in the moving average
+EMA_ALPHA = 0.2
+
+# Growth factor after a reply was cut off at max_tokens
+TRUNCATION_BUMP = 1.5
+
+# Learned sizes stay within this factor range of the profile's initial value
+LEARNED_RANGE = (0.5, 4.0)
+
+
+@dataclass
+class BudgetProfile:
+    """
+    Initial output-size assumptions for one task.
+
+    Token counts are for the visible reply. Russian runs about
+    2.5 characters per token.
+    """
+    base_tokens: int
+    tokens_per_item: int = 0
+    thinking_per_item: int = 0
+    thinking_min: int = 0              # 0 = no extended thinking
+    thinking_max: int = 0
+    headroom: float = 1.3
+    min_tokens: int = 256
+
+
+PROFILES: Dict[str, BudgetProfile] = {
+    # {"reply", "action", "args"}: one short paragraph, no thinking
+    "router": BudgetProfile(base_tokens=300),
+    # Analysis summary + per headline: ~80 chars text, pattern, hook, keys
+    "headlines": BudgetProfile(
+        base_tokens=300, tokens_per_item=90,
+        thinking_per_item=64, thinking_min=1024, thinking_max=4096
+    ),
+    # Per script: caption capped at 1800 chars (~720), reasoning, cta, keys
+    "scripts": BudgetProfile(
+        base_tokens=50, tokens_per_item=1100,
+        thinking_per_item=256, thinking_min=1024, thinking_max=8192
+    ),
+    # Per blueprint: 30-50 word EN video prompt, text lines, timing
+    "visuals": BudgetProfile(
+        base_tokens=50, tokens_per_item=200,
+        thinking_per_item=64, thinking_min=1024, thinking_max=2048
+    ),
+    # One rewritten script
+    "refine": BudgetProfile(base_tokens=1100),
+    # Per trend item: five one-sentence fields (pain, trigger, ...)
+    "patterns": BudgetProfile(base_tokens=50, tokens_per_item=180),
+    # Rolling chat summary: one short paragraph
+    "summary": BudgetProfile(base_tokens=250),
+}
+
+
+@dataclass
+class BudgetPlan:
+    """Budget for one request."""
+    task: str
+    items: int
+    max_tokens: int
+    thinking_tokens: int = 0
+    adaptive: bool = True              # False = fixed/explicit budget
+
+    @property
+    def cache_tag(self) -> str:
+        """
+        Stable identity for response-cache keys: the learned numbers change
+        over time and must not invalidate cached replies.
+        """
+        if self.adaptive:
+            return f"{self.task}x{self.items}"
+        return f"{self.max_tokens}/{self.thinking_tokens}"
+
+
+class TokenBudgeter:
+    """Plans per-request budgets and learns output sizes from usage."""
+
+    def __init__(
+        self,
+        profiles: Optional[Dict[str, BudgetProfile]] = None,
+        max_output_tokens: int = 21000
+    ):
+        """
+        Args:
+            profiles: Task name -> profile (defaults to PROFILES)
+            max_output_tokens: Hard cap on max_tokens. The SDK refuses
+                               non-streaming requests that could run
+                               past 10 minutes (~21k tokens).
+        """
+        self.profiles = dict(profiles or PROFILES)
+        self.max_output_tokens = max_output_tokens
+        self._learned: Dict[str, float] = {}
+        self._observations: Dict[str, int] = {}
+        self._truncations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def plan(self, task: str, items: int = 1) -> BudgetPlan:
+        """
+        Size max_tokens and thinking for a task.
+
+        Args:
+            task: Profile name (e.g. "scripts")
+            items: Expected number of output items (headlines, scripts, ...)
+
+        Raises:
+            KeyError: Unknown task
+        """
+        profile = self.profiles[task]
+        items = max(1, items)
+
+        thinking = 0
+        if profile.thinking_min:
+            thinking = min(
+                max(profile.thinking_min, profile.thinking_per_item * items),
+                max(profile.thinking_max, profile.thinking_min)
+            )
+            thinking = max(MIN_THINKING_TOKENS, thinking)
+
+        text = self._text_tokens(task, profile, items) * profile.headroom
+        max_tokens = int(thinking + max(profile.min_tokens, text))
+
+        if max_tokens > self.max_output_tokens:
+            logger.warning(
+                f"⚠️ {task} x{items} needs ~{max_tokens} output tokens, capped at {self.max_output_tokens}"
+            )
+            max_tokens = self.max_output_tokens
+            if thinking and thinking >= max_tokens // 2:
+                thinking = max(MIN_THINKING_TOKENS, max_tokens // 4)
+
+        return BudgetPlan(task=task, items=items, max_tokens=max_tokens, thinking_tokens=thinking)
+
+    def observe(
+        self,
+        plan: BudgetPlan,
+        output_tokens: int,
+        text: str,
+        stop_reason: Optional[str] = None
+    ) -> None:
+        """
+        Learn from a finished request.
+
+        Args:
+            plan: The plan the request was sent with
+            output_tokens: usage.output_tokens (includes thinking)
+            text: Visible reply text
+            stop_reason: "max_tokens" marks a truncated reply
+        """
+        profile = self.profiles.get(plan.task)
+        if profile is None or not plan.adaptive:
+            return
+
+        # Thinking used at most its budget, so output minus budget is a
+        # lower bound for the visible part; the local estimate is the other
+        text_tokens = max(output_tokens - plan.thinking_tokens, estimate_tokens(text))
+        current = self._text_unit(plan.task, profile)
+
+        with self._lock:
+            self._observations[plan.task] = self._observations.get(plan.task, 0) + 1
+            if stop_reason == "max_tokens":
+                self._truncations[plan.task] = self._truncations.get(plan.task, 0) + 1
+                self._learned[plan.task] = self._clamp(profile, current * TRUNCATION_BUMP)
+                logger.warning(f"✂️ {plan.task} reply truncated at {plan.max_tokens}, raising budget")
+                return
+
+            if profile.tokens_per_item:
+                sample = max(0, text_tokens - profile.base_tokens) / plan.items
+            else:
+                sample = text_tokens
+            self._learned[plan.task] = self._clamp(
+                profile, (1 - EMA_ALPHA) * current + EMA_ALPHA * sample
+            )
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Learned output size per task (per item, or per reply for single-shot tasks)."""
+        return {
+            task: {
+                "initial": float(profile.tokens_per_item or profile.base_tokens),
+                "learned": round(self._text_unit(task, profile), 1),
+                "observations": self._observations.get(task, 0),
+                "truncations": self._truncations.get(task, 0),
+            }
+            for task, profile in self.profiles.items()
+        }
+
+    @staticmethod
+    def _clamp(profile: BudgetProfile, value: float) -> float:
+        initial = profile.tokens_per_item or profile.base_tokens
+        low, high = LEARNED_RANGE
+        return min(max(value, initial * low), initial * high)
+
+    def _text_unit(self, task: str, profile: BudgetProfile) -> float:
+        return self._learned.get(task, profile.tokens_per_item or profile.base_tokens)
+
+    def _text_tokens(self, task: str, profile: BudgetProfile, items: int) -> float:
+        unit = self._text_unit(task, profile)
+        if profile.tokens_per_item:
+            return profile.base_tokens + unit * items
+        return unit
+
+
+@lru_cache()
+def get_token_budgeter() -> TokenBudgeter:
+    """Get the process-wide budgeter (learning is shared by all clients)."""
+    return TokenBudgeter(max_output_tokens=get_settings().llm_max_output_tokens)
@@ -0,0 +1,35 @@
+"""
+Token Counter - Cheap local token estimates for budgeting.
+
+Used where an exact count is not worth an API round-trip: rate-limit
+reservations, prompt budgets, log lines. Claude's tokenizer averages
+roughly 3.5 characters per token for English and closer to 2.5 for
+Russian, so we blend by the share of Cyrillic characters.
+"""
+
+import json
+from typing import Any
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Args:
+        text: Any prompt or response text
+
+    Returns:
+        Approximate token count (never below 1 for non-empty text)
+    """
+    if not text:
+        return 0
+
+    cyrillic = sum(1 for ch in text if "Ѐ" <= ch <= "ӿ")
+    share = cyrillic / len(text)
+    chars_per_token = 3.5 - share * 1.0
+    return max(1, int(len(text) / chars_per_token))
+
+
+def estimate_json_tokens(value: Any) -> int:
+    """Estimate tokens of a value once serialized as compact JSON."""
+    return estimate_tokens(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
@@ -0,0 +1,252 @@
+"""
+Transcript Index - FTS5 full-text search over harvested content.
+
+Topic-based headline generation had no trend context at all. This index
+makes "viral items about <topic>" a millisecond lookup:
+- an FTS5 table over headline, description and transcript, ranked by BM25
+- kept in sync incrementally from the content_items change feed
+  ((updated_at, id) keyset, same as TrendSnapshot); archived rows are
+  removed, edited rows re-indexed; the position survives restarts
+- it lives in its own SQLite file in settings.data_dir, so Prisma's
+  database gets no virtual tables or triggers it doesn't know about
+
+Russian has no stemmer in FTS5; query words are cut to a prefix
+("финансы" -> "финан*") so inflected forms match.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Tuple
+
+from app.config import get_settings
+from app.services.trend_snapshot import START_WATERMARK, Watermark
+
+
+logger = logging.getLogger(__name__)
+
+# Words that never narrow a topic
+STOP_WORDS = {
+    "и", "в", "во", "на", "не", "что", "как", "это", "для", "про", "при", "без", "под", "над",
+    "или", "его", "она", "они", "мой", "твой", "свой", "все", "всё", "так", "уже", "еще", "ещё",
+    "the", "and", "for", "with", "about", "how", "what", "why", "your", "from",
+}
+
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for free text: significant words as quoted
+    prefixes, OR-ed (BM25 rewards items matching more of them).
+
+    Returns:
+        None if nothing searchable is left
+    """
+    terms = []
+    for word in re.findall(r"\w+", text.lower().replace("ё", "е")):
+        if len(word) < 3 or word in STOP_WORDS or word.isdigit():
+            continue
+        # Poor man's stemming: drop the (likely) inflection
+        if len(word) > 5:
+            word = word[:-2]
+        elif len(word) > 3:
+            word = word[:-1]
+        terms.append(f'"{word}"*')
+    return " OR ".join(dict.fromkeys(terms)) or None
+
+
+class TextSource(Protocol):
+    """What the index syncs from (TrendAnalyzer)."""
+
+    async def load_text_changes(self, watermark: Watermark, limit: int) -> List[Dict[str, Any]]: ...
+
+
+class TranscriptIndex:
+    """
+    Persistent FTS5 index of content items.
+
+    Usage:
+        await index.sync(trend_analyzer)             # apply new changes
+        hits = await index.search("финансы", 100)   # [(item_id, bm25)]
+    """
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: int = 2000):
+        """
+        Args:
+            db_path: SQLite file. None = in-memory only (tests, one process).
+            batch_size: Changed rows applied per transaction
+        """
+        self.db_path = db_path or ":memory:"
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        # A :memory: database lives only as long as its connection
+        self._memory_conn = sqlite3.connect(":memory:", check_same_thread=False) if db_path is None else None
+        self._sync_lock = asyncio.Lock()
+        self.stats: Dict[str, int] = {
+            "searches": 0,
+            "synced_rows": 0,
+            "sync_failures": 0,
+        }
+        self._init_db()
+
+    # ==========================================
+    # Public API
+    # ==========================================
+
+    async def sync(self, source: TextSource, max_rows: Optional[int] = None) -> int:
+        """
+        Apply content changes past the stored watermark.
+
+        Args:
+            source: Change feed
+            max_rows: Stop after about this many rows (None = until caught up)
+
+        Returns:
+            Number of rows applied
+        """
+        async with self._sync_lock:
+            applied = 0
+            watermark = await asyncio.to_thread(self._watermark)
+            try:
+                while max_rows is None or applied < max_rows:
+                    rows = await source.load_text_changes(watermark, self.batch_size)
+                    if not rows:
+                        break
+                    watermark = (rows[-1]["updated_at"], rows[-1]["id"])
+                    await asyncio.to_thread(self._apply, rows, watermark)
+                    applied += len(rows)
+                    if len(rows) < self.batch_size:
+                        break
+            except Exception:
+                # Applied batches are committed; the next sync resumes after them
+                self.stats["sync_failures"] += 1
+                raise
+            finally:
+                self.stats["synced_rows"] += applied
+            if applied:
+                logger.info(f"🔎 Transcript index: synced {applied} rows")
+            return applied
+
+    async def search(self, text: str, limit: int = 100) -> List[Tuple[str, float]]:
+        """
+        Items matching free text, best first.
+
+        Returns:
+            [(item_id, bm25 score)]; lower scores are better (FTS5 convention)
+        """
+        query = fts_query(text)
+        if query is None:
+            return []
+        self.stats["searches"] += 1
+        return await asyncio.to_thread(self._search, query, limit)
+
+    def size(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM fts_items").fetchone()[0]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "size": self.size(), "watermark": self._watermark()}
+
+    # ==========================================
+    # Internals
+    # ==========================================
+
+    def _search(self, query: str, limit: int) -> List[Tuple[str, float]]:
+        with self._connect() as conn:
+            return conn.execute(
+                """
+                SELECT i.item_id, bm25(content_fts, 2.0, 1.0, 1.0) AS score
+                FROM content_fts JOIN fts_items i ON i.fts_rowid = content_fts.rowid
+                WHERE content_fts MATCH ?
+                ORDER BY score
+                LIMIT ?
+                """,
+                (query, limit)
+            ).fetchall()
+
+    def _apply(self, rows: List[Dict[str, Any]], watermark: Watermark) -> None:
+        """One transaction: re-index the rows and move the watermark."""
+        with self._connect() as conn:
+            for row in rows:
+                existing = conn.execute(
+                    "SELECT fts_rowid FROM fts_items WHERE item_id = ?", (row["id"],)
+                ).fetchone()
+                if existing:
+                    conn.execute("DELETE FROM content_fts WHERE rowid = ?", existing)
+                    conn.execute("DELETE FROM fts_items WHERE item_id = ?", (row["id"],))
+                if row.get("archived"):
+                    continue
+                cursor = conn.execute(
+                    "INSERT INTO content_fts (headline, description, transcript) VALUES (?, ?, ?)",
+                    (row.get("headline") or "", row.get("description") or "", row.get("transcript") or "")
+                )
+                conn.execute(
+                    "INSERT INTO fts_items (item_id, fts_rowid) VALUES (?, ?)",
+                    (row["id"], cursor.lastrowid)
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO fts_state (key, value) VALUES ('watermark', ?)",
+                (json.dumps(list(watermark)),)
+            )
+
+    def _watermark(self) -> Watermark:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM fts_state WHERE key = 'watermark'").fetchone()
+        return tuple(json.loads(row[0])) if row else START_WATERMARK
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection that commits on success and always closes."""
+        if self._memory_conn is not None:
+            with self._lock, self._memory_conn:
+                yield self._memory_conn
+            return
+
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        directory = os.path.dirname(self.db_path) if self._memory_conn is None else ""
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS content_fts USING fts5(
+                    headline, description, transcript,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS fts_items (
+                    item_id TEXT PRIMARY KEY,
+                    fts_rowid INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_fts_items_rowid ON fts_items (fts_rowid)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS fts_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+
+@lru_cache()
+def get_transcript_index() -> TranscriptIndex:
+    """Get the process-wide index."""
+    settings = get_settings()
+    return TranscriptIndex(db_path=os.path.join(settings.data_dir, "transcript_index.db"))
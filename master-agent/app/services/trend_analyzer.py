@@ -1,86 +1,93 @@
 """
-Trend Analyzer - Fetches viral content from SQLite database (Prisma)
+Trend Analyzer - Fetches viral content from the Prisma database
 
-Connects to the local dev.db to access harvested content items.
+Reads harvested content items through a TrendStore: Prisma's SQLite
+dev.db or its Postgres database, chosen from database_url. Queries never
+block the event loop (pooled read-only SQLite connections off the loop,
+or an asyncpg pool). Repeated queries are answered from the in-memory
+TrendSnapshot.
 """
 
-import sqlite3
-import os
+import math
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from app.config import get_settings
+from app.services.transcript_index import TranscriptIndex, get_transcript_index
+from app.services.trend_snapshot import TrendSnapshot, Watermark, get_trend_snapshot
+from app.services.trend_store import SQLiteTrendStore, TrendStore, get_trend_store
 
 settings = get_settings()
 
+# Topic search: full-text candidates ranked by BM25 before the view filters,
+# and the share of the best BM25 score a match needs to count as on-topic
+SEARCH_CANDIDATES = 200
+MIN_RELEVANCE = 0.3
+
 class TrendAnalyzer:
     """
     Analyzes viral trends from harvested content.
-    REAL VERSION: Queries local SQLite database.
+    REAL VERSION: Queries the Prisma database (SQLite or Postgres).
     """
     
-    def __init__(self):
-        # Path to db is relative to master-agent/app/services/../../..
-        # Config says file:../prisma/dev.db
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        # Resolved path: /Users/dimanovikov/Desktop/sergei/prisma/dev.db
-        # But settings.database_url is "file:../prisma/dev.db"
-        # We'll construct absolute path to be safe
-        self.db_path = os.path.join(os.path.dirname(base_dir), "prisma", "dev.db")
-        
-    def _get_connection(self):
-        return sqlite3.connect(self.db_path)
+    def __init__(
+        self,
+        store: Optional[TrendStore] = None,
+        snapshot: Optional[TrendSnapshot] = None,
+        transcript_index: Optional[TranscriptIndex] = None
+    ):
+        """
+        Args:
+            store: Injected backend. If None, uses the shared one chosen
+                   from database_url (see get_trend_store).
+            snapshot: Injected in-memory top-K cache. If None, the shared one
+                      is used with the shared store (never for an injected
+                      store: the snapshot belongs to one database).
+            transcript_index: Injected full-text index, same defaulting
+                              as snapshot
+        """
+        if snapshot is None and store is None and settings.trend_snapshot_enabled:
+            snapshot = get_trend_snapshot()
+        self.snapshot = snapshot
+        if transcript_index is None and store is None and settings.transcript_index_enabled:
+            transcript_index = get_transcript_index()
+        self.transcripts = transcript_index
+        self.store = store or get_trend_store()
+    
+    @property
+    def db_path(self) -> Optional[str]:
+        """The SQLite file read from (None on Postgres)."""
+        return self.store.db_path if isinstance(self.store, SQLiteTrendStore) else None
     
     async def get_viral_content(
         self,
         days: int = 7,
         min_views: int = 100000,
-        limit: int = 50
+        limit: int = 50,
+        dataset_id: Optional[str] = None,
+        topic_category: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Fetch viral content from database.
+        Fetch the most viral non-archived content published within the window:
+        highest viralityScore first (see ViralityScorer), then views.
+        
+        Args:
+            days: Only items published in the last `days` days (0 = no window)
+            min_views: Minimum views
+            limit: Maximum rows
+            dataset_id: Only this dataset
+            topic_category: Only this topic category
         """
+        if self.snapshot is not None:
+            try:
+                cached = await self.snapshot.get(self, days, min_views, limit, dataset_id, topic_category)
+                if cached:
+                    return cached
+            except Exception as e:
+                print(f"Trend snapshot unavailable, querying the database: {e}")
+        
         try:
-            conn = self._get_connection()
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Simple query for high performing items
-            query = """
-                SELECT 
-                    id, 
-                    instagramId, 
-                    headline, 
-                    transcript, 
-                    views, 
-                    likes, 
-                    comments, 
-                    publishedAt,
-                    videoUrl
-                FROM content_items 
-                WHERE views >= ? 
-                ORDER BY views DESC 
-                LIMIT ?
-            """
-            
-            cursor.execute(query, (min_views, limit))
-            rows = cursor.fetchall()
-            
-            results = []
-            for row in rows:
-                results.append({
-                    "id": row["id"],
-                    "instagram_id": row["instagramId"],
-                    "headline": row["headline"] or "No headline",
-                    "transcript": row["transcript"] or "",
-                    "views": row["views"],
-                    "likes": row["likes"],
-                    "comments": row["comments"],
-                    "published_at": row["publishedAt"],
-                    "url": row["videoUrl"]
-                })
-            
-            conn.close()
+            results = await self.store.fetch_viral(days, min_views, limit, dataset_id, topic_category)
             
             if not results:
                 print("⚠️ No real viral content found in DB. Returning a fallback sample to keep pipeline moving.")
@@ -89,10 +96,116 @@ class TrendAnalyzer:
             return results
             
         except Exception as e:
-            print(f"Error querying SQLite: {e}")
+            print(f"Error querying trends ({self.store.name}): {e}")
             # Fallback if DB fails
             return self._get_fallback_content()
 
+    async def search_viral_content(
+        self,
+        topic: str,
+        days: int = 90,
+        min_views: int = 0,
+        limit: int = 8,
+        dataset_id: Optional[str] = None,
+        topic_category: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Most viral items matching a topic (full-text over headline,
+        description and transcript).
+        
+        Items are ranked by relevance (BM25, relative to the best match)
+        times log views, weighted by the virality score, so a strong match
+        with fewer views can beat a weak match with many.
+        
+        Returns:
+            Up to `limit` rows like get_viral_content() plus "relevance";
+            [] if nothing matches or the index is unavailable
+        """
+        if self.transcripts is None:
+            return []
+        try:
+            hits = await self.transcripts.search(topic, SEARCH_CANDIDATES)
+            if not hits:
+                return []
+            
+            best = hits[0][1]
+            relevance = {item_id: score / best if best else 1.0 for item_id, score in hits}
+            ids = [item_id for item_id, rel in relevance.items() if rel >= MIN_RELEVANCE]
+            
+            rows = await self.store.fetch_viral(days, min_views, len(ids), dataset_id, topic_category, ids)
+        except Exception as e:
+            print(f"Topic search failed: {e}")
+            return []
+        
+        for row in rows:
+            row["relevance"] = round(relevance[row["id"]], 3)
+        rows.sort(key=self._search_rank, reverse=True)
+        return rows[:limit]
+
+    # ==========================================
+    # TrendSnapshot / TranscriptIndex source (errors propagate)
+    # ==========================================
+
+    async def load_top(
+        self,
+        dataset_id: Optional[str],
+        topic_category: Optional[str],
+        days: int,
+        min_views: int,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Top `limit` rows of a scope, in trend order."""
+        return await self.store.fetch_viral(days, min_views, limit, dataset_id, topic_category)
+
+    async def load_changes(self, watermark: Watermark, limit: int) -> List[Dict[str, Any]]:
+        """
+        Rows after the (updated_at, id) watermark in that order, with
+        "archived" and "updated_at" added. Keyset order: rows sharing one
+        timestamp (bulk updates) are paged through, never re-read.
+        """
+        return await self.store.fetch_changes(watermark, limit)
+
+    async def load_text_changes(self, watermark: Watermark, limit: int) -> List[Dict[str, Any]]:
+        """Change feed for TranscriptIndex: id, texts, "archived", "updated_at"."""
+        return await self.store.fetch_text_changes(watermark, limit)
+
+    async def latest_change(self) -> Optional[Watermark]:
+        """(updated_at, id) of the most recently changed row; None if the table is empty."""
+        return await self.store.latest_change()
+
+    # ==========================================
+    # Indexes
+    # ==========================================
+
+    async def ensure_indexes(self) -> Dict[str, bool]:
+        """
+        Create the trend indexes if missing and verify them (SQLite: each
+        query shape uses its index; Postgres: each index is valid).
+        
+        Returns:
+            {check: passed}; {} if the database could not be reached
+        """
+        try:
+            return await self.store.ensure_indexes()
+        except Exception as e:
+            print(f"⚠️ Trend indexes not ensured ({self.store.name}): {e}")
+            return {}
+
+    async def explain(
+        self,
+        dataset_id: Optional[str] = None,
+        topic_category: Optional[str] = None
+    ) -> List[str]:
+        """Query plan lines of the viral query for this scope."""
+        return await self.store.explain(dataset_id, topic_category)
+
+    @staticmethod
+    def _search_rank(row: Dict[str, Any]) -> float:
+        """Topic search order: relevance x log views x sqrt(virality score, 1 if unscored)."""
+        score = row.get("virality_score")
+        weight = math.sqrt(score) if score is not None and score > 0 else 1.0
+        return row["relevance"] * math.log10((row["views"] or 0) + 10) * weight
+
     def _get_fallback_content(self):
         # Keep fallback just in case DB is empty, so user can still test pipeline
         return [
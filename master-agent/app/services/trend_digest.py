@@ -0,0 +1,203 @@
+"""
+Trend Digest - Token-budgeted view of trend rows for the headline prompt.
+
+TrendAnalyzer returns up to 50 rows with full transcripts. Dumped with
+json.dumps(indent=2) that is tens of thousands of tokens, most of them
+transcript text and fields the model never uses. The digest:
+- drops repeated rows of the same instagram_id (keeps the most viewed)
+- keeps only headline, views, likes, comments and either the item's
+  precomputed pattern analysis (see PatternAnalyzer) or a transcript excerpt
+- cuts each transcript to its opening sentences (the hook), cached per
+  item and content hash so repeated batches don't redo the work
+- picks rows by signal (views weighted by engagement) until the token
+  budget is spent, and emits compact JSON
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from app.config import get_settings
+from app.services.token_counter import estimate_tokens
+
+
+logger = logging.getLogger(__name__)
+
+# Engagement rate above this adds no more signal (bots, tiny accounts)
+MAX_ENGAGEMENT_RATE = 0.2
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def signal(item: Dict[str, Any]) -> float:
+    """
+    Ranking value of a trend row: the virality score if present,
+    otherwise views weighted by engagement rate.
+    """
+    if item.get("virality_score") is not None:
+        return float(item["virality_score"])
+    views = item.get("views") or 0
+    if not views:
+        return 0.0
+    engagement = ((item.get("likes") or 0) + (item.get("comments") or 0)) / views
+    return views * (1 + 5 * min(engagement, MAX_ENGAGEMENT_RATE))
+
+
+class TrendDigest:
+    """
+    Builds the compact trends block for TREND_ANALYSIS_TASK.
+
+    Usage:
+        items = digest.select(trends)       # budgeted, compact rows
+        trends_json = digest.render(items)
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 6000,
+        transcript_chars: int = 300,
+        cache_size: int = 2048
+    ):
+        """
+        Args:
+            token_budget: Upper bound for the rendered digest
+            transcript_chars: Transcript excerpt length per item (0 = none)
+            cache_size: Transcript excerpts kept in memory
+        """
+        self.token_budget = token_budget
+        self.transcript_chars = transcript_chars
+        self.cache_size = cache_size
+        self._excerpts: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "excerpt_hits": 0,
+            "excerpt_misses": 0,
+        }
+
+    def select(self, trends: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Dedupe, compact and budget trend rows.
+
+        Args:
+            trends: Rows from TrendAnalyzer.get_viral_content()
+
+        Returns:
+            Compact rows, highest signal first, whose rendering fits
+            the token budget
+        """
+        before = estimate_tokens(json.dumps(trends, indent=2, ensure_ascii=False))
+
+        selected: List[Dict[str, Any]] = []
+        used = 2  # "[]"
+        for row in sorted(self._dedupe(trends), key=signal, reverse=True):
+            item = self._compact_item(row)
+            cost = estimate_tokens(_compact(item)) + 1
+            if used + cost > self.token_budget:
+                continue
+            selected.append(item)
+            used += cost
+
+        logger.info(
+            f"📉 Trend digest: {len(trends)} rows / ~{before} tokens -> "
+            f"{len(selected)} rows / ~{used} tokens (budget {self.token_budget})"
+        )
+        return selected
+
+    @staticmethod
+    def render(items: List[Dict[str, Any]]) -> str:
+        """Compact JSON for the prompt."""
+        return _compact(items)
+
+    def build(self, trends: List[Dict[str, Any]]) -> str:
+        """select() + render()."""
+        return self.render(self.select(trends))
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "cached_excerpts": len(self._excerpts)}
+
+    # ==========================================
+    # Internals
+    # ==========================================
+
+    @staticmethod
+    def _dedupe(trends: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One row per instagram_id (the most viewed); rows without one are kept."""
+        best: Dict[str, Dict[str, Any]] = {}
+        rows: List[Dict[str, Any]] = []
+        for row in trends:
+            key = row.get("instagram_id")
+            if not key:
+                rows.append(row)
+            elif key not in best or (row.get("views") or 0) > (best[key].get("views") or 0):
+                best[key] = row
+        return rows + list(best.values())
+
+    def _compact_item(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        item: Dict[str, Any] = {
+            "headline": row.get("headline") or "",
+            "views": row.get("views") or 0,
+            "likes": row.get("likes") or 0,
+            "comments": row.get("comments") or 0,
+        }
+        if row.get("analysis"):
+            # The analysis already captures what the model needs from the transcript
+            item["analysis"] = row["analysis"]
+            return item
+        excerpt = self._excerpt(str(row.get("id", "")), row.get("transcript") or "")
+        if excerpt:
+            item["transcript"] = excerpt
+        return item
+
+    def _excerpt(self, item_id: str, transcript: str) -> str:
+        """Opening sentences of a transcript, cached by item and content."""
+        if not transcript or self.transcript_chars <= 0:
+            return ""
+
+        key = (item_id, hashlib.sha1(transcript.encode("utf-8")).hexdigest())
+        with self._lock:
+            cached = self._excerpts.get(key)
+            if cached is not None:
+                self._excerpts.move_to_end(key)
+                self.stats["excerpt_hits"] += 1
+                return cached
+            self.stats["excerpt_misses"] += 1
+
+        excerpt = self._truncate(" ".join(transcript.split()), self.transcript_chars)
+
+        with self._lock:
+            self._excerpts[key] = excerpt
+            while len(self._excerpts) > self.cache_size:
+                self._excerpts.popitem(last=False)
+        return excerpt
+
+    @staticmethod
+    def _truncate(text: str, limit: int) -> str:
+        """Whole sentences up to `limit` chars; a hard cut if the first is longer."""
+        if len(text) <= limit:
+            return text
+        excerpt = ""
+        for sentence in _SENTENCE_END.split(text):
+            candidate = f"{excerpt} {sentence}".strip()
+            if len(candidate) > limit:
+                break
+            excerpt = candidate
+        return excerpt or text[:limit].rstrip() + "…"
+
+
+@lru_cache()
+def get_trend_digest() -> TrendDigest:
+    """Get the process-wide digest (shares the excerpt cache)."""
+    settings = get_settings()
+    return TrendDigest(
+        token_budget=settings.trend_digest_tokens,
+        transcript_chars=settings.trend_transcript_chars
+    )
@@ -0,0 +1,308 @@
+"""
+Trend Snapshot - In-memory top-K viral items per (dataset, category, window, min views).
+
+Even with indexes, every /producer/start re-ran the trend query and
+rebuilt the row dicts. The snapshot keeps, per scope, the exact top-K
+non-archived items in trend order (virality score, then views):
+- a scope is fully loaded on first use (and again every reload_seconds,
+  which also drops rows deleted from the table)
+- after that it is kept current by polling content_items.updated_at past
+  a watermark and applying the changed rows to every scope
+- answers are served from memory; if the last successful poll is older
+  than max_staleness_seconds, the caller waits for a poll first
+
+Invariant: a scope holds the true top-n of its scope, n <= K. Rows that
+leave it (archived, aged out of the window, fell below min views) only
+shrink n; a query that needs more rows than remain is answered by a
+reload. Scores are written without touching updated_at, so
+ViralityWorker calls invalidate() after writing them.
+"""
+
+import asyncio
+import bisect
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Protocol, Set, Tuple
+
+from app.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+# (dataset_id, topic_category, days, min_views)
+ScopeKey = Tuple[Optional[str], Optional[str], int, int]
+
+# Position in the change feed: (updated_at, id) of the last row applied
+Watermark = Tuple[Any, str]
+
+# Before the first row: in SQLite any INTEGER or TEXT updated_at sorts after -1
+START_WATERMARK: Watermark = (-1, "")
+
+
+def cutoff_ms(days: int) -> Optional[int]:
+    """publishedAt lower bound (Prisma epoch ms) for a window; None = no window."""
+    if not days or days <= 0:
+        return None
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    return int((cutoff - datetime(1970, 1, 1)).total_seconds() * 1000)
+
+
+def sort_key(item: Dict[str, Any]) -> Tuple[float, int]:
+    """Ascending key for trend order: score descending (unscored last), then views descending."""
+    score = item.get("virality_score")
+    return (-score if score is not None else float("inf"), -item["views"])
+
+
+class TrendSource(Protocol):
+    """What the snapshot reads from (TrendAnalyzer)."""
+
+    async def load_top(
+        self, dataset_id: Optional[str], topic_category: Optional[str], days: int, min_views: int, limit: int
+    ) -> List[Dict[str, Any]]: ...
+
+    async def load_changes(self, watermark: Watermark, limit: int) -> List[Dict[str, Any]]: ...
+
+    async def latest_change(self) -> Optional[Watermark]: ...
+
+
+@dataclass
+class _Scope:
+    key: ScopeKey
+    items: List[Dict[str, Any]]                  # trend order
+    complete: bool                               # every matching row is in items
+    loaded_at: float = field(default_factory=time.monotonic)
+    ids: Set[str] = field(default_factory=set)
+    keys: List[Tuple[float, int]] = field(default_factory=list)   # sort_key per item, for bisect
+
+    def __post_init__(self):
+        self.ids = {item["id"] for item in self.items}
+        self.keys = [sort_key(item) for item in self.items]
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        dataset_id, topic_category, _, min_views = self.key
+        return (
+            (dataset_id is None or row.get("dataset_id") == dataset_id)
+            and (topic_category is None or row.get("topic_category") == topic_category)
+            and row["views"] >= min_views
+        )
+
+    def apply(self, row: Dict[str, Any], size: int) -> None:
+        """Upsert or remove one changed row."""
+        if row["id"] in self.ids:
+            i = next(i for i, item in enumerate(self.items) if item["id"] == row["id"])
+            del self.items[i]
+            del self.keys[i]
+            self.ids.discard(row["id"])
+        if row.get("archived") or not self.matches(row):
+            return
+        cutoff = cutoff_ms(self.key[2])
+        if cutoff is not None and (row.get("published_at") or 0) < cutoff:
+            return
+        # Below the last kept row of a truncated scope its rank is unknown
+        key = sort_key(row)
+        if not self.complete and (not self.items or key > self.keys[-1]):
+            return
+        item = {k: v for k, v in row.items() if k not in ("archived", "updated_at")}
+        i = bisect.bisect_right(self.keys, key)
+        self.items.insert(i, item)
+        self.keys.insert(i, key)
+        self.ids.add(item["id"])
+        if len(self.items) > size:
+            for dropped in self.items[size:]:
+                self.ids.discard(dropped["id"])
+            del self.items[size:]
+            del self.keys[size:]
+            self.complete = False
+
+    def top(self, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """The answer, or None if the kept rows can't prove it."""
+        cutoff = cutoff_ms(self.key[2])
+        result = []
+        for item in self.items:
+            if cutoff is not None and (item.get("published_at") or 0) < cutoff:
+                continue
+            result.append(item)
+            if len(result) == limit:
+                return result
+        # Short answer: exact only if nothing qualifying was left out
+        return result if self.complete else None
+
+
+class TrendSnapshot:
+    """
+    Process-wide top-K trend cache.
+
+    Usage:
+        rows = await snapshot.get(source, days, min_views, limit)  # None = ask the DB
+        await snapshot.refresh(source)                              # poll changes
+    """
+
+    def __init__(
+        self,
+        size: int = 500,
+        max_staleness_seconds: float = 15,
+        reload_seconds: float = 600,
+        max_scopes: int = 64,
+        poll_batch: int = 5000
+    ):
+        """
+        Args:
+            size: K, rows kept per scope (queries with a larger limit go to the DB)
+            max_staleness_seconds: Answers never lag the table by more than this
+            reload_seconds: Scopes older than this are reloaded in full
+            max_scopes: Least recently used scopes beyond this are dropped
+            poll_batch: Changed rows read per poll query
+        """
+        self.size = size
+        self.max_staleness_seconds = max_staleness_seconds
+        self.reload_seconds = reload_seconds
+        self.max_scopes = max_scopes
+        self.poll_batch = poll_batch
+        self._scopes: "OrderedDict[ScopeKey, _Scope]" = OrderedDict()
+        self._watermark: Optional[Watermark] = None
+        self._refreshed_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self.stats: Dict[str, Any] = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "rows_applied": 0,
+            "invalidations": 0,
+            "last_refresh_ms": 0.0,
+        }
+
+    async def get(
+        self,
+        source: TrendSource,
+        days: int,
+        min_views: int,
+        limit: int,
+        dataset_id: Optional[str] = None,
+        topic_category: Optional[str] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Top rows for a query, from memory.
+
+        Returns:
+            Copies of the rows, or None if the snapshot can't answer
+            (limit above K, or the table could not be polled in time)
+        """
+        if limit > self.size:
+            self.stats["misses"] += 1
+            return None
+
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.max_staleness_seconds:
+            await self.refresh(source)
+            if self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.max_staleness_seconds:
+                self.stats["misses"] += 1
+                return None
+
+        key: ScopeKey = (dataset_id, topic_category, days if days and days > 0 else 0, min_views)
+        scope = self._scopes.get(key)
+        if scope is None or time.monotonic() - scope.loaded_at > self.reload_seconds:
+            scope = await self._load(source, key)
+
+        result = scope.top(limit)
+        if result is None:
+            # Too many rows left the scope since it was loaded
+            scope = await self._load(source, key)
+            result = scope.top(limit)
+
+        if key in self._scopes:
+            self._scopes.move_to_end(key)
+        self.stats["hits"] += 1
+        return [dict(item) for item in result or []]
+
+    async def refresh(self, source: TrendSource) -> int:
+        """
+        Apply rows changed since the watermark to every scope.
+
+        Returns:
+            Number of changed rows applied
+        """
+        async with self._lock:
+            started = time.perf_counter()
+            try:
+                if self._watermark is None:
+                    # First poll: scopes load current state, only later changes matter
+                    self._watermark = await source.latest_change() or START_WATERMARK
+                    applied = 0
+                else:
+                    applied = await self._poll(source)
+            except Exception as e:
+                self.stats["refresh_failures"] += 1
+                logger.warning(f"Trend snapshot refresh failed: {e}")
+                return 0
+
+            self._refreshed_at = time.monotonic()
+            self.stats["refreshes"] += 1
+            self.stats["rows_applied"] += applied
+            self.stats["last_refresh_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            if applied:
+                logger.info(f"📈 Trend snapshot: applied {applied} changed rows to {len(self._scopes)} scopes")
+            return applied
+
+    def invalidate(self) -> None:
+        """Drop every scope (rows changed without an updated_at bump); they reload on use."""
+        self._scopes.clear()
+        self.stats["invalidations"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "scopes": len(self._scopes),
+            "rows": sum(len(scope.items) for scope in self._scopes.values()),
+            "staleness_seconds": (
+                round(time.monotonic() - self._refreshed_at, 2) if self._refreshed_at is not None else None
+            ),
+            "watermark": self._watermark,
+        }
+
+    # ==========================================
+    # Internals
+    # ==========================================
+
+    async def _poll(self, source: TrendSource) -> int:
+        applied = 0
+        while True:
+            rows = await source.load_changes(self._watermark, self.poll_batch)
+            for row in rows:
+                for scope in self._scopes.values():
+                    scope.apply(row, self.size)
+            applied += len(rows)
+            if rows:
+                self._watermark = (rows[-1]["updated_at"], rows[-1]["id"])
+            if len(rows) < self.poll_batch:
+                break
+        return applied
+
+    async def _load(self, source: TrendSource, key: ScopeKey) -> _Scope:
+        # Under the lock: a poll must not advance the watermark past
+        # changes this load did not see
+        async with self._lock:
+            dataset_id, topic_category, days, min_views = key
+            items = await source.load_top(dataset_id, topic_category, days, min_views, self.size)
+            scope = _Scope(key=key, items=items, complete=len(items) < self.size)
+            self._scopes[key] = scope
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+            self.stats["loads"] += 1
+            return scope
+
+
+@lru_cache()
+def get_trend_snapshot() -> TrendSnapshot:
+    """Get the process-wide snapshot."""
+    settings = get_settings()
+    return TrendSnapshot(
+        size=settings.trend_snapshot_size,
+        max_staleness_seconds=settings.trend_snapshot_max_staleness_seconds,
+        reload_seconds=settings.trend_snapshot_reload_seconds,
+        max_scopes=settings.trend_snapshot_max_scopes
+    )
@@ -0,0 +1,698 @@
+"""
+Trend Store - Where trend reads come from: Prisma's SQLite file or Postgres.
+
+TrendAnalyzer used to hardcode prisma/dev.db. In production Prisma runs on
+Postgres, so the reads now go through a backend chosen from database_url:
+- SQLiteTrendStore: the SQLite file, on the pooled read-only connections
+  of SQLiteReadPool
+- PostgresTrendStore: an asyncpg connection pool; every statement is
+  prepared once per connection (asyncpg's statement cache) and the change
+  feeds stream through server-side cursors
+
+Both return the same row dicts. Timestamps are Prisma-SQLite style epoch
+milliseconds on both (published_at, change feed updated_at), so the trend
+snapshot and the transcript index work unchanged on either.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.config import get_settings
+from app.services.sqlite_pool import SQLiteReadPool, get_read_pool
+from app.services.trend_snapshot import Watermark, cutoff_ms
+
+try:
+    import asyncpg
+except ImportError:  # Only the Postgres backend needs it
+    asyncpg = None
+
+
+logger = logging.getLogger(__name__)
+
+# prisma/ next to master-agent/ (app/services/../../..); Prisma resolves a
+# relative "file:" URL against this schema directory
+PRISMA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    "prisma"
+)
+DEFAULT_SQLITE_PATH = os.path.join(PRISMA_DIR, "dev.db")
+
+# Query shape -> (dataset_id, topic_category) used to check its plan
+QUERY_SHAPES = {
+    "all": (None, None),
+    "dataset": ("dataset", None),
+    "category": (None, "category"),
+    "dataset+category": ("dataset", "category"),
+}
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch_ms(value: Optional[datetime]) -> Optional[int]:
+    """Naive UTC datetime (Prisma on Postgres) -> epoch ms (Prisma on SQLite)."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None) - value.utcoffset()
+    return (value - _EPOCH) // timedelta(milliseconds=1)
+
+
+def from_epoch_ms(value: int) -> datetime:
+    return _EPOCH + timedelta(milliseconds=value)
+
+
+def sqlite_path(database_url: str) -> Optional[str]:
+    """File of a Prisma "file:" URL; None for any other URL."""
+    if not database_url.startswith("file:"):
+        return None
+    path = database_url[len("file:"):].split("?", 1)[0]
+    return os.path.normpath(path if os.path.isabs(path) else os.path.join(PRISMA_DIR, path))
+
+
+class TrendStore(ABC):
+    """Read access to content_items for TrendAnalyzer."""
+
+    name: str = "store"
+
+    @abstractmethod
+    async def fetch_viral(
+        self,
+        days: int,
+        min_views: int,
+        limit: int,
+        dataset_id: Optional[str] = None,
+        topic_category: Optional[str] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Most viral non-archived rows published within the window
+        (viralityScore descending, unscored last, then views).
+
+        Args:
+            days: Only rows published in the last `days` days (0 = no window)
+            min_views: Minimum views
+            limit: Maximum rows
+            dataset_id: Only this dataset
+            topic_category: Only this topic category
+            ids: Only these items
+        """
+
+    @abstractmethod
+    async def fetch_changes(self, watermark: Watermark, limit: int) -> List[Dict[str, Any]]:
+        """
+        Rows after the (updated_at, id) watermark in that order: trend row
+        fields plus "archived" and "updated_at" (epoch ms).
+        """
+
+    @abstractmethod
+    async def fetch_text_changes(self, watermark: Watermark, limit: int) -> List[Dict[str, Any]]:
+        """Same feed with id, headline, description, transcript, "archived", "updated_at"."""
+
+    @abstractmethod
+    async def latest_change(self) -> Optional[Watermark]:
+        """(updated_at, id) of the most recently changed row; None if the table is empty."""
+
+    @abstractmethod
+    async def ensure_indexes(self) -> Dict[str, bool]:
+        """
+        Create the trend indexes if missing.
+
+        Returns:
+            {check: passed}
+        """
+
+    @abstractmethod
+    async def explain(self, dataset_id: Optional[str] = None, topic_category: Optional[str] = None) -> List[str]:
+        """Query plan lines of the viral query for this scope."""
+
+    def available(self) -> bool:
+        """Whether there is anything to read (the SQLite file may not exist yet)."""
+        return True
+
+    async def close(self) -> None:
+        """Release connections."""
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+# ==========================================
+# SQLite (Prisma dev.db)
+# ==========================================
+
+# Indexes for the viral query, created by this service (Prisma does not
+# manage them). Each one serves `ORDER BY viralityScore DESC, views DESC
+# LIMIT n` in index order, with the remaining filters checked inside the
+# index, so only the returned rows are read from the table.
+TREND_INDEXES = {
+    "ma_content_items_trend_idx": "isArchived, viralityScore DESC, views DESC, publishedAt",
+    "ma_content_items_dataset_trend_idx": (
+        "datasetId, isArchived, viralityScore DESC, views DESC, publishedAt, topicCategory"
+    ),
+    "ma_content_items_category_trend_idx": "topicCategory, isArchived, viralityScore DESC, views DESC, publishedAt",
+    # Change polling for TrendSnapshot
+    "ma_content_items_updated_idx": "updated_at, id",
+}
+
+_COLUMNS = """
+                id,
+                instagramId,
+                headline,
+                transcript,
+                views,
+                likes,
+                comments,
+                viralityScore,
+                publishedAt,
+                videoUrl,
+                datasetId,
+                topicCategory
+"""
+
+
+class SQLiteTrendStore(TrendStore):
+    """Prisma's SQLite file, read on pooled read-only connections."""
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str, pool: Optional[SQLiteReadPool] = None):
+        """
+        Args:
+            db_path: SQLite file
+            pool: Injected read pool (default: the shared one for db_path)
+        """
+        self.db_path = db_path
+        self.pool = pool or get_read_pool(db_path)
+
+    async def fetch_viral(
+        self,
+        days: int,
+        min_views: int,
+        limit: int,
+        dataset_id: Optional[str] = None,
+        topic_category: Optional[str] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        query, params = self._viral_query(days, min_views, limit, dataset_id, topic_category, ids)
+        return await self.pool.run(lambda conn: self._query_viral(conn, query, params))
+
+    async def fetch_changes(self, watermark: Watermark, limit: int) -> List[Dict[str, Any]]:
+        # Keyset order: rows sharing one timestamp (bulk updates) are paged through, never re-read
+        updated_at, last_id = watermark
+        query = f"""
+            SELECT {_COLUMNS}, isArchived, updated_at
+            FROM content_items
+            WHERE updated_at >= ? AND (updated_at > ? OR id > ?)
+            ORDER BY updated_at, id
+            LIMIT ?
+        """
+
+        def fetch(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+            return [
+                {**self._to_item(row), "archived": bool(row["isArchived"]), "updated_at": row["updated_at"]}
+                for row in conn.execute(query, (updated_at, updated_at, last_id, limit))
+            ]
+
+        return await self.pool.run(fetch)
+
+    async def fetch_text_changes(self, watermark: Watermark, limit: int) -> List[Dict[str, Any]]:
+        updated_at, last_id = watermark
+        query = """
+            SELECT id, headline, description, transcript, isArchived, updated_at
+            FROM content_items
+            WHERE updated_at >= ? AND (updated_at > ? OR id > ?)
+            ORDER BY updated_at, id
+            LIMIT ?
+        """
+        rows = await self.pool.fetchall(query, (updated_at, updated_at, last_id, limit))
+        return [
+            {
+                "id": row["id"],
+                "headline": row["headline"],
+                "description": row["description"],
+                "transcript": row["transcript"],
+                "archived": bool(row["isArchived"]),
+                "updated_at": row["updated_at"],
+            }
+            for row in rows
+        ]
+
+    async def latest_change(self) -> Optional[Watermark]:
+        rows = await self.pool.fetchall(
+            "SELECT updated_at, id FROM content_items ORDER BY updated_at DESC, id DESC LIMIT 1"
+        )
+        return (rows[0]["updated_at"], rows[0]["id"]) if rows else None
+
+    async def ensure_indexes(self) -> Dict[str, bool]:
+        """
+        Create the trend indexes if missing and check with EXPLAIN QUERY
+        PLAN that each query shape uses its index.
+
+        Returns:
+            {query shape: served by its index}
+        """
+        if not self.available():
+            print(f"⚠️ Trend DB not found, skipping indexes: {self.db_path}")
+            return {}
+        return await asyncio.to_thread(self._ensure_indexes)
+
+    async def explain(self, dataset_id: Optional[str] = None, topic_category: Optional[str] = None) -> List[str]:
+        query, params = self._viral_query(7, 0, 50, dataset_id, topic_category)
+        rows = await self.pool.fetchall(f"EXPLAIN QUERY PLAN {query}", params)
+        return [row["detail"] for row in rows]
+
+    def available(self) -> bool:
+        return os.path.exists(self.db_path)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"backend": self.name, "path": self.db_path, **self.pool.snapshot()}
+
+    @staticmethod
+    def _viral_query(
+        days: int,
+        min_views: int,
+        limit: int,
+        dataset_id: Optional[str],
+        topic_category: Optional[str],
+        ids: Optional[List[str]] = None
+    ) -> Tuple[str, List[Any]]:
+        """SQL and parameters of the windowed viral query (optionally among `ids`)."""
+        conditions = ["isArchived = 0", "views >= ?"]
+        params: List[Any] = [min_views]
+        if ids is not None:
+            conditions.insert(0, f"id IN ({','.join('?' * len(ids))})")
+            params[:0] = ids
+        cutoff = cutoff_ms(days)
+        if cutoff is not None:
+            # Prisma stores DateTime as Unix epoch milliseconds
+            conditions.append("publishedAt >= ?")
+            params.append(cutoff)
+        if dataset_id:
+            conditions.append("datasetId = ?")
+            params.append(dataset_id)
+        if topic_category:
+            conditions.append("topicCategory = ?")
+            params.append(topic_category)
+        params.append(limit)
+
+        query = f"""
+            SELECT {_COLUMNS}
+            FROM content_items
+            WHERE {" AND ".join(conditions)}
+            ORDER BY viralityScore DESC, views DESC
+            LIMIT ?
+        """
+        return query, params
+
+    @staticmethod
+    def _query_viral(conn: sqlite3.Connection, query: str, params: List[Any]) -> List[Dict[str, Any]]:
+        """Runs on a pool thread: the query and the row mapping."""
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return [SQLiteTrendStore._to_item(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _to_item(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "instagram_id": row["instagramId"],
+            "headline": row["headline"] or "No headline",
+            "transcript": row["transcript"] or "",
+            "views": row["views"],
+            "likes": row["likes"],
+            "comments": row["comments"],
+            "virality_score": row["viralityScore"],
+            "published_at": row["publishedAt"],
+            "url": row["videoUrl"],
+            "dataset_id": row["datasetId"],
+            "topic_category": row["topicCategory"]
+        }
+
+    def _ensure_indexes(self) -> Dict[str, bool]:
+        """Runs on a worker thread with its own (writable) connection."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            for name, columns in TREND_INDEXES.items():
+                started = time.perf_counter()
+                existing = conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)
+                ).fetchone()
+                if existing and not existing[0].endswith(f"({columns})"):
+                    # Created by an older version with other columns
+                    conn.execute(f'DROP INDEX "{name}"')
+                    existing = None
+                if not existing:
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON content_items ({columns})')
+                    conn.commit()
+                    print(f"🗂️ Created index {name} in {time.perf_counter() - started:.1f}s")
+
+            verified = {}
+            for shape, (dataset_id, topic_category) in QUERY_SHAPES.items():
+                query, params = self._viral_query(7, 0, 50, dataset_id, topic_category)
+                plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+                # Served = read in trend order from one of our indexes, no sort step
+                verified[shape] = any(
+                    name in line for name in TREND_INDEXES for line in plan
+                ) and not any("TEMP B-TREE" in line for line in plan)
+                if not verified[shape]:
+                    print(f"⚠️ Trend query ({shape}) is not served by a trend index: {plan}")
+            return verified
+        finally:
+            conn.close()
+
+
+# ==========================================
+# Postgres (Prisma in production)
+# ==========================================
+
+# Same indexes in Postgres terms. Prisma's camelCase columns are quoted;
+# DESC defaults to NULLS FIRST there, unscored rows must sort last.
+PG_TREND_INDEXES = {
+    "ma_content_items_trend_idx": '"isArchived", "viralityScore" DESC NULLS LAST, views DESC, "publishedAt"',
+    "ma_content_items_dataset_trend_idx": (
+        '"datasetId", "isArchived", "viralityScore" DESC NULLS LAST, views DESC, "publishedAt", "topicCategory"'
+    ),
+    "ma_content_items_category_trend_idx": (
+        '"topicCategory", "isArchived", "viralityScore" DESC NULLS LAST, views DESC, "publishedAt"'
+    ),
+    "ma_content_items_updated_idx": "updated_at, id",
+}
+
+_PG_COLUMNS = """
+    id, "instagramId", headline, transcript, views, likes, comments,
+    "viralityScore", "publishedAt", "videoUrl", "datasetId", "topicCategory"
+"""
+
+# Seconds an index build may take (a large table outlives command_timeout)
+INDEX_BUILD_TIMEOUT = 3600
+
+# Prisma connection-string options asyncpg does not understand
+_PRISMA_URL_OPTIONS = {"schema", "pgbouncer", "connection_limit", "pool_timeout", "socket_timeout", "connect_timeout"}
+
+
+def asyncpg_dsn(database_url: str) -> Tuple[str, Dict[str, str], bool]:
+    """
+    Split a Prisma Postgres URL into what asyncpg accepts.
+
+    Returns:
+        (dsn, server settings, behind PgBouncer)
+    """
+    parts = urlsplit(database_url)
+    query = dict(parse_qsl(parts.query))
+    server_settings = {"application_name": "master-agent"}
+    if query.get("schema"):
+        server_settings["search_path"] = query["schema"]
+    pgbouncer = query.get("pgbouncer", "").lower() == "true"
+    kept = {key: value for key, value in query.items() if key not in _PRISMA_URL_OPTIONS}
+    return urlunsplit(parts._replace(query=urlencode(kept))), server_settings, pgbouncer
+
+
+class PostgresTrendStore(TrendStore):
+    """Prisma's Postgres database via an asyncpg pool."""
+
+    name = "postgres"
+
+    def __init__(
+        self,
+        database_url: str,
+        min_size: int = 1,
+        max_size: int = 4,
+        statement_cache_size: int = 100,
+        fetch_batch: int = 500,
+        command_timeout: float = 30
+    ):
+        """
+        Args:
+            database_url: postgres:// URL (Prisma options like ?schema= are honoured)
+            min_size: Connections kept open
+            max_size: Concurrent queries
+            statement_cache_size: Prepared statements kept per connection
+                                  (forced to 0 with ?pgbouncer=true: transaction
+                                  pooling can't keep them)
+            fetch_batch: Rows per round trip of a server-side cursor
+            command_timeout: Seconds before a query is cancelled
+        """
+        if asyncpg is None:
+            raise RuntimeError("The Postgres trend store needs asyncpg (pip install asyncpg)")
+        self.dsn, self.server_settings, pgbouncer = asyncpg_dsn(database_url)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = 0 if pgbouncer else statement_cache_size
+        self.fetch_batch = fetch_batch
+        self.command_timeout = command_timeout
+        self._pool: Optional["asyncpg.Pool"] = None
+        self._pool_lock = asyncio.Lock()
+        self.stats: Dict[str, int] = {
+            "queries": 0,
+            "cursor_queries": 0,
+            "errors": 0,
+        }
+
+    async def fetch_viral(
+        self,
+        days: int,
+        min_views: int,
+        limit: int,
+        dataset_id: Optional[str] = None,
+        topic_category: Optional[str] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        query, args = self._viral_query(days, min_views, limit, dataset_id, topic_category, ids)
+        return [self._to_item(record) for record in await self._fetch(query, *args)]
+
+    async def fetch_changes(self, watermark: Watermark, limit: int) -> List[Dict[str, Any]]:
+        records = await self._fetch_cursor(
+            self._changes_query(f'{_PG_COLUMNS}, "isArchived"'), *self._keyset(watermark, limit)
+        )
+        return [
+            {**self._to_item(record), "archived": record["isArchived"], "updated_at": record["updated_ms"]}
+            for record in records
+        ]
+
+    async def fetch_text_changes(self, watermark: Watermark, limit: int) -> List[Dict[str, Any]]:
+        records = await self._fetch_cursor(
+            self._changes_query('id, headline, description, transcript, "isArchived"'), *self._keyset(watermark, limit)
+        )
+        return [
+            {
+                "id": record["id"],
+                "headline": record["headline"],
+                "description": record["description"],
+                "transcript": record["transcript"],
+                "archived": record["isArchived"],
+                "updated_at": record["updated_ms"],
+            }
+            for record in records
+        ]
+
+    async def latest_change(self) -> Optional[Watermark]:
+        records = await self._fetch(
+            """
+            SELECT (EXTRACT(EPOCH FROM updated_at) * 1000)::bigint AS updated_ms, id
+            FROM content_items ORDER BY updated_at DESC, id DESC LIMIT 1
+            """
+        )
+        return (records[0]["updated_ms"], records[0]["id"]) if records else None
+
+    async def ensure_indexes(self) -> Dict[str, bool]:
+        """
+        Create the trend indexes if missing (CONCURRENTLY: the table stays
+        writable) and check they are valid.
+
+        Returns:
+            {index name: built and valid}
+        """
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            for name, columns in PG_TREND_INDEXES.items():
+                started = time.perf_counter()
+                exists = await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", name)
+                if not exists:
+                    await conn.execute(
+                        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON content_items ({columns})',
+                        timeout=INDEX_BUILD_TIMEOUT
+                    )
+                    print(f"🗂️ Created index {name} in {time.perf_counter() - started:.1f}s")
+            records = await conn.fetch(
+                "SELECT c.relname, i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relnamespace = current_schema()::regnamespace AND c.relname = ANY($1::text[])",
+                list(PG_TREND_INDEXES)
+            )
+        valid = {name: False for name in PG_TREND_INDEXES}
+        valid.update({record["relname"]: record["indisvalid"] for record in records})
+        for name, ok in valid.items():
+            if not ok:
+                # A failed concurrent build leaves an invalid index behind; drop it to retry
+                print(f"⚠️ Trend index {name} is missing or invalid")
+        return valid
+
+    async def explain(self, dataset_id: Optional[str] = None, topic_category: Optional[str] = None) -> List[str]:
+        query, args = self._viral_query(7, 0, 50, dataset_id, topic_category)
+        return [record[0] for record in await self._fetch(f"EXPLAIN {query}", *args)]
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self._pool
+        return {
+            "backend": self.name,
+            **self.stats,
+            "size": pool.get_size() if pool else 0,
+            "idle": pool.get_idle_size() if pool else 0,
+            "max_size": self.max_size,
+            "statement_cache_size": self.statement_cache_size,
+        }
+
+    # ==========================================
+    # Internals
+    # ==========================================
+
+    async def _get_pool(self) -> "asyncpg.Pool":
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(
+                        self.dsn,
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        statement_cache_size=self.statement_cache_size,
+                        command_timeout=self.command_timeout,
+                        server_settings=self.server_settings
+                    )
+                    logger.info(f"🐘 Trend store: Postgres pool of {self.max_size} connections")
+        return self._pool
+
+    async def _fetch(self, query: str, *args: Any) -> List["asyncpg.Record"]:
+        """One query; asyncpg prepares it once per connection and reuses it."""
+        pool = await self._get_pool()
+        try:
+            async with pool.acquire() as conn:
+                records = await conn.fetch(query, *args)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        self.stats["queries"] += 1
+        return records
+
+    async def _fetch_cursor(self, query: str, *args: Any) -> List["asyncpg.Record"]:
+        """
+        Query through a server-side cursor, fetch_batch rows per round trip
+        (change feed pages carry whole transcripts).
+        """
+        pool = await self._get_pool()
+        try:
+            async with pool.acquire() as conn:
+                async with conn.transaction(readonly=True):
+                    records = [record async for record in conn.cursor(query, *args, prefetch=self.fetch_batch)]
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        self.stats["cursor_queries"] += 1
+        return records
+
+    @staticmethod
+    def _changes_query(columns: str) -> str:
+        return f"""
+            SELECT {columns}, (EXTRACT(EPOCH FROM updated_at) * 1000)::bigint AS updated_ms
+            FROM content_items
+            WHERE updated_at >= $1 AND (updated_at > $1 OR id > $2)
+            ORDER BY updated_at, id
+            LIMIT $3
+        """
+
+    @staticmethod
+    def _keyset(watermark: Watermark, limit: int) -> Tuple[datetime, str, int]:
+        updated_ms, last_id = watermark
+        return from_epoch_ms(int(updated_ms)), last_id, limit
+
+    @staticmethod
+    def _viral_query(
+        days: int,
+        min_views: int,
+        limit: int,
+        dataset_id: Optional[str],
+        topic_category: Optional[str],
+        ids: Optional[List[str]] = None
+    ) -> Tuple[str, List[Any]]:
+        """SQL and arguments of the windowed viral query; one statement per filter combination."""
+        args: List[Any] = []
+
+        def arg(value: Any) -> str:
+            args.append(value)
+            return f"${len(args)}"
+
+        conditions = ['"isArchived" = false', f"views >= {arg(min_views)}"]
+        if ids is not None:
+            # One array parameter: the statement doesn't change with the number of ids
+            conditions.insert(0, f"id = ANY({arg(list(ids))}::text[])")
+        cutoff = cutoff_ms(days)
+        if cutoff is not None:
+            conditions.append(f'"publishedAt" >= {arg(from_epoch_ms(cutoff))}')
+        if dataset_id:
+            conditions.append(f'"datasetId" = {arg(dataset_id)}')
+        if topic_category:
+            conditions.append(f'"topicCategory" = {arg(topic_category)}')
+
+        query = f"""
+            SELECT {_PG_COLUMNS}
+            FROM content_items
+            WHERE {" AND ".join(conditions)}
+            ORDER BY "viralityScore" DESC NULLS LAST, views DESC
+            LIMIT {arg(limit)}
+        """
+        return query, args
+
+    @staticmethod
+    def _to_item(record: "asyncpg.Record") -> Dict[str, Any]:
+        return {
+            "id": record["id"],
+            "instagram_id": record["instagramId"],
+            "headline": record["headline"] or "No headline",
+            "transcript": record["transcript"] or "",
+            "views": record["views"],
+            "likes": record["likes"],
+            "comments": record["comments"],
+            "virality_score": record["viralityScore"],
+            "published_at": to_epoch_ms(record["publishedAt"]),
+            "url": record["videoUrl"],
+            "dataset_id": record["datasetId"],
+            "topic_category": record["topicCategory"]
+        }
+
+
+@lru_cache()
+def get_trend_store() -> TrendStore:
+    """
+    Get the process-wide store.
+
+    trend_store_backend "auto": a "file:" database_url is that SQLite file;
+    a Postgres database_url is used unless Prisma's local dev.db exists
+    (development) or asyncpg is missing; otherwise dev.db.
+    """
+    settings = get_settings()
+    url = settings.database_url
+    backend = settings.trend_store_backend
+    if backend == "auto":
+        is_postgres = url.startswith(("postgres://", "postgresql://"))
+        local_dev = os.path.exists(DEFAULT_SQLITE_PATH)
+        backend = "postgres" if is_postgres and asyncpg is not None and not local_dev else "sqlite"
+
+    if backend == "postgres":
+        return PostgresTrendStore(
+            url,
+            max_size=settings.trend_db_pool_size,
+            statement_cache_size=settings.trend_pg_statement_cache_size,
+            fetch_batch=settings.trend_pg_fetch_batch
+        )
+    return SQLiteTrendStore(sqlite_path(url) or DEFAULT_SQLITE_PATH)
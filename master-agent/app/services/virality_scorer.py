@@ -0,0 +1,386 @@
+"""
+Virality Scorer - Fills content_items.viralityScore, vectorized with NumPy.
+
+Trends were ranked by raw views, which favours big accounts and old
+videos. The score puts each item next to its peers:
+- views z-score within its dataset and within its author (sourceUrl)
+- velocity: log views per hour since publishing, z-score within dataset
+- engagement rate ((likes + comments) / views), z-score within dataset
+
+score = exp(weighted sum of the clipped z-scores), so 1.0 is a typical
+item of its dataset/author and the scale matches the harvester's
+"views / batch average" ratio it replaces.
+
+Group statistics are fitted in one full pass (columns loaded into arrays;
+about 3s for a million rows) and reused to score rows changed since, read
+from the (updated_at, id) change feed. Ages and group statistics drift,
+so the full pass is repeated every full_rescore_seconds. Only scores that
+moved by more than CHANGE_TOLERANCE are written back, in batched
+transactions; the very first write-back of every row is the slow part,
+as each score moves entries in the trend indexes.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.services.sqlite_pool import SQLiteReadPool, get_read_pool
+from app.services.trend_snapshot import START_WATERMARK, Watermark
+from app.services.trend_store import SQLiteTrendStore, get_trend_store
+
+
+logger = logging.getLogger(__name__)
+
+# z-score name -> (grouping, feature) and its weight in the score
+Z_SCORES = {
+    "dataset_views": ("dataset", "views"),
+    "author_views": ("author", "views"),
+    "velocity": ("dataset", "velocity"),
+    "engagement": ("dataset", "engagement"),
+}
+WEIGHTS = {
+    "dataset_views": 0.3,
+    "author_views": 0.3,
+    "velocity": 0.25,
+    "engagement": 0.15,
+}
+
+MIN_GROUP_SIZE = 5      # Smaller groups (or unknown authors) contribute z = 0
+Z_CLIP = 4.0            # One outlier feature can't dominate the score
+MIN_AGE_HOURS = 1.0
+CHANGE_TOLERANCE = 0.01  # Relative; smaller changes are not written (ranking barely moves)
+WRITE_CACHE_KB = 256 * 1024
+
+# NULLs replaced in SQL: building arrays from plain numbers is much faster
+_SELECT = """
+    SELECT id, COALESCE(views, 0), COALESCE(likes, 0), COALESCE(comments, 0),
+           COALESCE(publishedAt, created_at), datasetId, COALESCE(sourceUrl, ''),
+           COALESCE(viralityScore, -1.0), isArchived, updated_at
+    FROM content_items
+"""
+
+
+@dataclass
+class Columns:
+    """content_items rows as arrays (one entry per row)."""
+    ids: List[str]
+    views: np.ndarray
+    likes: np.ndarray
+    comments: np.ndarray
+    published: np.ndarray        # epoch ms (created_at when publishedAt is NULL), NaN if unknown
+    datasets: List[str]
+    authors: List[str]           # "" = unknown
+    current: np.ndarray          # stored score, NaN if NULL
+    archived: np.ndarray
+    watermark: Optional[Watermark] = None   # (updated_at, id) of the last row
+
+    @classmethod
+    def from_rows(cls, rows: List[tuple]) -> "Columns":
+        """Rows of _SELECT -> columns."""
+        count = len(rows)
+
+        def numbers(i: int) -> np.ndarray:
+            return np.fromiter((row[i] for row in rows), dtype=np.float64, count=count)
+
+        published = np.array([row[4] for row in rows], dtype=np.float64)   # None -> NaN
+        current = numbers(7)
+        return cls(
+            ids=[row[0] for row in rows],
+            views=np.maximum(numbers(1), 0),
+            likes=np.maximum(numbers(2), 0),
+            comments=np.maximum(numbers(3), 0),
+            published=published,
+            datasets=[row[5] for row in rows],
+            authors=[row[6] for row in rows],
+            current=np.where(current < 0, np.nan, current),
+            archived=np.fromiter((row[8] for row in rows), dtype=bool, count=count),
+            watermark=(rows[-1][9], rows[-1][0]) if rows else None,
+        )
+
+    def select(self, mask: np.ndarray) -> "Columns":
+        keep = np.flatnonzero(mask)
+        return Columns(
+            ids=[self.ids[i] for i in keep],
+            views=self.views[keep],
+            likes=self.likes[keep],
+            comments=self.comments[keep],
+            published=self.published[keep],
+            datasets=[self.datasets[i] for i in keep],
+            authors=[self.authors[i] for i in keep],
+            current=self.current[keep],
+            archived=self.archived[keep],
+            watermark=self.watermark,
+        )
+
+
+def features(columns: Columns, now_ms: float) -> Dict[str, np.ndarray]:
+    """Per-row log views, log views per hour and log engagement rate."""
+    log_views = np.log1p(columns.views)
+    published = np.where(np.isnan(columns.published), now_ms, columns.published)
+    age_hours = np.maximum((now_ms - published) / 3.6e6, MIN_AGE_HOURS)
+    return {
+        "views": log_views,
+        "velocity": log_views - np.log(age_hours),
+        "engagement": np.log1p(columns.likes + columns.comments) - log_views,
+    }
+
+
+def factorize(keys: Iterable[str], index: Dict[str, int], grow: bool = False) -> np.ndarray:
+    """Group code per key; unseen keys get a new code (grow) or -1."""
+    if grow:
+        return np.fromiter((index.setdefault(key, len(index)) for key in keys), dtype=np.int64)
+    return np.fromiter((index.get(key, -1) for key in keys), dtype=np.int64)
+
+
+class GroupStats:
+    """Mean and standard deviation of one feature per group."""
+
+    def __init__(self, codes: np.ndarray, groups: int, values: np.ndarray, unknown: Optional[int] = None):
+        """
+        Args:
+            codes: Group code per row (0 <= code < groups)
+            groups: Number of groups
+            values: Feature value per row
+            unknown: Code of the "unknown" group, which gets no z-scores
+        """
+        count = np.bincount(codes, minlength=groups)
+        total = np.bincount(codes, weights=values, minlength=groups)
+        squares = np.bincount(codes, weights=values * values, minlength=groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean = total / count
+            self.std = np.sqrt(np.maximum(squares / count - self.mean ** 2, 0))
+        # Small or flat groups carry no signal
+        self.usable = (count >= MIN_GROUP_SIZE) & (self.std > 1e-9)
+        if unknown is not None:
+            self.usable[unknown] = False
+
+    def z(self, codes: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Clipped z-scores of values in their groups (0 for unusable or unseen groups)."""
+        known = codes >= 0
+        safe = np.where(known, codes, 0)
+        if not len(self.usable):
+            return np.zeros(len(codes))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = (values - self.mean[safe]) / self.std[safe]
+        return np.where(known & self.usable[safe], np.clip(z, -Z_CLIP, Z_CLIP), 0.0)
+
+
+class ViralityModel:
+    """Group statistics of one full pass; scores any rows against them."""
+
+    def __init__(self, columns: Columns, now_ms: float):
+        self.fitted_at = time.monotonic()
+        values = features(columns, now_ms)
+        self.index: Dict[str, Dict[str, int]] = {"dataset": {}, "author": {}}
+        codes = {
+            grouping: factorize(self._keys(columns, grouping), index, grow=True)
+            for grouping, index in self.index.items()
+        }
+        self.stats = {
+            name: GroupStats(
+                codes[grouping], len(self.index[grouping]), values[feature], self.index[grouping].get("")
+            )
+            for name, (grouping, feature) in Z_SCORES.items()
+        }
+        self.fit_scores = self._combine(codes, values)
+
+    def score(self, columns: Columns, now_ms: float) -> np.ndarray:
+        """Scores of (other) rows against the fitted statistics."""
+        codes = {
+            grouping: factorize(self._keys(columns, grouping), index)
+            for grouping, index in self.index.items()
+        }
+        return self._combine(codes, features(columns, now_ms))
+
+    def _combine(self, codes: Dict[str, np.ndarray], values: Dict[str, np.ndarray]) -> np.ndarray:
+        total = np.zeros(len(values["views"]))
+        for name, (grouping, feature) in Z_SCORES.items():
+            total += WEIGHTS[name] * self.stats[name].z(codes[grouping], values[feature])
+        return np.round(np.exp(total), 4)
+
+    @staticmethod
+    def _keys(columns: Columns, grouping: str) -> List[str]:
+        return columns.datasets if grouping == "dataset" else columns.authors
+
+
+class ViralityScorer:
+    """
+    Computes and writes back content_items.viralityScore.
+
+    Usage:
+        written = await scorer.run_once()   # full pass when due, else changed rows
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pool: Optional[SQLiteReadPool] = None,
+        full_rescore_seconds: float = 6 * 3600,
+        batch_size: int = 20000,
+        write_batch: int = 50000
+    ):
+        """
+        Args:
+            db_path: Prisma SQLite file (written to)
+            pool: Injected read pool (default: the shared one for db_path)
+            full_rescore_seconds: Refit and rescore everything this often
+            batch_size: Changed rows read per query
+            write_batch: Scores written per transaction
+        """
+        self.db_path = db_path
+        self.pool = pool or get_read_pool(db_path)
+        self.full_rescore_seconds = full_rescore_seconds
+        self.batch_size = batch_size
+        self.write_batch = write_batch
+        self._model: Optional[ViralityModel] = None
+        self._watermark: Watermark = START_WATERMARK
+        self._lock = asyncio.Lock()
+        self.stats: Dict[str, Any] = {
+            "full_passes": 0,
+            "incremental_passes": 0,
+            "rows_scored": 0,
+            "rows_written": 0,
+            "last_full_ms": 0.0,
+        }
+
+    # ==========================================
+    # Public API
+    # ==========================================
+
+    async def run_once(self) -> int:
+        """
+        Score rows and write changed scores.
+
+        Returns:
+            Number of scores written
+        """
+        model = self._model
+        if model is None or time.monotonic() - model.fitted_at > self.full_rescore_seconds:
+            return await self.score_all()
+        return await self.score_changes()
+
+    async def score_all(self) -> int:
+        """Refit the group statistics on every live row and rescore them all."""
+        async with self._lock:
+            started = time.perf_counter()
+            # Rows changed during the pass are rescored by the next incremental one
+            latest = await self.pool.fetchall(
+                "SELECT updated_at, id FROM content_items ORDER BY updated_at DESC, id DESC LIMIT 1"
+            )
+            columns = await self.pool.run(lambda conn: self._load(conn, f"{_SELECT} WHERE isArchived = 0", ()))
+            model = await asyncio.to_thread(ViralityModel, columns, time.time() * 1000)
+            written = await asyncio.to_thread(self._write, columns, model.fit_scores)
+
+            self._model = model
+            self._watermark = (latest[0]["updated_at"], latest[0]["id"]) if latest else START_WATERMARK
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stats["full_passes"] += 1
+            self.stats["rows_scored"] += len(columns.ids)
+            self.stats["rows_written"] += written
+            self.stats["last_full_ms"] = round(elapsed, 1)
+            logger.info(
+                f"🔥 Virality: scored {len(columns.ids)} items in {elapsed:.0f}ms, wrote {written} changed scores"
+            )
+            return written
+
+    async def score_changes(self) -> int:
+        """Score rows changed since the last pass against the fitted statistics."""
+        async with self._lock:
+            if self._model is None:
+                return 0
+            written = 0
+            query = f"{_SELECT} WHERE updated_at >= ? AND (updated_at > ? OR id > ?) ORDER BY updated_at, id LIMIT ?"
+            while True:
+                updated_at, last_id = self._watermark
+                params = (updated_at, updated_at, last_id, self.batch_size)
+                columns = await self.pool.run(lambda conn: self._load(conn, query, params))
+                if not columns.ids:
+                    break
+                live = columns.select(~columns.archived)
+                if live.ids:
+                    scores = self._model.score(live, time.time() * 1000)
+                    written += await asyncio.to_thread(self._write, live, scores)
+                    self.stats["rows_scored"] += len(live.ids)
+                self._watermark = columns.watermark
+                if len(columns.ids) < self.batch_size:
+                    break
+
+            self.stats["incremental_passes"] += 1
+            self.stats["rows_written"] += written
+            if written:
+                logger.info(f"🔥 Virality: wrote {written} scores for changed items")
+            return written
+
+    def snapshot(self) -> Dict[str, Any]:
+        model = self._model
+        return {
+            **self.stats,
+            "fitted": model is not None,
+            "model_age_seconds": round(time.monotonic() - model.fitted_at, 1) if model else None,
+            "watermark": self._watermark,
+        }
+
+    # ==========================================
+    # Internals
+    # ==========================================
+
+    @staticmethod
+    def _load(conn: sqlite3.Connection, query: str, params: tuple) -> Columns:
+        """Runs on a pool thread: plain tuples, no Row objects."""
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        return Columns.from_rows(cursor.execute(query, params).fetchall())
+
+    def _write(self, columns: Columns, scores: np.ndarray) -> int:
+        """Runs on a worker thread with its own (writable) connection."""
+        current = columns.current
+        with np.errstate(invalid="ignore"):
+            changed = np.isnan(current) | (
+                np.abs(scores - current) > CHANGE_TOLERANCE * np.maximum(np.abs(current), 1.0)
+            )
+        # In primary key order: neighbouring updates touch the same pages
+        order = sorted(np.flatnonzero(changed), key=columns.ids.__getitem__)
+        rows = [(float(scores[i]), columns.ids[i]) for i in order]
+        if not rows:
+            return 0
+
+        # updated_at is left alone: a score is derived data, not a content change
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            # Every score moves an entry in the three trend indexes; keep them cached
+            conn.execute(f"PRAGMA cache_size = -{WRITE_CACHE_KB}")
+            for start in range(0, len(rows), self.write_batch):
+                with conn:
+                    conn.executemany(
+                        "UPDATE content_items SET viralityScore = ? WHERE id = ?",
+                        rows[start:start + self.write_batch]
+                    )
+        finally:
+            conn.close()
+        return len(rows)
+
+
+@lru_cache()
+def get_virality_scorer() -> Optional[ViralityScorer]:
+    """
+    Get the process-wide scorer for the SQLite trend store.
+
+    Returns:
+        None on any other backend: scores are written to SQLite only
+        (on Postgres the harvester's viralityScore is used as is)
+    """
+    settings = get_settings()
+    store = get_trend_store()
+    if not isinstance(store, SQLiteTrendStore):
+        return None
+    return ViralityScorer(
+        db_path=store.db_path,
+        full_rescore_seconds=settings.virality_full_rescore_seconds
+    )
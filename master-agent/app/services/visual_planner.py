@@ -16,8 +16,9 @@ from app.models.batch import (
     VisualBlueprint,
     ItemStatus,
 )
-from app.prompts.producer_prompts import VISUAL_PLANNER_PROMPT
+from app.prompts.producer_prompts import VISUAL_PLANNER_PROMPT, VISUAL_PLANNER_TASK
 from app.services.base.ai_service import AIService
+from app.services.llm_governor import Priority
 from app.services.batch_repository import BatchRepository
 
 
@@ -31,6 +32,9 @@ class VisualPlanner(AIService):
     3. Define text overlays and timing
     """
     
+    priority = Priority.BULK
+    task = "visuals"
+    
     def __init__(self, batch_repo: Optional[BatchRepository] = None, **kwargs):
         """
         Initialize with dependencies.
@@ -46,7 +50,8 @@ class VisualPlanner(AIService):
         batch_id: str,
         approved_ids: List[str],
         rejected_ids: List[str] = None,
-        feedback: Dict[str, str] = None
+        feedback: Dict[str, str] = None,
+        bulk: bool = False
     ) -> BatchResponse:
         """
         Create visual blueprints for approved scripts.
@@ -56,6 +61,8 @@ class VisualPlanner(AIService):
             approved_ids: List of approved script IDs
             rejected_ids: List of rejected script IDs
             feedback: Dict of script_id -> feedback for regeneration
+            bulk: Offline mode: one Message Batches request per script
+                  (cheaper, not interactive - may take minutes to hours)
             
         Returns:
             Updated batch with visual blueprints
@@ -73,7 +80,61 @@ class VisualPlanner(AIService):
         if not approved_scripts:
             raise ValueError("No scripts approved for visual planning")
         
-        # Build prompt
+        if bulk:
+            visuals = await self._create_blueprints_bulk(approved_scripts)
+        else:
+            result = await self._generate_json(
+                self._build_task(approved_scripts),
+                prefix=VISUAL_PLANNER_PROMPT,
+                items=len(approved_scripts)
+            )
+            visuals = self._parse_blueprints(result)
+        
+        # Update batch
+        batch.visuals = visuals
+        batch.state = BatchState.PRODUCTION
+        self.batch_repo.save(batch)
+        
+        self.logger.info(f"Created {len(visuals)} visual blueprints for batch {batch_id}")
+        
+        return batch
+    
+    def begin_blueprints(
+        self,
+        batch_id: str,
+        approved_ids: List[str],
+        rejected_ids: List[str] = None
+    ) -> BatchResponse:
+        """
+        Mark approved/rejected scripts, for an offline run of
+        create_blueprints_bulk() in the background. The batch stays in
+        REVIEW_SCRIPTS until the blueprints exist.
+        
+        Raises:
+            ValueError: Batch not found or no script approved
+        """
+        batch = self.batch_repo.get_or_raise(batch_id)
+        if not self._filter_approved(batch.scripts, approved_ids, rejected_ids or []):
+            raise ValueError("No scripts approved for visual planning")
+        self.batch_repo.save(batch)
+        return batch
+    
+    async def create_blueprints_bulk(self, batch_id: str) -> BatchResponse:
+        """
+        Offline blueprints for the APPROVED scripts of a batch prepared by
+        begin_blueprints(); moves it to PRODUCTION.
+        """
+        batch = self.batch_repo.get_or_raise(batch_id)
+        approved = [s for s in batch.scripts if s.status == ItemStatus.APPROVED]
+        batch.visuals = await self._create_blueprints_bulk(approved)
+        batch.state = BatchState.PRODUCTION
+        self.batch_repo.save(batch)
+        
+        self.logger.info(f"Created {len(batch.visuals)} visual blueprints for batch {batch_id} (bulk)")
+        return batch
+    
+    def _build_task(self, scripts: List[ScriptItem]) -> str:
+        """Build the dynamic visual-planning task for these scripts."""
         scripts_json = [
             {
                 "id": s.id,
@@ -81,27 +142,36 @@ class VisualPlanner(AIService):
                 "caption": s.caption,
                 "hook_type": s.hook_type
             }
-            for s in approved_scripts
+            for s in scripts
         ]
         
-        prompt = VISUAL_PLANNER_PROMPT.format(
+        return VISUAL_PLANNER_TASK.format(
             scripts_json=json.dumps(scripts_json, indent=2, ensure_ascii=False)
         )
+    
+    async def _create_blueprints_bulk(self, scripts: List[ScriptItem]) -> List[VisualBlueprint]:
+        """
+        One batch request per script; results are mapped back by position,
+        so the blueprint keeps its script's ID whatever the model echoes.
+        """
+        prompts = {f"item_{i}": self._build_task([s]) for i, s in enumerate(scripts)}
+        results = await self._generate_json_bulk(prompts, prefix=VISUAL_PLANNER_PROMPT)
         
-        # Generate visual blueprints
-        result = await self._generate_json(prompt)
-        
-        # Parse blueprints
-        visuals = self._parse_blueprints(result)
-        
-        # Update batch
-        batch.visuals = visuals
-        batch.state = BatchState.PRODUCTION
-        self.batch_repo.save(batch)
-        
-        self.logger.info(f"Created {len(visuals)} visual blueprints for batch {batch_id}")
+        visuals = []
+        for i, script in enumerate(scripts):
+            try:
+                parsed = self._parse_blueprints(results.get(f"item_{i}"))
+            except (KeyError, TypeError) as e:
+                self.logger.warning(f"Malformed blueprint for script {script.id}: {e}")
+                parsed = []
+            if not parsed:
+                self.logger.warning(f"No blueprint generated for script {script.id}")
+                continue
+            blueprint = parsed[0]
+            blueprint.id = script.id
+            visuals.append(blueprint)
         
-        return batch
+        return visuals
     
     def _filter_approved(
         self,
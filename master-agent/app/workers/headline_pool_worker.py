@@ -0,0 +1,81 @@
+"""
+Headline Pool Worker - Keeps hot-topic headline pools warm.
+
+Requests refill a topic after consuming from it; this loop also covers
+configured topics nobody has asked for yet and replaces headlines the
+pool evicted as stale.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import get_settings
+from app.services.headline_generator import HeadlineGenerator
+from app.services.headline_pool import HeadlinePool, get_headline_pool
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+class HeadlinePoolWorker:
+    """
+    asyncio loop running HeadlinePool.warm() every interval.
+
+    Usage:
+        worker.start()      # on app startup
+        await worker.stop() # on shutdown
+    """
+
+    def __init__(
+        self,
+        pool: Optional[HeadlinePool] = None,
+        generator: Optional[HeadlineGenerator] = None,
+        interval_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            pool: Injected pool (default: the shared one)
+            generator: Produces headlines for the pool
+            interval_seconds: Pause between runs (default from settings)
+        """
+        self.pool = pool or get_headline_pool()
+        self.generator = generator or HeadlineGenerator(headline_pool=self.pool)
+        self.interval_seconds = interval_seconds or settings.headline_pool_refresh_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """
+        Refill every hot topic.
+
+        Returns:
+            Number of headlines added
+        """
+        added = await self.pool.warm(self.generator.pool_headlines)
+        if added:
+            logger.info(f"🏊 Headline pool worker added {added} headlines")
+        return added
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"Headline pool worker run failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
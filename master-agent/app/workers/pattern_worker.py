@@ -0,0 +1,89 @@
+"""
+Pattern Worker - Background prefetch of per-item pattern analyses.
+
+Periodically pulls the same trend window the headline generator uses
+and analyzes items that are new or whose headline/transcript changed,
+so headline requests find every analysis already stored.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import get_settings
+from app.services.pattern_analyzer import PatternAnalyzer
+from app.services.trend_analyzer import TrendAnalyzer
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Trend rows the headline generator reads per request (see _fetch_trends)
+TREND_LIMIT = 50
+
+
+class PatternWorker:
+    """
+    asyncio loop running PatternAnalyzer.refresh() every interval.
+
+    Usage:
+        worker.start()      # on app startup
+        await worker.stop() # on shutdown
+    """
+
+    def __init__(
+        self,
+        analyzer: Optional[PatternAnalyzer] = None,
+        trend_analyzer: Optional[TrendAnalyzer] = None,
+        interval_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            analyzer: Injected pattern analyzer
+            trend_analyzer: Injected trend source
+            interval_seconds: Pause between runs (default from settings)
+        """
+        self.analyzer = analyzer or PatternAnalyzer()
+        self.trend_analyzer = trend_analyzer or TrendAnalyzer()
+        self.interval_seconds = interval_seconds or settings.pattern_refresh_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """
+        Analyze new/changed items of the default trend window.
+
+        Returns:
+            Number of items analyzed
+        """
+        trends = await self.trend_analyzer.get_viral_content(
+            days=settings.default_trend_days,
+            min_views=settings.default_min_views,
+            limit=TREND_LIMIT
+        )
+        analyzed = await self.analyzer.refresh(trends)
+        if analyzed:
+            logger.info(f"🧠 Pattern worker analyzed {analyzed} new/changed items")
+        return analyzed
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"Pattern worker run failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,77 @@
+"""
+Transcript Index Worker - Keeps the full-text index in sync.
+
+The first run indexes every content item (resumable: the position is
+stored with the index); later runs apply only rows changed since.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import get_settings
+from app.services.transcript_index import TranscriptIndex, get_transcript_index
+from app.services.trend_analyzer import TrendAnalyzer
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+class TranscriptIndexWorker:
+    """
+    asyncio loop running TranscriptIndex.sync() every interval.
+
+    Usage:
+        worker.start()      # on app startup
+        await worker.stop() # on shutdown
+    """
+
+    def __init__(
+        self,
+        index: Optional[TranscriptIndex] = None,
+        source: Optional[TrendAnalyzer] = None,
+        interval_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            index: Injected index (default: the shared one)
+            source: Change feed (default: TrendAnalyzer on dev.db)
+            interval_seconds: Pause between syncs (default from settings)
+        """
+        self.index = index or get_transcript_index()
+        self.source = source or TrendAnalyzer(transcript_index=self.index)
+        self.interval_seconds = interval_seconds or settings.transcript_index_sync_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """
+        Apply changed rows to the index.
+
+        Returns:
+            Number of rows applied
+        """
+        return await self.index.sync(self.source)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"Transcript index sync failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
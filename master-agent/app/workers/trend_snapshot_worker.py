@@ -0,0 +1,84 @@
+"""
+Trend Snapshot Worker - Keeps the in-memory trend snapshot current.
+
+Polls content_items for changed rows every few seconds so requests find
+the snapshot within its staleness bound and never wait for a poll. The
+first run also loads the default scope (all datasets, default window).
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import get_settings
+from app.services.trend_analyzer import TrendAnalyzer
+from app.services.trend_snapshot import TrendSnapshot, get_trend_snapshot
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+class TrendSnapshotWorker:
+    """
+    asyncio loop running TrendSnapshot.refresh() every interval.
+
+    Usage:
+        worker.start()      # on app startup
+        await worker.stop() # on shutdown
+    """
+
+    def __init__(
+        self,
+        snapshot: Optional[TrendSnapshot] = None,
+        source: Optional[TrendAnalyzer] = None,
+        interval_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            snapshot: Injected snapshot (default: the shared one)
+            source: Database reader (default: TrendAnalyzer on dev.db)
+            interval_seconds: Pause between polls (default from settings)
+        """
+        self.snapshot = snapshot or get_trend_snapshot()
+        self.source = source or TrendAnalyzer(snapshot=self.snapshot)
+        self.interval_seconds = interval_seconds or settings.trend_snapshot_refresh_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """
+        Apply changed rows to every loaded scope.
+
+        Returns:
+            Number of changed rows applied
+        """
+        return await self.snapshot.refresh(self.source)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self) -> None:
+        try:
+            await self.snapshot.get(
+                self.source, settings.default_trend_days, settings.default_min_views, 50
+            )
+        except Exception as e:
+            logger.warning(f"Trend snapshot warm-up failed: {e}")
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"Trend snapshot worker run failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,90 @@
+"""
+Virality Worker - Keeps content_items.viralityScore current.
+
+The first run scores every item; later runs score only new and changed
+rows, with a full rescore every virality_full_rescore_seconds. Written
+scores don't bump updated_at, so the trend snapshot is invalidated
+after every write.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import get_settings
+from app.services.trend_snapshot import TrendSnapshot, get_trend_snapshot
+from app.services.virality_scorer import ViralityScorer, get_virality_scorer
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+class ViralityWorker:
+    """
+    asyncio loop running ViralityScorer.run_once() every interval.
+
+    Usage:
+        worker.start()      # on app startup
+        await worker.stop() # on shutdown
+    """
+
+    def __init__(
+        self,
+        scorer: Optional[ViralityScorer] = None,
+        snapshot: Optional[TrendSnapshot] = None,
+        interval_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            scorer: Injected scorer (default: the shared one for the SQLite trend store)
+            snapshot: Trend snapshot to invalidate (default: the shared one, if enabled)
+            interval_seconds: Pause between runs (default from settings)
+            
+        Raises:
+            ValueError: No scorer injected and the trend store is not SQLite
+        """
+        scorer = scorer or get_virality_scorer()
+        if scorer is None:
+            raise ValueError("Virality scoring needs the SQLite trend store")
+        self.scorer = scorer
+        if snapshot is None and settings.trend_snapshot_enabled:
+            snapshot = get_trend_snapshot()
+        self.snapshot = snapshot
+        self.interval_seconds = interval_seconds or settings.virality_refresh_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """
+        Score new/changed items (or all, when a full pass is due).
+
+        Returns:
+            Number of scores written
+        """
+        written = await self.scorer.run_once()
+        if written and self.snapshot is not None:
+            self.snapshot.invalidate()
+        return written
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"Virality scoring failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
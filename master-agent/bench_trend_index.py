@@ -0,0 +1,99 @@
+"""
+Benchmark: windowed viral query with and without the trend indexes.
+
+Builds a content_items table shaped like Prisma's (with Prisma's own
+indexes only), times the viral query for each scope, then runs
+TrendAnalyzer.ensure_indexes() and times it again. Prints the
+EXPLAIN QUERY PLAN of every scope.
+
+Usage (from master-agent/):
+    python bench_trend_index.py --rows 1000000
+    python bench_trend_index.py --rows 10000000 --db /tmp/trends_10m.db   # keep the file
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+from app.services.sqlite_pool import SQLiteReadPool
+from app.services.trend_analyzer import TrendAnalyzer
+from app.services.trend_store import SQLiteTrendStore
+from bench_trend_queries import build_db
+
+SCOPES = {
+    "all": {},
+    "dataset": {"dataset_id": "ds3"},
+    "category": {"topic_category": "money"},
+    "dataset+category": {"dataset_id": "ds3", "topic_category": "money"},
+}
+
+
+async def time_scopes(analyzer: TrendAnalyzer, days: int, min_views: int, repeats: int) -> dict:
+    timings = {}
+    for scope, filters in SCOPES.items():
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            rows = await analyzer.get_viral_content(days=days, min_views=min_views, limit=50, **filters)
+            samples.append((time.perf_counter() - start) * 1000)
+        timings[scope] = (statistics.median(samples), len(rows))
+    return timings
+
+
+async def print_plans(analyzer: TrendAnalyzer) -> None:
+    for scope, filters in SCOPES.items():
+        print(f"   {scope:<17} {' | '.join(await analyzer.explain(**filters))}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=7, help="Query window")
+    parser.add_argument("--min-views", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--db", help="Database file to build/reuse (default: temporary)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, "bench.db")
+        if not os.path.exists(path):
+            print(f"🏗️  Building {args.rows:,} content items (1 year of history)...")
+            started = time.perf_counter()
+            build_db(path, args.rows, transcript="Транскрипт ролика.")
+            print(f"   done in {time.perf_counter() - started:.0f}s")
+
+        pool = SQLiteReadPool(path, size=2)
+        analyzer = TrendAnalyzer(store=SQLiteTrendStore(path, pool))
+
+        print(f"\n📐 Plans without trend indexes")
+        await print_plans(analyzer)
+        before = await time_scopes(analyzer, args.days, args.min_views, args.repeats)
+
+        started = time.perf_counter()
+        verified = await analyzer.ensure_indexes()
+        print(f"\n🗂️  ensure_indexes(): {time.perf_counter() - started:.1f}s, verified {verified}")
+
+        # Fresh connections: the old ones cached the pre-index statements
+        pool.close()
+        pool = SQLiteReadPool(path, size=2)
+        analyzer.store = SQLiteTrendStore(path, pool)
+
+        print(f"\n📐 Plans with trend indexes")
+        await print_plans(analyzer)
+        after = await time_scopes(analyzer, args.days, args.min_views, args.repeats)
+
+        print(f"\n⏱️  Median query time, last {args.days} days, views >= {args.min_views:,}")
+        print(f"   {'scope':<17} {'before ms':>10} {'after ms':>10} {'rows':>6}")
+        for scope in SCOPES:
+            print(f"   {scope:<17} {before[scope][0]:10.1f} {after[scope][0]:10.2f} {after[scope][1]:6}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
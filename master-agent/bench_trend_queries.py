@@ -0,0 +1,155 @@
+"""
+Benchmark: event-loop latency under concurrent trend queries.
+
+Builds a throwaway content_items database, then fires concurrent
+get_viral_content() calls while a ticker coroutine measures how late the
+event loop wakes it up. Compares the old in-loop sqlite3 query with the
+pooled TrendAnalyzer.
+
+Usage (from master-agent/):
+    python bench_trend_queries.py [--rows 50000] [--concurrency 20] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+from app.services.sqlite_pool import SQLiteReadPool
+from app.services.trend_analyzer import TrendAnalyzer
+from app.services.trend_store import SQLiteTrendStore
+
+TICK_SECONDS = 0.005
+DATASETS = 20
+AUTHORS = 2000
+CATEGORIES = ["business", "psychology", "health", "relationships", "money", "lifestyle"]
+
+
+def build_db(path: str, rows: int, transcript: str = "Транскрипт ролика. " * 40, days: int = 365) -> None:
+    """content_items as Prisma creates it (same columns and indexes), random rows."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(
+        """
+        CREATE TABLE content_items (
+            id TEXT NOT NULL PRIMARY KEY, instagramId TEXT NOT NULL, originalUrl TEXT NOT NULL,
+            sourceUrl TEXT, videoUrl TEXT, views INTEGER NOT NULL DEFAULT 0, likes INTEGER NOT NULL DEFAULT 0,
+            comments INTEGER NOT NULL DEFAULT 0, publishedAt DATETIME, headline TEXT, transcript TEXT, description TEXT,
+            isApproved BOOLEAN NOT NULL DEFAULT false, viralityScore REAL, datasetId TEXT NOT NULL,
+            isArchived BOOLEAN NOT NULL DEFAULT false, topicCategory TEXT,
+            created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL
+        )
+        """
+    )
+    rng = random.Random(1)
+    now_ms = int(time.time() * 1000)
+    conn.executemany(
+        "INSERT INTO content_items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL, 0, NULL, ?, ?, ?, ?, ?)",
+        (
+            (
+                f"c{i}", f"ig{i}", f"https://instagram.com/p/{i}", f"https://instagram.com/author{i % AUTHORS}",
+                f"https://example.com/{i}",
+                int(rng.paretovariate(1.2) * 2000), rng.randint(0, 100_000), rng.randint(0, 5000),
+                now_ms - rng.randint(0, days * 86400_000), f"Заголовок номер {i}", transcript,
+                f"ds{rng.randrange(DATASETS)}", int(rng.random() < 0.1), rng.choice(CATEGORIES), now_ms, now_ms
+            )
+            for i in range(rows)
+        )
+    )
+    conn.execute('CREATE INDEX "content_items_datasetId_idx" ON content_items (datasetId)')
+    conn.execute('CREATE INDEX "content_items_isArchived_idx" ON content_items (isArchived)')
+    conn.execute('CREATE INDEX "content_items_isApproved_idx" ON content_items (isApproved)')
+    conn.commit()
+    conn.close()
+
+
+class BlockingTrendAnalyzer(TrendAnalyzer):
+    """The previous implementation: a fresh connection, queried on the loop."""
+
+    async def get_viral_content(self, days=7, min_views=100000, limit=50):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            return SQLiteTrendStore._query_viral(
+                conn, *SQLiteTrendStore._viral_query(days, min_views, limit, None, None)
+            )
+        finally:
+            conn.close()
+
+
+async def ticker(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((time.perf_counter() - start - TICK_SECONDS) * 1000)
+
+
+async def run(analyzer: TrendAnalyzer, concurrency: int, rounds: int) -> dict:
+    lags: list = []
+    stop = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(lags, stop))
+    await asyncio.sleep(TICK_SECONDS * 2)
+
+    latencies = []
+
+    async def one():
+        start = time.perf_counter()
+        await analyzer.get_viral_content(min_views=100_000, limit=50)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(one() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await tick
+    lags.sort()
+    return {
+        "queries/s": concurrency * rounds / elapsed,
+        "query p50 ms": statistics.median(latencies),
+        "loop lag p50 ms": statistics.median(lags),
+        "loop lag p99 ms": lags[int(len(lags) * 0.99) - 1] if len(lags) > 1 else lags[-1],
+        "loop lag max ms": lags[-1],
+    }
+
+
+def report(name: str, result: dict) -> None:
+    print(f"\n{name}")
+    for key, value in result.items():
+        print(f"   {key:<16} {value:10.2f}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        print(f"🏗️  Building {args.rows} content items...")
+        build_db(path, args.rows)
+
+        pool = SQLiteReadPool(path, size=args.pool_size)
+        blocking = BlockingTrendAnalyzer(store=SQLiteTrendStore(path, pool))
+        pooled = TrendAnalyzer(store=SQLiteTrendStore(path, pool))
+
+        print(f"⏱️  {args.concurrency} concurrent queries x {args.rounds} rounds")
+        report("Blocking (sqlite3 on the event loop)", await run(blocking, args.concurrency, args.rounds))
+        report(f"Pooled ({args.pool_size} read-only connections)", await run(pooled, args.concurrency, args.rounds))
+        pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""
+Benchmark: virality scoring of a large content_items table.
+
+Builds a Prisma-shaped table, times the full pass (load, fit, score,
+write back), then changes a batch of rows and times the incremental pass.
+Finally checks that the trend query, now ordered by viralityScore, is
+still served by the trend indexes.
+
+Usage (from master-agent/):
+    python bench_virality.py --rows 1000000
+    python bench_virality.py --rows 3000000 --db /tmp/trends_3m.db   # keep the file
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+from app.services.sqlite_pool import SQLiteReadPool
+from app.services.trend_analyzer import TrendAnalyzer
+from app.services.trend_store import SQLiteTrendStore
+from app.services.virality_scorer import ViralityScorer
+from bench_trend_queries import build_db
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--changes", type=int, default=10_000, help="Rows changed before the incremental pass")
+    parser.add_argument("--db", help="Database file to build/reuse (default: temporary)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, "bench.db")
+        if not os.path.exists(path):
+            print(f"🏗️  Building {args.rows:,} content items...")
+            build_db(path, args.rows, transcript="Транскрипт ролика.")
+
+        pool = SQLiteReadPool(path, size=2)
+        analyzer = TrendAnalyzer(store=SQLiteTrendStore(path, pool))
+        await analyzer.ensure_indexes()
+
+        scorer = ViralityScorer(path, pool=pool)
+        started = time.perf_counter()
+        written = await scorer.score_all()
+        print(f"\n🔥 Full pass: {time.perf_counter() - started:.2f}s, {written:,} scores written")
+
+        started = time.perf_counter()
+        written = await scorer.score_all()
+        print(f"   Repeat full pass: {time.perf_counter() - started:.2f}s, {written:,} scores written")
+
+        rng = random.Random(7)
+        now_ms = int(time.time() * 1000) + 1
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.executemany(
+                "UPDATE content_items SET views = views * 3 + 1000, updated_at = ? WHERE id = ?",
+                ((now_ms, f"c{rng.randrange(args.rows)}") for _ in range(args.changes))
+            )
+        conn.close()
+        started = time.perf_counter()
+        written = await scorer.score_changes()
+        print(f"   Incremental pass ({args.changes:,} changed rows): "
+              f"{(time.perf_counter() - started) * 1000:.0f}ms, {written:,} scores written")
+
+        print("\n🏆 Top 5, last 30 days")
+        for row in await analyzer.get_viral_content(days=30, min_views=0, limit=5):
+            print(f"   {row['virality_score']:8.2f}  {row['views']:>10,} views  {row['likes']:>7,} likes  {row['dataset_id']}")
+
+        # Fresh connections: the old ones cached the pre-index statements
+        pool.close()
+        pool = SQLiteReadPool(path, size=2)
+        analyzer.store = SQLiteTrendStore(path, pool)
+        print("\n📐 Plans")
+        for shape, (dataset_id, topic_category) in {
+            "all": (None, None), "dataset": ("ds3", None), "category": (None, "money")
+        }.items():
+            print(f"   {shape:<9} {' | '.join(await analyzer.explain(dataset_id, topic_category))}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
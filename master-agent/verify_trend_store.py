@@ -0,0 +1,277 @@
+"""
+Verify: the trend store backends return the same, correct answers.
+
+Loads one generated dataset into a throwaway SQLite file and, with --dsn,
+into a throwaway schema of a Postgres database (Prisma's content_items
+columns and types), then checks each backend:
+- the viral query (scopes, windows, min views, id filter) against a
+  reference computed in Python, unscored rows last
+- both change feeds page through rows sharing one timestamp without
+  gaps or repeats; latest_change() is the last row
+- concurrent queries all return the same rows
+- ensure_indexes() reports every check passed
+
+Usage (from master-agent/):
+    python verify_trend_store.py                                        # SQLite only
+    python verify_trend_store.py --dsn postgresql://localhost:5432/sergei   # + Postgres
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.getcwd())
+
+from app.services.sqlite_pool import SQLiteReadPool
+from app.services.trend_snapshot import START_WATERMARK, cutoff_ms
+from app.services.trend_store import PostgresTrendStore, SQLiteTrendStore, TrendStore, from_epoch_ms
+
+DATASETS = ["ds1", "ds2", "ds3"]
+CATEGORIES = ["money", "health", None]
+
+COLUMNS = [
+    "id", "instagramId", "originalUrl", "sourceUrl", "videoUrl", "views", "likes", "comments",
+    "publishedAt", "headline", "transcript", "description", "viralityScore", "datasetId",
+    "isArchived", "topicCategory", "created_at", "updated_at",
+]
+
+SQLITE_TABLE = """
+    CREATE TABLE content_items (
+        id TEXT NOT NULL PRIMARY KEY, instagramId TEXT NOT NULL, originalUrl TEXT NOT NULL,
+        sourceUrl TEXT, videoUrl TEXT, views INTEGER NOT NULL DEFAULT 0, likes INTEGER NOT NULL DEFAULT 0,
+        comments INTEGER NOT NULL DEFAULT 0, publishedAt DATETIME, headline TEXT, transcript TEXT,
+        description TEXT, viralityScore REAL, datasetId TEXT NOT NULL,
+        isArchived BOOLEAN NOT NULL DEFAULT false, topicCategory TEXT,
+        created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL
+    )
+"""
+
+# As `prisma migrate` creates it on Postgres
+POSTGRES_TABLE = """
+    CREATE TABLE content_items (
+        id TEXT NOT NULL PRIMARY KEY, "instagramId" TEXT NOT NULL, "originalUrl" TEXT NOT NULL,
+        "sourceUrl" TEXT, "videoUrl" TEXT, views INTEGER NOT NULL DEFAULT 0, likes INTEGER NOT NULL DEFAULT 0,
+        comments INTEGER NOT NULL DEFAULT 0, "publishedAt" TIMESTAMP(3), headline TEXT, transcript TEXT,
+        description TEXT, "viralityScore" DOUBLE PRECISION, "datasetId" TEXT NOT NULL,
+        "isArchived" BOOLEAN NOT NULL DEFAULT false, "topicCategory" TEXT,
+        created_at TIMESTAMP(3) NOT NULL, updated_at TIMESTAMP(3) NOT NULL
+    )
+"""
+
+
+def generate(rows: int) -> List[Dict[str, Any]]:
+    """Rows with epoch-ms timestamps; many share one updated_at (bulk updates)."""
+    rng = random.Random(3)
+    now_ms = int(time.time() * 1000)
+    items = []
+    for i in range(rows):
+        # Half-hour offsets: never within minutes of a whole-day window boundary
+        published = now_ms - (rng.randrange(0, 60 * 24) + 0.5) * 3600_000
+        items.append({
+            "id": f"item{i:05d}",
+            "instagramId": f"ig{i}",
+            "originalUrl": f"https://instagram.com/p/{i}",
+            "sourceUrl": f"https://instagram.com/author{i % 40}",
+            "videoUrl": f"https://example.com/{i}.mp4",
+            "views": rng.choice([1000, 5000, 20000]) if rng.random() < 0.2 else int(rng.paretovariate(1.1) * 1000),
+            "likes": rng.randint(0, 5000),
+            "comments": rng.randint(0, 500),
+            "publishedAt": int(published),
+            "headline": f"Заголовок {i}",
+            "transcript": "Транскрипт ролика. " * rng.randint(1, 50),
+            "description": None,
+            "viralityScore": None if rng.random() < 0.15 else round(rng.lognormvariate(0, 1), 4),
+            "datasetId": rng.choice(DATASETS),
+            "isArchived": rng.random() < 0.1,
+            "topicCategory": rng.choice(CATEGORIES),
+            "created_at": now_ms - 90 * 86400_000,
+            "updated_at": now_ms - rng.choice([0, 0, 0, 1000, 2000, rng.randrange(10_000_000)]),
+        })
+    return items
+
+
+def reference(
+    items: List[Dict[str, Any]],
+    days: int,
+    min_views: int,
+    limit: int,
+    dataset_id: Optional[str] = None,
+    topic_category: Optional[str] = None,
+    ids: Optional[List[str]] = None
+) -> List[tuple]:
+    """(score, views) of the expected answer, in trend order."""
+    cutoff = cutoff_ms(days)
+    matching = [
+        item for item in items
+        if not item["isArchived"] and item["views"] >= min_views
+        and (cutoff is None or item["publishedAt"] >= cutoff)
+        and (dataset_id is None or item["datasetId"] == dataset_id)
+        and (topic_category is None or item["topicCategory"] == topic_category)
+        and (ids is None or item["id"] in ids)
+    ]
+    matching.sort(key=lambda item: (
+        -item["viralityScore"] if item["viralityScore"] is not None else float("inf"), -item["views"]
+    ))
+    return [(item["viralityScore"], item["views"]) for item in matching[:limit]]
+
+
+class Checker:
+    def __init__(self, backend: str):
+        self.backend = backend
+        self.failures = 0
+
+    def check(self, name: str, ok: bool, detail: str = "") -> None:
+        if not ok:
+            self.failures += 1
+        print(f"   {'✅' if ok else '❌'} {name}{f'  ({detail})' if detail and not ok else ''}")
+
+
+async def verify(store: TrendStore, items: List[Dict[str, Any]]) -> int:
+    print(f"\n🔍 {store.name}")
+    checker = Checker(store.name)
+
+    indexes = await store.ensure_indexes()
+    checker.check(f"ensure_indexes: {len(indexes)} checks", bool(indexes) and all(indexes.values()), str(indexes))
+
+    cases = [
+        dict(days=0, min_views=0, limit=50),
+        dict(days=7, min_views=0, limit=20),
+        dict(days=30, min_views=5000, limit=100),
+        dict(days=30, min_views=0, limit=30, dataset_id="ds2"),
+        dict(days=60, min_views=1000, limit=30, topic_category="money"),
+        dict(days=14, min_views=0, limit=10, dataset_id="ds1", topic_category="health"),
+        dict(days=90, min_views=0, limit=5, ids=[item["id"] for item in items[::7]]),
+    ]
+    for case in cases:
+        rows = await store.fetch_viral(**case)
+        got = [(row["virality_score"], row["views"]) for row in rows]
+        expected = reference(items, **{k: v for k, v in case.items()})
+        label = ", ".join(f"{k}={v}" for k, v in case.items() if k != "ids") + (", ids" if "ids" in case else "")
+        checker.check(f"viral query {label}: {len(rows)} rows", got == expected, f"got {got[:3]} expected {expected[:3]}")
+
+    by_id = {item["id"]: item for item in items}
+    sample = await store.fetch_viral(days=0, min_views=0, limit=1)
+    checker.check(
+        "row fields (epoch-ms published_at, dataset, category)",
+        bool(sample) and sample[0]["published_at"] == by_id[sample[0]["id"]]["publishedAt"]
+        and sample[0]["dataset_id"] == by_id[sample[0]["id"]]["datasetId"]
+        and sample[0]["topic_category"] == by_id[sample[0]["id"]]["topicCategory"],
+        str(sample[:1])
+    )
+
+    expected_feed = [item["id"] for item in sorted(items, key=lambda item: (item["updated_at"], item["id"]))]
+    for name, fetch in (("changes", store.fetch_changes), ("text changes", store.fetch_text_changes)):
+        seen, watermark = [], START_WATERMARK
+        while True:
+            page = await fetch(watermark, 37)
+            if not page:
+                break
+            seen.extend(row["id"] for row in page)
+            watermark = (page[-1]["updated_at"], page[-1]["id"])
+        archived = sum(1 for row in await fetch(START_WATERMARK, len(items)) if row["archived"])
+        checker.check(
+            f"{name} feed: {len(seen)} rows in pages of 37",
+            seen == expected_feed and archived == sum(item["isArchived"] for item in items),
+            f"{len(seen)} rows, {len(set(seen))} distinct"
+        )
+
+    last = max(items, key=lambda item: (item["updated_at"], item["id"]))
+    latest = await store.latest_change()
+    checker.check("latest_change", latest == (last["updated_at"], last["id"]), f"{latest}")
+
+    started = time.perf_counter()
+    answers = await asyncio.gather(*(store.fetch_viral(days=30, min_views=0, limit=50) for _ in range(50)))
+    elapsed = (time.perf_counter() - started) * 1000
+    checker.check(
+        f"50 concurrent queries in {elapsed:.0f}ms",
+        all([row["id"] for row in answer] == [row["id"] for row in answers[0]] for answer in answers)
+    )
+    print(f"   {store.snapshot()}")
+    return checker.failures
+
+
+def load_sqlite(path: str, items: List[Dict[str, Any]]) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(SQLITE_TABLE)
+    conn.executemany(
+        f"INSERT INTO content_items ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+        ([int(item[c]) if c == "isArchived" else item[c] for c in COLUMNS] for item in items)
+    )
+    conn.commit()
+    conn.close()
+
+
+async def load_postgres(dsn: str, schema: str, items: List[Dict[str, Any]]) -> None:
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(f'CREATE SCHEMA "{schema}"')
+        await conn.execute(f'SET search_path TO "{schema}"')
+        await conn.execute(POSTGRES_TABLE)
+        timestamps = {"publishedAt", "created_at", "updated_at"}
+        await conn.copy_records_to_table(
+            "content_items",
+            schema_name=schema,
+            columns=COLUMNS,
+            records=[
+                tuple(from_epoch_ms(item[c]) if c in timestamps else item[c] for c in COLUMNS)
+                for item in items
+            ]
+        )
+    finally:
+        await conn.close()
+
+
+async def drop_postgres(dsn: str, schema: str) -> None:
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+    finally:
+        await conn.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=3000)
+    parser.add_argument("--dsn", help="Postgres URL; a throwaway schema is created and dropped there")
+    args = parser.parse_args()
+
+    items = generate(args.rows)
+    failures = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "verify.db")
+        load_sqlite(path, items)
+        pool = SQLiteReadPool(path, size=4)
+        failures += await verify(SQLiteTrendStore(path, pool), items)
+        pool.close()
+
+    if args.dsn:
+        schema = f"ma_verify_{os.getpid()}"
+        await load_postgres(args.dsn, schema, items)
+        separator = "&" if "?" in args.dsn else "?"
+        store = PostgresTrendStore(f"{args.dsn}{separator}schema={schema}", max_size=8)
+        try:
+            failures += await verify(store, items)
+        finally:
+            await store.close()
+            await drop_postgres(args.dsn, schema)
+    else:
+        print("\n⏭️  Postgres skipped (pass --dsn)")
+
+    print(f"\n{'✅ All checks passed' if not failures else f'❌ {failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())